@@ -0,0 +1,160 @@
+"""Compares the native text splitter with the LangChain splitter which was used before.
+
+The LangChain path converts every page into a LangChain document, splits it with
+``RecursiveCharacterTextSplitter`` and converts every chunk back, like ``TextSplitterService`` did.
+Both splitters are run on the same synthetic pages, and the script checks that they create the same chunks.
+
+Usage:
+
+    python benchmarks/text_splitter_benchmark.py --pages 2000 --chunk-size 1024 --chunk-overlap 256
+
+"""
+
+import argparse
+import random
+import time
+from typing import Callable
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from ragcore.dto.document_dto import DocumentDTO
+from ragcore.models.document_model import Document
+from ragcore.models.text_splitter_model import RecursiveTextSplitter
+from ragcore.shared.constants import SplitterConstants
+from ragcore.shared.utils import get_token_encoding
+
+WORDS = (
+    "the elk said that the river was quiet and the forest was dark while "
+    "retrieval augmented generation answers questions about documents with context"
+).split()
+
+
+def make_pages(num_pages: int, seed: int = 0) -> list[Document]:
+    """Creates pages of about 3000 characters with paragraphs and lines."""
+    rng = random.Random(seed)
+    pages = []
+    for page in range(num_pages):
+        paragraphs = [
+            "\n".join(
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25)))
+                for _ in range(rng.randint(2, 6))
+            )
+            for _ in range(rng.randint(3, 8))
+        ]
+        pages.append(
+            Document(
+                content="\n\n".join(paragraphs),
+                title="Benchmark",
+                metadata={"title": "Benchmark", "page": page},
+            )
+        )
+    return pages
+
+
+def split_langchain(
+    pages: list[Document],
+    chunk_size: int,
+    chunk_overlap: int,
+    length_function: Callable[[str], int],
+) -> list[Document]:
+    """Splits pages like ``TextSplitterService`` did with LangChain."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+        length_function=length_function,
+    )
+    documents_lang = [
+        DocumentDTO(
+            content=page.content, title=page.title, metadata=page.metadata
+        ).to_langchain()
+        for page in pages
+    ]
+    return [
+        DocumentDTO(
+            content=split.page_content,
+            title=split.metadata.get("title", ""),
+            metadata=split.metadata,
+        ).to_ragcore()
+        for split in splitter.split_documents(documents=documents_lang)
+    ]
+
+
+def measure(function: Callable[[], list[Document]], repeat: int) -> tuple[float, int]:
+    """Returns the best time of ``repeat`` runs in seconds and the number of chunks."""
+    best = float("inf")
+    chunks: list[Document] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = function()
+        best = min(best, time.perf_counter() - started)
+    return best, len(chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--chunk-overlap", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    num_characters = sum(len(page.content) for page in pages)
+    print(f"{args.pages} pages, {num_characters / 1e6:.1f} M characters")
+
+    encoding = get_token_encoding()
+    modes: list[tuple[str, int, int, Callable[[str], int]]] = [
+        (
+            SplitterConstants.LENGTH_UNIT_CHARACTERS,
+            args.chunk_size,
+            args.chunk_overlap,
+            len,
+        )
+    ]
+    if encoding is None:
+        print("No tiktoken encoding could be loaded, the token mode is skipped.")
+    else:
+        # Chunks in tokens are about a quarter of the length in characters.
+        modes.append(
+            (
+                SplitterConstants.LENGTH_UNIT_TOKENS,
+                args.chunk_size // 4,
+                args.chunk_overlap // 4,
+                lambda text: len(encoding.encode_ordinary(text)),
+            )
+        )
+
+    for length_unit, chunk_size, chunk_overlap, length_function in modes:
+        native = RecursiveTextSplitter(
+            chunk_size, chunk_overlap, length_unit=length_unit, encoding=encoding
+        )
+        native_chunks = native.split_documents(pages)
+        langchain_chunks = split_langchain(
+            pages, chunk_size, chunk_overlap, length_function
+        )
+        same = [(chunk.content, chunk.metadata) for chunk in native_chunks] == [
+            (chunk.content, chunk.metadata) for chunk in langchain_chunks
+        ]
+
+        langchain_seconds, num_chunks = measure(
+            lambda: split_langchain(pages, chunk_size, chunk_overlap, length_function),
+            args.repeat,
+        )
+        native_seconds, _ = measure(
+            lambda: native.split_documents(pages),
+            args.repeat,
+        )
+        print(
+            f"{length_unit:<10} chunk_size {chunk_size}, overlap {chunk_overlap}: {num_chunks} chunks, "
+            f"same chunks: {same}\n"
+            f"  langchain {langchain_seconds * 1000:8.1f} ms  "
+            f"({num_characters / langchain_seconds / 1e6:.1f} M characters/s)\n"
+            f"  native    {native_seconds * 1000:8.1f} ms  "
+            f"({num_characters / native_seconds / 1e6:.1f} M characters/s, "
+            f"{langchain_seconds / native_seconds:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
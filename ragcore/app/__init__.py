@@ -1,18 +1,42 @@
-from typing import Optional, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Iterator, Optional, Any
 import yaml
 
 from ragcore.app.base_app import AbstractApp
-from ragcore.shared.constants import AppConstants, ConfigurationConstants
-from ragcore.models.app_model import QueryResponse, TitlesResponse
+from ragcore.shared.constants import (
+    AppConstants,
+    ConfigurationConstants,
+    EmbeddingConstants,
+    EndpointConstants,
+    HedgingConstants,
+    LLMProviderConstants,
+    LoaderConstants,
+    SplitterConstants,
+)
+from ragcore.models.app_model import (
+    IngestFileResult,
+    IngestResult,
+    QueryResponse,
+    QueryStreamChunk,
+    TitlesResponse,
+)
 from ragcore.models.config_model import (
     AppConfiguration,
     DatabaseConfiguration,
     EmbeddingConfiguration,
     SplitterConfiguration,
     LLMConfiguration,
+    LoaderConfiguration,
+)
+from ragcore.models.document_model import Document, UpdateStats
+from ragcore.services.document_service import (
+    DocumentService,
+    get_title,
+    is_supported_file,
 )
-from ragcore.models.document_model import Document
-from ragcore.services.document_service import DocumentService
 from ragcore.services.database_service import DatabaseService
 from ragcore.shared.errors import DatabaseError
 from ragcore.services.llm_service import LLMService
@@ -96,7 +120,8 @@ class RAGCore(AbstractApp):
         """Queries the database with a query.
 
         Queries the database and makes an LLM request with the prompt and the context
-        provided by the database.
+        provided by the database. If the semantic cache is enabled and a similar question with the
+        same context has been answered before, the cached answer is returned instead.
 
         Args:
             query: The query string to query the database with.
@@ -112,19 +137,151 @@ class RAGCore(AbstractApp):
             return QueryResponse(content=None, documents=[], user=user)
 
         # Get relevant chunks from database.
-        contexts: Optional[list[Document]] = self.database_service.query(query, user)
+        embedding = self.database_service.embed_query(query)
+        contexts: Optional[list[Document]] = self.database_service.query_by_embedding(
+            embedding, user
+        )
 
         if not contexts:
             print("Did not find documents in the database. Maybe it is empty?")
             return QueryResponse(content=None, documents=[], user=user)
 
+        cached_content = self.llm_service.get_cached_response(embedding, contexts, user)
+        if cached_content is not None:
+            return QueryResponse(content=cached_content, documents=contexts, user=user)
+
         # Construct prompt from template and context.
         prompt: str = self.llm_service.create_prompt(query, contexts)
 
         # Query llm with prompt.
+        started = time.perf_counter()
         content = self.llm_service.make_llm_request(prompt)
+        if content:
+            self.llm_service.cache_response(
+                embedding, contexts, content, time.perf_counter() - started, user
+            )
         return QueryResponse(content=content, documents=contexts, user=user)
 
+    def query_batch(
+        self, queries: list[str], user: Optional[str] = None
+    ) -> list[QueryResponse]:
+        """Queries the database with many queries.
+
+        All queries are embedded in one request, and the database is queried with all query vectors at once.
+        The LLM requests are sent concurrently, limited by ``max_concurrency`` in the ``llm`` section of the
+        configuration. This is much faster than calling ``query`` in a loop, for example for evaluation runs.
+
+        Args:
+            queries: A list of query strings.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with a ``QueryResponse`` for each query, in the order of the queries. See ``query``.
+
+        """
+        responses = [
+            QueryResponse(content=None, documents=[], user=user) for _ in queries
+        ]
+        indices = [index for index, query in enumerate(queries) if query]
+        if not indices or not self.database_service or not self.llm_service:
+            return responses
+
+        # Get relevant chunks from database for all queries.
+        embeddings = self.database_service.embed_queries([queries[i] for i in indices])
+        contexts_list = self.database_service.query_by_embeddings(embeddings, user)
+
+        # Construct prompts for the queries which are not in the semantic cache.
+        prompts: dict[int, str] = {}
+        contexts_by_index = dict(zip(indices, contexts_list))
+        for index, embedding, contexts in zip(indices, embeddings, contexts_list):
+            if not contexts:
+                continue
+            responses[index].documents = contexts
+            cached_content = self.llm_service.get_cached_response(
+                embedding, contexts, user
+            )
+            if cached_content is not None:
+                responses[index].content = cached_content
+                continue
+            prompts[index] = self.llm_service.create_prompt(queries[index], contexts)
+
+        # Query llm with prompts.
+        started = time.perf_counter()
+        contents = self.llm_service.make_llm_requests(list(prompts.values()))
+        duration = (time.perf_counter() - started) / max(len(prompts), 1)
+        embeddings_by_index = dict(zip(indices, embeddings))
+        for index, content in zip(prompts, contents):
+            responses[index].content = content
+            if content:
+                self.llm_service.cache_response(
+                    embeddings_by_index[index],
+                    contexts_by_index[index],
+                    content,
+                    duration,
+                    user,
+                )
+        return responses
+
+    def query_stream(
+        self, query: str, user: Optional[str] = None
+    ) -> Iterator[QueryStreamChunk]:
+        """Queries the database with a query and streams the response.
+
+        Like ``query``, but the response of the LLM is yielded in parts as soon as they are generated,
+        so that the first words can be shown before the response is complete.
+
+        Example:
+            .. code-block:: python
+
+                for chunk in rag_instance.query_stream(query="Tell me about the topic."):
+                    if chunk.content:
+                        print(chunk.content, end="", flush=True)
+
+        Args:
+            query: The query string to query the database with.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            An iterator over ``QueryStreamChunk`` objects. The first chunk contains the documents on which the
+            response is based, and no content. Each following chunk contains a part of the response in the field
+            `content`. If no documents are found, nothing is yielded.
+
+        """
+        if not query or not self.database_service or not self.llm_service:
+            return
+
+        # Get relevant chunks from database.
+        embedding = self.database_service.embed_query(query)
+        contexts: Optional[list[Document]] = self.database_service.query_by_embedding(
+            embedding, user
+        )
+
+        if not contexts:
+            print("Did not find documents in the database. Maybe it is empty?")
+            return
+
+        yield QueryStreamChunk(content=None, documents=contexts, user=user)
+
+        cached_content = self.llm_service.get_cached_response(embedding, contexts, user)
+        if cached_content is not None:
+            yield QueryStreamChunk(content=cached_content, documents=[], user=user)
+            return
+
+        # Construct prompt from template and context.
+        prompt: str = self.llm_service.create_prompt(query, contexts)
+
+        # Stream the response of the llm.
+        started = time.perf_counter()
+        parts = []
+        for content in self.llm_service.make_llm_request_stream(prompt):
+            parts.append(content)
+            yield QueryStreamChunk(content=content, documents=[], user=user)
+        self.llm_service.cache_response(
+            embedding, contexts, "".join(parts), time.perf_counter() - started, user
+        )
+
     def add(self, path: str, user: Optional[str] = None) -> None:
         """Adds a document to the database.
 
@@ -133,7 +290,12 @@ class RAGCore(AbstractApp):
         ``data/documents/my_book.pdf`` adds the book to the database with the title
         ``my_book``. Before it is added, the document is split into overlapping chunks
         as specified in the config file. Then, using the embedding model, vector
-        representations are created which are then added to the database.
+        representations are created which are then added to the database. The chunks
+        are embedded and written in batches while the file is still being loaded.
+
+        Since the chunks are streamed into the database, ``document_service.pages`` and
+        ``document_service.documents`` stay empty. Use ``DocumentService.load_texts`` and
+        ``split_pages`` to get the pages or chunks of a file.
 
         Args:
             path: A string to the file location.
@@ -144,13 +306,194 @@ class RAGCore(AbstractApp):
         if not self.database_service:
             return
 
-        self.document_service = DocumentService(self.logger)
-        self.document_service.load_texts(path=path)
-        self.document_service.split_pages(
-            chunk_size=self.configuration.splitter_config.chunk_size,
-            chunk_overlap=self.configuration.splitter_config.chunk_overlap,
+        self.document_service = DocumentService(
+            self.logger, config=self.configuration.loader_config
+        )
+        self._add_file(self.document_service, path, user)
+        if self.llm_service:
+            self.llm_service.invalidate_cached_responses(user)
+
+    def _add_file(
+        self, document_service: DocumentService, path: str, user: Optional[str]
+    ) -> Optional[int]:
+        """Streams the chunks of a file into the database, and returns their number or None if the title exists.
+
+        Pages are loaded and split while earlier chunks are embedded and written in batches, so the
+        memory does not grow with the size of the file.
+
+        """
+        if not self.database_service:
+            return None
+
+        return self.database_service.add_documents_stream(
+            document_service.iter_documents(
+                path=path,
+                chunk_size=self.configuration.splitter_config.chunk_size,
+                chunk_overlap=self.configuration.splitter_config.chunk_overlap,
+                length_unit=self.configuration.splitter_config.length_unit,
+            ),
+            user,
+            batch_size=self.configuration.loader_config.batch_size,
+            queue_size=self.configuration.loader_config.queue_size,
+        )
+
+    def update(self, path: str, user: Optional[str] = None) -> Optional[UpdateStats]:
+        """Adds a document to the database, or updates it if its title is already in the database.
+
+        The document is split into chunks like in ``add``. Each chunk is stored with the hash of its
+        content, so only chunks which are new or have changed are embedded and written. Chunks which are
+        no longer part of the document are deleted. Pages are split independently of each other, so an
+        edit changes only the chunks of the pages which were edited.
+
+        Args:
+            path: A string to the file location.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            An ``UpdateStats`` with the number of embedded, unchanged and deleted chunks, or None if there
+            is no database.
+
+        """
+        if not self.database_service:
+            return None
+
+        self.document_service = DocumentService(
+            self.logger, config=self.configuration.loader_config
+        )
+        stats = self._update_file(self.document_service, path, user)
+        if self.llm_service and (stats.num_embedded or stats.num_deleted):
+            self.llm_service.invalidate_cached_responses(user)
+        return stats
+
+    def _update_file(
+        self, document_service: DocumentService, path: str, user: Optional[str]
+    ) -> UpdateStats:
+        """Streams the chunks of a file into the database and replaces the chunks which changed."""
+        if not self.database_service:
+            return UpdateStats(
+                num_documents=0, num_embedded=0, num_unchanged=0, num_deleted=0
+            )
+
+        return self.database_service.update_documents_stream(
+            document_service.iter_documents(
+                path=path,
+                chunk_size=self.configuration.splitter_config.chunk_size,
+                chunk_overlap=self.configuration.splitter_config.chunk_overlap,
+                length_unit=self.configuration.splitter_config.length_unit,
+            ),
+            user,
+            batch_size=self.configuration.loader_config.batch_size,
+            queue_size=self.configuration.loader_config.queue_size,
+        )
+
+    def add_many(
+        self,
+        paths: list[str],
+        user: Optional[str] = None,
+        workers: Optional[int] = None,
+        update: bool = False,
+    ) -> IngestResult:
+        """Adds many documents to the database concurrently.
+
+        Each file is loaded, split into chunks, embedded and added to the database like in ``add``. Up to
+        ``workers`` files are processed at the same time. Files which are not PDF files, and files with a
+        title which is already in the database, are skipped. With ``update``, documents with a title which
+        is already in the database are updated like in ``update`` instead. An error in one file does not
+        stop the other files, but is reported in the result.
+
+        Args:
+            paths: A list of paths to the files.
+
+            user: An optional string to identify a user.
+
+            workers: The maximum number of files which are processed at the same time.
+
+            update: If True, documents which are already in the database are updated.
+
+        Returns:
+            An ``IngestResult`` with the result of each file, in the order of the paths.
+
+        """
+        started = time.perf_counter()
+        if not self.database_service or not paths:
+            return IngestResult(user=user, files=[], duration_seconds=0.0)
+
+        workers = max(workers or AppConstants.DEFAULT_INGEST_WORKERS, 1)
+        existing_titles = set(self.database_service.get_titles(user))
+        # Titles which are claimed by a file of this call, or which are in the database and are not updated.
+        titles = set() if update else set(existing_titles)
+        titles_lock = threading.Lock()
+
+        def add_file(path: str) -> IngestFileResult:
+            file_started = time.perf_counter()
+            title = get_title(path)
+
+            def result(
+                status: str, num_documents: int = 0, message: Optional[str] = None
+            ) -> IngestFileResult:
+                return IngestFileResult(
+                    path=path,
+                    title=title,
+                    status=status,
+                    num_documents=num_documents,
+                    duration_seconds=time.perf_counter() - file_started,
+                    message=message,
+                )
+
+            if not is_supported_file(path):
+                return result(
+                    AppConstants.INGEST_STATUS_SKIPPED, message="Not a PDF file."
+                )
+            with titles_lock:
+                if title in titles:
+                    return result(
+                        AppConstants.INGEST_STATUS_SKIPPED,
+                        message=f"The title `{title}` is already in the database.",
+                    )
+                titles.add(title)
+
+            try:
+                document_service = DocumentService(
+                    self.logger, config=self.configuration.loader_config
+                )
+                if update and title in existing_titles:
+                    stats = self._update_file(document_service, path, user)
+                    return result(
+                        AppConstants.INGEST_STATUS_UPDATED,
+                        stats.num_documents,
+                        message=(
+                            f"{stats.num_embedded} embedded, {stats.num_unchanged} unchanged, "
+                            f"{stats.num_deleted} deleted."
+                        ),
+                    )
+                num_documents = self._add_file(document_service, path, user)
+                if num_documents is None:
+                    return result(
+                        AppConstants.INGEST_STATUS_SKIPPED,
+                        message=f"The title `{title}` is already in the database.",
+                    )
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self.logger.error(f"Failed to add `{path}`: {error}")
+                with titles_lock:
+                    titles.discard(title)
+                return result(AppConstants.INGEST_STATUS_FAILED, message=str(error))
+            return result(AppConstants.INGEST_STATUS_ADDED, num_documents)
+
+        self.logger.info(f"Adding {len(paths)} files with {workers} workers ...")
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            # Results of `map` are in the order of the paths.
+            files = list(executor.map(add_file, paths))
+
+        if self.llm_service and any(
+            file.status
+            in (AppConstants.INGEST_STATUS_ADDED, AppConstants.INGEST_STATUS_UPDATED)
+            for file in files
+        ):
+            self.llm_service.invalidate_cached_responses(user)
+        return IngestResult(
+            user=user, files=files, duration_seconds=time.perf_counter() - started
         )
-        self.database_service.add_documents(self.document_service.documents, user)
 
     def delete(self, title: str, user: Optional[str] = None) -> None:
         """Deletes a collection from the database.
@@ -168,6 +511,8 @@ class RAGCore(AbstractApp):
             return
 
         self.database_service.delete_documents(title, user)
+        if self.llm_service:
+            self.llm_service.invalidate_cached_responses(user)
 
     def get_titles(self, user: Optional[str] = None) -> TitlesResponse:
         """Gets the document titles in the database.
@@ -190,6 +535,112 @@ class RAGCore(AbstractApp):
 
         return TitlesResponse(user=user, contents=titles)
 
+    async def aquery(self, query: str, user: Optional[str] = None) -> QueryResponse:
+        """Queries the database with a query asynchronously.
+
+        Like ``query``, but the embedding and LLM requests are sent with the asynchronous clients of the
+        providers, and the database request runs in a worker thread, so that many queries can be served
+        by one event loop. If the task is cancelled, the pending provider request is cancelled.
+
+        Args:
+            query: The query string to query the database with.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A ``QueryResponse`` object. See ``query``.
+
+        """
+        if not query or not self.database_service or not self.llm_service:
+            return QueryResponse(content=None, documents=[], user=user)
+
+        # Get relevant chunks from database.
+        embedding = await self.database_service.aembed_query(query)
+        contexts: Optional[list[Document]] = (
+            await self.database_service.aquery_by_embedding(embedding, user)
+        )
+
+        if not contexts:
+            print("Did not find documents in the database. Maybe it is empty?")
+            return QueryResponse(content=None, documents=[], user=user)
+
+        cached_content = self.llm_service.get_cached_response(embedding, contexts, user)
+        if cached_content is not None:
+            return QueryResponse(content=cached_content, documents=contexts, user=user)
+
+        # Construct prompt from template and context.
+        prompt: str = self.llm_service.create_prompt(query, contexts)
+
+        # Query llm with prompt.
+        started = time.perf_counter()
+        content = await self.llm_service.amake_llm_request(prompt)
+        if content:
+            self.llm_service.cache_response(
+                embedding, contexts, content, time.perf_counter() - started, user
+            )
+        return QueryResponse(content=content, documents=contexts, user=user)
+
+    async def aadd(self, path: str, user: Optional[str] = None) -> None:
+        """Adds a document to the database asynchronously.
+
+        Loading, splitting and adding the document runs in a worker thread. See ``add``.
+
+        Args:
+            path: A string to the file location.
+
+            user: An optional string to identify a user.
+
+        """
+        await asyncio.to_thread(self.add, path, user)
+
+    async def aupdate(
+        self, path: str, user: Optional[str] = None
+    ) -> Optional[UpdateStats]:
+        """Adds or updates a document in the database asynchronously.
+
+        Loading, splitting and updating the document runs in a worker thread. See ``update``.
+
+        Args:
+            path: A string to the file location.
+
+            user: An optional string to identify a user.
+
+        """
+        return await asyncio.to_thread(self.update, path, user)
+
+    async def adelete(self, title: str, user: Optional[str] = None) -> None:
+        """Deletes a collection from the database asynchronously. See ``delete``.
+
+        Args:
+            title: The title of the collection to remove from the database.
+
+            user: An optional string to identify a user.
+
+        """
+        if not title or not self.database_service:
+            return
+
+        await self.database_service.adelete_documents(title, user)
+        if self.llm_service:
+            self.llm_service.invalidate_cached_responses(user)
+
+    async def aget_titles(self, user: Optional[str] = None) -> TitlesResponse:
+        """Gets the document titles in the database asynchronously. See ``get_titles``.
+
+        Args:
+            user: An optional string to identify the owner.
+
+        Returns:
+            TitlesResponse: Object with an optional list of alphabetically sorted string titles and an optional user.
+
+        """
+        if not self.database_service:
+            return TitlesResponse(user, [])
+
+        titles = await self.database_service.aget_titles(user)
+
+        return TitlesResponse(user=user, contents=titles)
+
     def _init_llm_service(self):
         """Initialize LLM service."""
         self.llm_service = LLMService(self.logger, config=self.configuration.llm_config)
@@ -199,8 +650,10 @@ class RAGCore(AbstractApp):
         """Creates a database or loads an existing one.
 
         The database service requires both the database and embedding configurations, so that it can
-        create embedding vectors.
+        create embedding vectors. A database service which is replaced is closed.
         """
+        if self.database_service:
+            self.database_service.close()
         self.database_service = DatabaseService(
             logger=self.logger,
             config=self.configuration.database_config,
@@ -236,6 +689,7 @@ class RAGCore(AbstractApp):
         splitter_config_dict = config.get(ConfigurationConstants.KEY_SPLITTER, {})
         embedding_config_dict = config.get(ConfigurationConstants.KEY_EMBEDDING, {})
         llm_config_dict = config.get(ConfigurationConstants.KEY_LLM, {})
+        loader_config_dict = config.get(ConfigurationConstants.KEY_LOADER, {})
 
         database_config = DatabaseConfiguration(
             provider=database_config_dict.get(
@@ -258,6 +712,10 @@ class RAGCore(AbstractApp):
             chunk_size=splitter_config_dict.get(
                 ConfigurationConstants.KEY_CHUNK_SIZE, -1
             ),
+            length_unit=splitter_config_dict.get(
+                ConfigurationConstants.KEY_LENGTH_UNIT,
+                SplitterConstants.LENGTH_UNIT_CHARACTERS,
+            ),
         )
         embedding_config = EmbeddingConfiguration(
             provider=embedding_config_dict.get(
@@ -272,6 +730,54 @@ class RAGCore(AbstractApp):
             api_version=embedding_config_dict.get(
                 ConfigurationConstants.KEY_AZURE_OPENAI_API_VERSION
             ),
+            cache_dir=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_CACHE_DIR
+            ),
+            cache_max_entries=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_CACHE_MAX_ENTRIES,
+                EmbeddingConstants.DEFAULT_CACHE_MAX_ENTRIES,
+            ),
+            max_concurrency=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_MAX_CONCURRENCY,
+                EmbeddingConstants.DEFAULT_MAX_CONCURRENCY,
+            ),
+            max_tokens_per_batch=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_MAX_TOKENS_PER_BATCH,
+                EmbeddingConstants.DEFAULT_MAX_TOKENS_PER_BATCH,
+            ),
+            batch_window_ms=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_BATCH_WINDOW_MS
+            ),
+            batch_max_size=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_BATCH_MAX_SIZE,
+                EmbeddingConstants.DEFAULT_BATCH_MAX_SIZE,
+            ),
+            adaptive_concurrency=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_ADAPTIVE_CONCURRENCY, False
+            ),
+            dimensions=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_DIMENSIONS
+            ),
+            query_cache_max_entries=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_QUERY_CACHE_MAX_ENTRIES,
+                EmbeddingConstants.DEFAULT_QUERY_CACHE_MAX_ENTRIES,
+            ),
+            query_cache_ttl_seconds=embedding_config_dict.get(
+                ConfigurationConstants.KEY_EMBEDDING_QUERY_CACHE_TTL_SECONDS
+            ),
+            endpoints=embedding_config_dict.get(ConfigurationConstants.KEY_ENDPOINTS),
+            endpoint_routing=embedding_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_ROUTING,
+                EndpointConstants.ROUTING_LEAST_OUTSTANDING,
+            ),
+            endpoint_max_errors=embedding_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_MAX_ERRORS,
+                EndpointConstants.DEFAULT_MAX_ERRORS,
+            ),
+            endpoint_ejection_seconds=embedding_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_EJECTION_SECONDS,
+                EndpointConstants.DEFAULT_EJECTION_SECONDS,
+            ),
         )
         llm_config = LLMConfiguration(
             provider=llm_config_dict.get(ConfigurationConstants.KEY_LLM_PROVIDER, ""),
@@ -282,6 +788,92 @@ class RAGCore(AbstractApp):
             api_version=llm_config_dict.get(
                 ConfigurationConstants.KEY_AZURE_OPENAI_API_VERSION
             ),
+            max_concurrency=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_MAX_CONCURRENCY,
+                LLMProviderConstants.DEFAULT_MAX_CONCURRENCY,
+            ),
+            adaptive_concurrency=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_ADAPTIVE_CONCURRENCY, False
+            ),
+            semantic_cache_threshold=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SEMANTIC_CACHE_THRESHOLD
+            ),
+            semantic_cache_max_entries=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+                LLMProviderConstants.DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES,
+            ),
+            response_cache_max_entries=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_RESPONSE_CACHE_MAX_ENTRIES, 0
+            ),
+            response_cache_dir=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_RESPONSE_CACHE_DIR
+            ),
+            response_cache_disk_max_entries=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_RESPONSE_CACHE_DISK_MAX_ENTRIES,
+                LLMProviderConstants.DEFAULT_RESPONSE_CACHE_DISK_MAX_ENTRIES,
+            ),
+            response_cache_ttl_seconds=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_RESPONSE_CACHE_TTL_SECONDS
+            ),
+            max_context_tokens=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_MAX_CONTEXT_TOKENS
+            ),
+            system_prompt_template=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SYSTEM_PROMPT_TEMPLATE
+            ),
+            prompt_template=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_PROMPT_TEMPLATE
+            ),
+            endpoints=llm_config_dict.get(ConfigurationConstants.KEY_ENDPOINTS),
+            endpoint_routing=llm_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_ROUTING,
+                EndpointConstants.ROUTING_LEAST_OUTSTANDING,
+            ),
+            endpoint_max_errors=llm_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_MAX_ERRORS,
+                EndpointConstants.DEFAULT_MAX_ERRORS,
+            ),
+            endpoint_ejection_seconds=llm_config_dict.get(
+                ConfigurationConstants.KEY_ENDPOINT_EJECTION_SECONDS,
+                EndpointConstants.DEFAULT_EJECTION_SECONDS,
+            ),
+            hedge_percentile=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_HEDGE_PERCENTILE
+            ),
+            hedge_model=llm_config_dict.get(ConfigurationConstants.KEY_LLM_HEDGE_MODEL),
+            hedge_max_per_minute=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_HEDGE_MAX_PER_MINUTE,
+                HedgingConstants.DEFAULT_MAX_HEDGES_PER_MINUTE,
+            ),
+            simulated_latency_seconds=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SIMULATED_LATENCY_SECONDS, 0.0
+            ),
+            simulated_tokens_per_second=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SIMULATED_TOKENS_PER_SECOND
+            ),
+            simulated_response_tokens=llm_config_dict.get(
+                ConfigurationConstants.KEY_LLM_SIMULATED_RESPONSE_TOKENS,
+                LLMProviderConstants.DEFAULT_LOCAL_RESPONSE_TOKENS,
+            ),
+        )
+
+        loader_config = LoaderConfiguration(
+            workers=loader_config_dict.get(
+                ConfigurationConstants.KEY_LOADER_WORKERS,
+                LoaderConstants.DEFAULT_WORKERS,
+            ),
+            min_pages_per_worker=loader_config_dict.get(
+                ConfigurationConstants.KEY_LOADER_MIN_PAGES_PER_WORKER,
+                LoaderConstants.DEFAULT_MIN_PAGES_PER_WORKER,
+            ),
+            batch_size=loader_config_dict.get(
+                ConfigurationConstants.KEY_LOADER_BATCH_SIZE,
+                LoaderConstants.DEFAULT_BATCH_SIZE,
+            ),
+            queue_size=loader_config_dict.get(
+                ConfigurationConstants.KEY_LOADER_QUEUE_SIZE,
+                LoaderConstants.DEFAULT_QUEUE_SIZE,
+            ),
         )
 
         self.logger.info(f"Loaded config \n{config}\nfrom file `{config_file_path}`.")
@@ -291,4 +883,5 @@ class RAGCore(AbstractApp):
             splitter_config=splitter_config,
             embedding_config=embedding_config,
             llm_config=llm_config,
+            loader_config=loader_config,
         )
@@ -1,9 +1,11 @@
 from abc import ABCMeta, abstractmethod
+import asyncio
 import logging
 from logging import Logger
 from typing import Optional
 
-from ragcore.models.app_model import QueryResponse, TitlesResponse
+from ragcore.models.app_model import IngestResult, QueryResponse, TitlesResponse
+from ragcore.models.document_model import UpdateStats
 
 LOGGER_FILENAME = "app.log"
 
@@ -11,7 +13,8 @@ LOGGER_FILENAME = "app.log"
 class AbstractApp(metaclass=ABCMeta):
     """Abstract base app for RAG Core.
 
-    Defines the required methods and sets up the logger.
+    Defines the required methods and sets up the logger. The asynchronous methods run the synchronous
+    methods in worker threads, unless an app overrides them.
 
     """
 
@@ -71,3 +74,41 @@ class AbstractApp(metaclass=ABCMeta):
     @abstractmethod
     def get_titles(self, user: Optional[str] = None) -> TitlesResponse:
         """Lists all titles owned by the user in the database, sorted in alphabetical order."""
+
+    def update(self, path: str, user: Optional[str] = None) -> Optional[UpdateStats]:
+        """Adds a document to the database, or updates the chunks which changed.
+
+        Apps which do not support updates do not need to implement it.
+
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support `update`.")
+
+    def add_many(
+        self,
+        paths: list[str],
+        user: Optional[str] = None,
+        workers: Optional[int] = None,
+        update: bool = False,
+    ) -> IngestResult:
+        """Adds many documents to the database concurrently.
+
+        Apps which do not support concurrent ingestion do not need to implement it.
+
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support `add_many`.")
+
+    async def aquery(self, query: str, user: Optional[str] = None) -> QueryResponse:
+        """Runs a query against a database asynchronously. By default, ``query`` runs in a worker thread."""
+        return await asyncio.to_thread(self.query, query, user)
+
+    async def aadd(self, path: str, user: Optional[str] = None) -> None:
+        """Adds a document to the database asynchronously. By default, ``add`` runs in a worker thread."""
+        await asyncio.to_thread(self.add, path, user)
+
+    async def adelete(self, title: str, user: Optional[str] = None) -> None:
+        """Removes a document from the database asynchronously. By default, ``delete`` runs in a worker thread."""
+        await asyncio.to_thread(self.delete, title, user)
+
+    async def aget_titles(self, user: Optional[str] = None) -> TitlesResponse:
+        """Lists all titles owned by the user in the database asynchronously. By default, ``get_titles`` runs in a worker thread."""
+        return await asyncio.to_thread(self.get_titles, user)
@@ -1,8 +1,12 @@
 import argparse
+import glob
+import os
+import sys
+from typing import Any, Iterator, Optional
 
 from ragcore.shared.constants import AppConstants
 from ragcore.app import RAGCore
-from ragcore.models.app_model import QueryResponse
+from ragcore.models.app_model import IngestResult, QueryStreamChunk
 
 
 SEPARATOR_LINE = "--" * 64
@@ -32,14 +36,97 @@ def run_app(app) -> None:
             titles = app.get_titles()
             print(f"Following titles are in database: {titles.contents}")
         else:
-            response: QueryResponse = app.query(query=user_input)
-            if not response.content:
-                continue
-            print(f"\n{SEPARATOR_LINE}\n{response.content}\n{SEPARATOR_LINE}\n")
+            print_stream(app.query_stream(query=user_input))
+
+
+def print_stream(chunks: Iterator[QueryStreamChunk]) -> None:
+    """Prints the parts of a streamed response as they arrive."""
+    started = False
+    for chunk in chunks:
+        if not chunk.content:
+            continue
+        if not started:
+            print(f"\n{SEPARATOR_LINE}")
+            started = True
+        print(chunk.content, end="", flush=True)
+    if started:
+        print(f"\n{SEPARATOR_LINE}\n")
+
+
+def run_ingest(
+    app,
+    target: str,
+    workers: int,
+    user: Optional[str] = None,
+    update: bool = False,
+) -> bool:
+    """Adds all documents in a directory, or all files which match a glob pattern, and prints a summary.
+
+    With ``update``, documents which are already in the database are updated.
+
+    Returns:
+        True if no file failed, False otherwise.
+
+    """
+    paths = get_paths(target)
+    if not paths:
+        print(f"No files found for `{target}`.")
+        return True
+    print(f"Adding {len(paths)} files with {workers} workers ...")
+    result = app.add_many(paths, user=user, workers=workers, update=update)
+    print_ingest_result(result)
+    return all(
+        file.status != AppConstants.INGEST_STATUS_FAILED for file in result.files
+    )
+
+
+def get_paths(target: str) -> list[str]:
+    """Returns the PDF files in a directory and its subdirectories, or the files which match a glob pattern."""
+    if os.path.isdir(target):
+        paths = glob.glob(os.path.join(target, "**", "*"), recursive=True)
+        paths = [path for path in paths if path.lower().endswith(".pdf")]
+    else:
+        paths = glob.glob(target, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def print_ingest_result(result: IngestResult) -> None:
+    """Prints the status of each file and the throughput of an ingestion."""
+    print(SEPARATOR_LINE)
+    for file in result.files:
+        line = f"{file.status:<8} {file.path}"
+        if file.status in (
+            AppConstants.INGEST_STATUS_ADDED,
+            AppConstants.INGEST_STATUS_UPDATED,
+        ):
+            line += f" ({file.num_documents} chunks in {file.duration_seconds:.1f} s)"
+        if file.message:
+            line += f": {file.message}"
+        print(line)
+    print(SEPARATOR_LINE)
+
+    counts = {
+        status: sum(file.status == status for file in result.files)
+        for status in (
+            AppConstants.INGEST_STATUS_ADDED,
+            AppConstants.INGEST_STATUS_UPDATED,
+            AppConstants.INGEST_STATUS_SKIPPED,
+            AppConstants.INGEST_STATUS_FAILED,
+        )
+    }
+    num_documents = sum(file.num_documents for file in result.files)
+    seconds = max(result.duration_seconds, 1e-9)
+    print(
+        f"{counts[AppConstants.INGEST_STATUS_ADDED]} added, "
+        f"{counts[AppConstants.INGEST_STATUS_UPDATED]} updated, "
+        f"{counts[AppConstants.INGEST_STATUS_SKIPPED]} skipped, "
+        f"{counts[AppConstants.INGEST_STATUS_FAILED]} failed in {result.duration_seconds:.1f} s "
+        f"({len(result.files) / seconds:.2f} files/s, {num_documents / seconds:.1f} chunks/s)."
+    )
 
 
 def entrypoint():
-    arguments: dict[str, str] = _parse_args()
+    arguments: dict[str, Any] = _parse_args()
     cli_app = RAGCore(
         config=arguments.get(AppConstants.KEY_CONFIGURATION_PATH),
         log_level=(
@@ -48,10 +135,19 @@ def entrypoint():
             else LOGGER_LEVEL_WARN
         ),
     )
+    if arguments.get(AppConstants.KEY_COMMAND) == AppConstants.COMMAND_INGEST:
+        succeeded = run_ingest(
+            cli_app,
+            target=arguments[AppConstants.KEY_INGEST_TARGET],
+            workers=arguments[AppConstants.KEY_INGEST_WORKERS],
+            user=arguments.get(AppConstants.KEY_USER),
+            update=arguments.get(AppConstants.KEY_INGEST_UPDATE, False),
+        )
+        sys.exit(0 if succeeded else 1)
     run_app(cli_app)
 
 
-def _parse_args() -> dict[str, str]:
+def _parse_args() -> dict[str, Any]:
     parser = argparse.ArgumentParser(
         description=(
             "RAG Core is a library which helps you to create Retrieval-Augmented Generation applications. Create a `config.yaml` "
@@ -60,10 +156,39 @@ def _parse_args() -> dict[str, str]:
     )
     parser.add_argument("--config", type=str, help="Path to the config file")
     parser.add_argument("-v", action="store_true", help="Verbose logger")
+    subparsers = parser.add_subparsers(dest=AppConstants.KEY_COMMAND)
+    ingest_parser = subparsers.add_parser(
+        AppConstants.COMMAND_INGEST,
+        help="Add all PDF files in a directory, or the files which match a glob pattern",
+    )
+    ingest_parser.add_argument(
+        AppConstants.KEY_INGEST_TARGET, type=str, help="A directory or a glob pattern"
+    )
+    ingest_parser.add_argument(
+        "--workers",
+        type=int,
+        default=AppConstants.DEFAULT_INGEST_WORKERS,
+        help="The number of files which are processed at the same time",
+    )
+    ingest_parser.add_argument(
+        "--user", type=str, default=None, help="The user who owns the documents"
+    )
+    ingest_parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Update documents which are already in the database, and embed only the chunks which changed",
+    )
     args = parser.parse_args()
     return {
         AppConstants.KEY_CONFIGURATION_PATH: args.config,
         AppConstants.KEY_LOGGER_FLAG: args.v,
+        AppConstants.KEY_COMMAND: args.command,
+        AppConstants.KEY_INGEST_TARGET: getattr(args, "target", None),
+        AppConstants.KEY_INGEST_WORKERS: getattr(
+            args, "workers", AppConstants.DEFAULT_INGEST_WORKERS
+        ),
+        AppConstants.KEY_USER: getattr(args, "user", None),
+        AppConstants.KEY_INGEST_UPDATE: getattr(args, "update", False),
     }
 
 
@@ -22,6 +22,27 @@ class QueryResponse:
     user: Optional[str]
 
 
+@dataclass
+class QueryStreamChunk:
+    """Model for the parts of a streamed query response.
+
+    The first chunk of a stream contains the documents and no content. The following chunks contain
+    the parts of the response as they are generated by the LLM.
+
+    Attributes:
+        content: String with a part of the response, None for the chunk with the documents.
+
+        documents: Sequence of documents on which the response is based on. Empty list in chunks with content.
+
+        user: An optional string to identify a user.
+
+    """
+
+    content: Optional[str]
+    documents: Sequence[Optional[Document]]
+    user: Optional[str]
+
+
 @dataclass
 class TitlesResponse:
     """Model for document title responses.
@@ -34,3 +55,50 @@ class TitlesResponse:
 
     user: Optional[str]
     contents: list[Optional[str]]
+
+
+@dataclass
+class IngestFileResult:
+    """Model for the result of adding one file to the database.
+
+    Attributes:
+        path: The path to the file.
+
+        title: The title of the document.
+
+        status: ``"added"``, ``"updated"`` if the document was already in the database, ``"skipped"`` if
+            the file was not added, or ``"failed"`` if an error occurred.
+
+        num_documents: The number of chunks which were added, or the number of chunks of an updated document.
+
+        duration_seconds: The time it took to process the file.
+
+        message: The reason why the file was skipped or failed, a summary of the changes of an update, or
+            None if it was added.
+
+    """
+
+    path: str
+    title: str
+    status: str
+    num_documents: int
+    duration_seconds: float
+    message: Optional[str]
+
+
+@dataclass
+class IngestResult:
+    """Model for the result of adding many files to the database.
+
+    Attributes:
+        user: An optional string to identify a user.
+
+        files: The results of the files, in the order of the paths.
+
+        duration_seconds: The total time it took to process all files.
+
+    """
+
+    user: Optional[str]
+    files: list[IngestFileResult]
+    duration_seconds: float
@@ -1,6 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
+from ragcore.shared.constants import (
+    EmbeddingConstants,
+    EndpointConstants,
+    HedgingConstants,
+    LLMProviderConstants,
+    LoaderConstants,
+    SplitterConstants,
+)
+
 
 @dataclass
 class DatabaseConfiguration:
@@ -14,6 +23,7 @@ class DatabaseConfiguration:
 class SplitterConfiguration:
     chunk_overlap: int
     chunk_size: int
+    length_unit: str = SplitterConstants.LENGTH_UNIT_CHARACTERS
 
 
 @dataclass
@@ -22,6 +32,20 @@ class EmbeddingConfiguration:
     model: str
     endpoint: Optional[str]
     api_version: Optional[str]
+    cache_dir: Optional[str] = None
+    cache_max_entries: int = EmbeddingConstants.DEFAULT_CACHE_MAX_ENTRIES
+    max_concurrency: int = EmbeddingConstants.DEFAULT_MAX_CONCURRENCY
+    max_tokens_per_batch: int = EmbeddingConstants.DEFAULT_MAX_TOKENS_PER_BATCH
+    batch_window_ms: Optional[float] = None
+    batch_max_size: int = EmbeddingConstants.DEFAULT_BATCH_MAX_SIZE
+    adaptive_concurrency: bool = False
+    dimensions: Optional[int] = None
+    query_cache_max_entries: int = EmbeddingConstants.DEFAULT_QUERY_CACHE_MAX_ENTRIES
+    query_cache_ttl_seconds: Optional[float] = None
+    endpoints: Optional[list[str]] = None
+    endpoint_routing: str = EndpointConstants.ROUTING_LEAST_OUTSTANDING
+    endpoint_max_errors: int = EndpointConstants.DEFAULT_MAX_ERRORS
+    endpoint_ejection_seconds: float = EndpointConstants.DEFAULT_EJECTION_SECONDS
 
 
 @dataclass
@@ -30,6 +54,39 @@ class LLMConfiguration:
     model: str
     endpoint: Optional[str]
     api_version: Optional[str]
+    max_concurrency: int = LLMProviderConstants.DEFAULT_MAX_CONCURRENCY
+    adaptive_concurrency: bool = False
+    semantic_cache_threshold: Optional[float] = None
+    semantic_cache_max_entries: int = (
+        LLMProviderConstants.DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES
+    )
+    response_cache_max_entries: int = 0
+    response_cache_dir: Optional[str] = None
+    response_cache_disk_max_entries: int = (
+        LLMProviderConstants.DEFAULT_RESPONSE_CACHE_DISK_MAX_ENTRIES
+    )
+    response_cache_ttl_seconds: Optional[float] = None
+    max_context_tokens: Optional[int] = None
+    system_prompt_template: Optional[str] = None
+    prompt_template: Optional[str] = None
+    endpoints: Optional[list[str]] = None
+    endpoint_routing: str = EndpointConstants.ROUTING_LEAST_OUTSTANDING
+    endpoint_max_errors: int = EndpointConstants.DEFAULT_MAX_ERRORS
+    endpoint_ejection_seconds: float = EndpointConstants.DEFAULT_EJECTION_SECONDS
+    hedge_percentile: Optional[float] = None
+    hedge_model: Optional[str] = None
+    hedge_max_per_minute: int = HedgingConstants.DEFAULT_MAX_HEDGES_PER_MINUTE
+    simulated_latency_seconds: float = 0.0
+    simulated_tokens_per_second: Optional[float] = None
+    simulated_response_tokens: int = LLMProviderConstants.DEFAULT_LOCAL_RESPONSE_TOKENS
+
+
+@dataclass
+class LoaderConfiguration:
+    workers: int = LoaderConstants.DEFAULT_WORKERS
+    min_pages_per_worker: int = LoaderConstants.DEFAULT_MIN_PAGES_PER_WORKER
+    batch_size: int = LoaderConstants.DEFAULT_BATCH_SIZE
+    queue_size: int = LoaderConstants.DEFAULT_QUEUE_SIZE
 
 
 @dataclass
@@ -38,3 +95,4 @@ class AppConfiguration:
     splitter_config: SplitterConfiguration
     embedding_config: EmbeddingConfiguration
     llm_config: LLMConfiguration
+    loader_config: LoaderConfiguration = field(default_factory=LoaderConfiguration)
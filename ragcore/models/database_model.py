@@ -1,15 +1,22 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import os
 from typing import Optional, Any, Mapping, Sized, Type
 import uuid
 from requests.exceptions import HTTPError
 import chromadb
+from chromadb.api.types import Metadata
+import numpy as np
 from pinecone import Pinecone
 
 from ragcore.api.client import PineconeAPIClient
 from ragcore.models.embedding_model import BaseEmbedding
 from ragcore.models.document_model import Document
-from ragcore.shared.constants import DataConstants, DatabaseConstants, APIConstants
+from ragcore.shared.constants import (
+    DataConstants,
+    DatabaseConstants,
+    APIConstants,
+)
 from ragcore.shared.errors import DatabaseError
 from ragcore.shared.utils import chunk_list
 
@@ -43,6 +50,83 @@ class BaseVectorDatabaseModel(ABC):
 
         """
 
+    @abstractmethod
+    def add_embedded_documents(
+        self,
+        documents: list[Document],
+        embeddings: np.ndarray,
+        user: Optional[str] = None,
+    ) -> list[str]:
+        """Adds documents with their embedding vectors to the database, without checking the title.
+
+        Together with ``has_title``, it allows a document to be written in batches.
+
+        Args:
+            documents: A list of documents ``Document`` to be added to the database.
+
+            embeddings: A float matrix with the vector of each document, created with the embedding of the database.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            The IDs of the added documents, in the order of the documents.
+
+        """
+
+    @abstractmethod
+    def get_metadatas(self, title: str, user: Optional[str] = None) -> dict[str, dict]:
+        """Returns the metadata of all documents with a title by their IDs.
+
+        Args:
+            title: The title of the documents.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A dictionary from the ID of each document to its metadata.
+
+        """
+
+    @abstractmethod
+    def update_metadatas(
+        self, ids: list[str], metadatas: list[dict], user: Optional[str] = None
+    ) -> None:
+        """Replaces the metadata of documents, without changing their content and vectors.
+
+        Args:
+            ids: The IDs of the documents.
+
+            metadatas: The new metadata of each document, in the order of the IDs.
+
+            user: An optional string to identify a user.
+
+        """
+
+    @abstractmethod
+    def delete_ids(self, ids: list[str], user: Optional[str] = None) -> None:
+        """Deletes the documents with the IDs.
+
+        Args:
+            ids: The IDs of the documents to be deleted.
+
+            user: An optional string to identify a user.
+
+        """
+
+    @abstractmethod
+    def has_title(self, title: str, user: Optional[str] = None) -> bool:
+        """Returns True if documents with the title are in the database.
+
+        Args:
+            title: The title of the documents.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            True if documents with the title exist, False otherwise.
+
+        """
+
     @abstractmethod
     def delete_documents(self, title: str, user: Optional[str] = None) -> bool:
         """Deletes all documents with title `title` from the database.
@@ -71,6 +155,43 @@ class BaseVectorDatabaseModel(ABC):
 
         """
 
+    @abstractmethod
+    def query_by_embedding(
+        self, embedding: np.ndarray, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Queries the database with the vector representation of a query.
+
+        Args:
+            embedding: A float vector of the query, created with the embedding of the database.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list of documents ``Document``, or None if no documents could be retrieved.
+
+        """
+
+    def query_by_embeddings(
+        self, embeddings: np.ndarray, user: Optional[str] = None
+    ) -> list[list[Document]]:
+        """Queries the database with many query vectors.
+
+        The default implementation sends one query per vector. Databases which support it should
+        override this method to query all vectors in one request.
+
+        Args:
+            embeddings: A float matrix with one query vector per row.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with the documents for each query, in the order of the queries.
+
+        """
+        return [
+            self.query_by_embedding(embedding, user) or [] for embedding in embeddings
+        ]
+
     @abstractmethod
     def get_titles(self, user: Optional[str] = None) -> list[Optional[str]]:
         """Returns the titles owned by the user.
@@ -156,28 +277,79 @@ class ChromaDatabase(BaseLocalVectorDatabaseModel):
             True if the document has been added, False otherwise.
 
         """
-        docs = [doc.content for doc in documents]
-        metadatas: Any = [data.metadata for data in documents]
-        embeddings: Any = self.embedding.embed_texts(docs)
-        ids = [str(uuid.uuid1()) for _ in range(len(documents))]
+        # Check if the documents already exist in database, before they are embedded.
+        if self.has_title(documents[0].metadata.get(DataConstants.KEY_TITLE), user):
+            return False
 
-        collection = self._get_collection(user)
+        embeddings = self.embedding.embed_texts_array(
+            [doc.content for doc in documents]
+        )
+        self.add_embedded_documents(documents, embeddings, user)
 
-        # Check if the documents already exist in database.
-        if self._get_number_of_documents_by_title(
-            collection, metadatas[0].get(DataConstants.KEY_TITLE)
-        ):
-            return False
+        return True
+
+    def add_embedded_documents(
+        self,
+        documents: list[Document],
+        embeddings: np.ndarray,
+        user: Optional[str] = None,
+    ) -> list[str]:
+        """Adds documents with their embedding vectors to the collection, without checking the title.
+
+        Args:
+            documents: A list of documents.
+
+            embeddings: A float matrix with the vector of each document.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            The IDs of the added documents.
+
+        """
+        metadatas: Any = [data.metadata for data in documents]
+        ids = [str(uuid.uuid1()) for _ in range(len(documents))]
 
-        # Add documents to database.
-        collection.add(
-            documents=docs,
-            embeddings=embeddings,
+        # Add documents to database. Chroma expects a list for each vector.
+        self._get_collection(user).add(
+            documents=[doc.content for doc in documents],
+            embeddings=embeddings.tolist(),
             metadatas=metadatas,
             ids=ids,
         )
+        return ids
 
-        return True
+    def has_title(self, title: Optional[str], user: Optional[str] = None) -> bool:
+        """Returns True if documents with the title are in the collection of the user."""
+        return bool(
+            self._get_number_of_documents_by_title(self._get_collection(user), title)
+        )
+
+    def get_metadatas(self, title: str, user: Optional[str] = None) -> dict[str, dict]:
+        """Returns the metadata of all documents with a title in the collection of the user by their IDs."""
+        response = self._get_collection(user).get(
+            where={DataConstants.KEY_TITLE: title}, include=["metadatas"]
+        )
+        metadatas: Any = response.get(DatabaseConstants.KEY_METADATAS) or []
+        return {
+            doc_id: dict(metadata or {})
+            for doc_id, metadata in zip(response["ids"], metadatas)
+        }
+
+    def update_metadatas(
+        self, ids: list[str], metadatas: list[dict], user: Optional[str] = None
+    ) -> None:
+        """Replaces the metadata of documents in the collection of the user."""
+        if ids:
+            chroma_metadatas: list[Metadata] = [
+                dict(metadata) for metadata in metadatas
+            ]
+            self._get_collection(user).update(ids=ids, metadatas=chroma_metadatas)
+
+    def delete_ids(self, ids: list[str], user: Optional[str] = None) -> None:
+        """Deletes the documents with the IDs from the collection of the user."""
+        if ids:
+            self._get_collection(user).delete(ids=ids)
 
     def delete_documents(self, title: str, user: Optional[str] = None) -> bool:
         """Deletes all documents with the given title.
@@ -213,37 +385,86 @@ class ChromaDatabase(BaseLocalVectorDatabaseModel):
             A list of results from the database, or None if no results could be retrieved.
 
         """
-        collection = self._get_collection(user)
+        embeddings = self.embedding.embed_texts_array([query])
+        return self.query_by_embedding(embeddings[0], user)
+
+    def query_by_embedding(
+        self, embedding: np.ndarray, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Queries the database with the vector representation of a query.
+
+        Args:
+            embedding: A float vector of the query.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list of results from the database, or None if no results could be retrieved.
+
+        """
+        return self.query_by_embeddings(embedding.reshape(1, -1), user)[0]
+
+    def query_by_embeddings(
+        self, embeddings: np.ndarray, user: Optional[str] = None
+    ) -> list[list[Document]]:
+        """Queries the database with many query vectors in a single request.
+
+        Args:
+            embeddings: A float matrix with one query vector per row.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with the documents for each query, in the order of the queries.
 
-        embeddings: Any = self.embedding.embed_texts([query])
-        response = collection.query(
-            query_embeddings=embeddings, n_results=self.num_search_results
+        """
+        if not len(embeddings):
+            return []
+
+        response = self._get_collection(user).query(
+            query_embeddings=embeddings.tolist(), n_results=self.num_search_results
         )
+        return [
+            self._get_documents(response, index) for index in range(len(embeddings))
+        ]
 
+    @staticmethod
+    def _get_documents(
+        response: Optional[Mapping[str, Any]], index: int = 0
+    ) -> list[Document]:
+        """Creates documents from the results of the query vector at ``index`` in the response."""
         if not response:
             return []
 
         # Create Documents.
         documents = []
 
-        # We give it only one query, consequently there is only one set of `num_search_results`
-        # documents in the response, so why we can index with `0`.
+        # The response has one set of `num_search_results` documents for each query vector.
         response_docs_list = response["documents"]
         response_metadata_list = response["metadatas"]
 
         if not response_docs_list or not response_metadata_list:
             return []
 
-        response_docs = response_docs_list[0]
-        response_metadata = response_metadata_list[0]
+        response_docs = response_docs_list[index]
+        response_metadata = response_metadata_list[index]
+        response_ids_list = response.get(DatabaseConstants.KEY_IDS)
+        response_ids = (
+            response_ids_list[index]
+            if response_ids_list
+            else [None] * len(response_docs)
+        )
 
-        for doc, metadata in zip(response_docs, response_metadata):
+        for doc, metadata, doc_id in zip(
+            response_docs, response_metadata, response_ids
+        ):
             metadata_mapping: Mapping[str, Any] = metadata
             documents.append(
                 Document(
                     content=doc,
                     title=str(metadata.get("title", "")),
                     metadata=metadata_mapping,
+                    id=doc_id,
                 )
             )
 
@@ -393,17 +614,45 @@ class PineconeDatabase(BaseVectorDatabaseModel):
             True if documents have been added, False otherwise.
 
         """
-        docs = [doc.content for doc in documents]
-        metadatas: Any = [data.metadata for data in documents]
-        title = metadatas[0].get(DataConstants.KEY_TITLE)
-
         # Check if the documents already exist in database.
-        if self._get_ids_by_title(
-            user=user if user else NAME_MAIN_COLLECTION, title=title
-        ):
+        title: str = documents[0].metadata.get(DataConstants.KEY_TITLE, "")
+        if self.has_title(title, user):
             return False
 
-        embeddings: Any = self.embedding.embed_texts(docs)
+        embeddings = self.embedding.embed_texts_array(
+            [doc.content for doc in documents]
+        )
+        try:
+            self.add_embedded_documents(documents, embeddings, user)
+        except HTTPError:
+            return False
+        return True
+
+    def add_embedded_documents(
+        self,
+        documents: list[Document],
+        embeddings: np.ndarray,
+        user: Optional[str] = None,
+    ) -> list[str]:
+        """Adds documents with their embedding vectors to the namespace of the user, without checking the title.
+
+        Args:
+            documents: A list of documents ``Document`` to be added to the database.
+
+            embeddings: A float matrix with the vector of each document.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            The IDs of the added documents.
+
+        Raises:
+            HTTPError: If a request to Pinecone fails.
+
+        """
+        docs = [doc.content for doc in documents]
+        metadatas: Any = [data.metadata for data in documents]
+        title = metadatas[0].get(DataConstants.KEY_TITLE)
 
         # Create IDs with the title prefix
         ids = [
@@ -422,22 +671,61 @@ class PineconeDatabase(BaseVectorDatabaseModel):
             vectors.append(
                 {
                     "id": ids[ind],
-                    "values": embedding,
+                    "values": embedding.tolist(),
                     "metadata": metadata,
                 }
             )
 
         # Add to database
-        chunk_size = 100
-        for vector_chunk in chunk_list(vectors, chunk_size):
-            try:
-                self.index.upsert(
-                    namespace=user if user else NAME_MAIN_COLLECTION,
-                    vectors=vector_chunk,
-                )
-            except HTTPError:
-                return False
-        return True
+        for vector_chunk in chunk_list(vectors, DatabaseConstants.PINECONE_BATCH_SIZE):
+            self.index.upsert(
+                namespace=user if user else NAME_MAIN_COLLECTION,
+                vectors=vector_chunk,
+            )
+        return ids
+
+    def get_metadatas(self, title: str, user: Optional[str] = None) -> dict[str, dict]:
+        """Returns the metadata of all vectors with the title prefix in the namespace of the user by their IDs.
+
+        The content, which Pinecone stores in the metadata field ``doc``, is not part of the returned metadata.
+
+        """
+        namespace = user if user else NAME_MAIN_COLLECTION
+        ids: Any = self._get_ids_by_title(user=namespace, title=title)
+        metadatas = {}
+        for id_chunk in chunk_list(ids, DatabaseConstants.PINECONE_BATCH_SIZE):
+            response = self.index.fetch(ids=id_chunk, namespace=namespace)
+            for doc_id, vector in response.vectors.items():
+                metadata = dict(vector.metadata or {})
+                metadata.pop(DataConstants.KEY_DOC, None)
+                metadatas[doc_id] = metadata
+        return metadatas
+
+    def update_metadatas(
+        self, ids: list[str], metadatas: list[dict], user: Optional[str] = None
+    ) -> None:
+        """Sets the metadata of vectors in the namespace of the user. Pinecone updates one vector per request."""
+        for doc_id, metadata in zip(ids, metadatas):
+            self.index.update(
+                id=doc_id,
+                set_metadata=metadata,
+                namespace=user if user else NAME_MAIN_COLLECTION,
+            )
+
+    def delete_ids(self, ids: list[str], user: Optional[str] = None) -> None:
+        """Deletes the vectors with the IDs from the namespace of the user."""
+        for id_chunk in chunk_list(ids, DatabaseConstants.PINECONE_BATCH_SIZE):
+            self.index.delete(
+                ids=id_chunk, namespace=user if user else NAME_MAIN_COLLECTION
+            )
+
+    def has_title(self, title: str, user: Optional[str] = None) -> bool:
+        """Returns True if vectors with the title prefix are in the namespace of the user."""
+        return bool(
+            self._get_ids_by_title(
+                user=user if user else NAME_MAIN_COLLECTION, title=title
+            )
+        )
 
     def delete_documents(self, title: str, user: Optional[str] = None) -> bool:
         """Deletes all documents with title `title` from the database.
@@ -480,14 +768,28 @@ class PineconeDatabase(BaseVectorDatabaseModel):
             A list of documents ``Document``, or None if no documents could be retrieved.
 
         """
+        embeddings = self.embedding.embed_texts_array([query])
+        return self.query_by_embedding(embeddings[0], user)
+
+    def query_by_embedding(
+        self, embedding: np.ndarray, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Queries the database with the vector representation of a query.
+
+        Args:
+            embedding: A float vector of the query.
 
-        embeddings: Any = self.embedding.embed_texts([query])
+            user: An optional string to identify a user.
+
+        Returns:
+            A list of documents ``Document``, or None if no documents could be retrieved.
 
+        """
         response = self.index.query(
             namespace=user if user else NAME_MAIN_COLLECTION,
             top_k=self.num_search_results,
             include_metadata=True,
-            vector=embeddings[0],
+            vector=embedding.tolist(),
         )
 
         if not response:
@@ -510,10 +812,40 @@ class PineconeDatabase(BaseVectorDatabaseModel):
                     content=doc,
                     title=str(metadata.get(DatabaseConstants.KEY_TITLE, "")),
                     metadata=metadata,
+                    id=match.get(DatabaseConstants.KEY_PINECONE_ID),
                 )
             )
         return documents
 
+    def query_by_embeddings(
+        self, embeddings: np.ndarray, user: Optional[str] = None
+    ) -> list[list[Document]]:
+        """Queries the database with many query vectors in parallel.
+
+        Pinecone takes one vector per query, so the queries are sent concurrently.
+
+        Args:
+            embeddings: A float matrix with one query vector per row.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with the documents for each query, in the order of the queries.
+
+        """
+        if not len(embeddings):
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(len(embeddings), DatabaseConstants.MAX_PARALLEL_QUERIES)
+        ) as executor:
+            return [
+                documents or []
+                for documents in executor.map(
+                    lambda embedding: self.query_by_embedding(embedding, user),
+                    embeddings,
+                )
+            ]
+
     def get_titles(self, user: Optional[str] = None) -> list[Optional[str]]:
         """Returns the titles owned by the user.
 
@@ -1,19 +1,46 @@
-from langchain_community.document_loaders import PyPDFLoader
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import math
+import multiprocessing
+from typing import Iterator, Optional
+from langchain.schema import Document as LangDocument
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
 
 from ragcore.dto.document_dto import DocumentDTO
 from ragcore.models.document_model import Document
+from ragcore.shared.constants import LoaderConstants
 
 
 class PDFLoader:
     """Class for the PDF loader.
 
+    With more than one worker, the pages of large files are split into ranges which are parsed in a
+    pool of processes. Each worker opens the file and extracts the text of its pages, so the extraction
+    uses several cores. The documents are returned in the order of the pages, with the same content and
+    metadata as with sequential loading, because all ways of loading extract the pages with the same
+    function. Files with fewer than ``2 * min_pages_per_worker`` pages are loaded sequentially, because
+    starting the processes would take longer than the extraction.
+
     Atrributes:
         file_path: The path to the PDF file to be loaded.
 
+        workers: The maximum number of processes which parse the file. With ``1``, the file is loaded
+            in the current process.
+
+        min_pages_per_worker: The minimum number of pages for each process.
+
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        workers: int = LoaderConstants.DEFAULT_WORKERS,
+        min_pages_per_worker: int = LoaderConstants.DEFAULT_MIN_PAGES_PER_WORKER,
+    ):
         self.file_path = file_path
+        self.workers = workers
+        self.min_pages_per_worker = max(min_pages_per_worker, 1)
 
     def load_and_split(self, title: str) -> list[Document]:
         """Loads a PDF file with the specified title from the file path.
@@ -28,10 +55,136 @@ class PDFLoader:
             A list of documents.
 
         """
-        lang_loader = PyPDFLoader(self.file_path)
-        lang_docs = lang_loader.load_and_split()
+        lang_docs = self._load_parallel() if self.workers > 1 else None
+        if lang_docs is None:
+            lang_docs = list(_iter_page_range(self.file_path))
 
         # TODO: Must add book page, not pdf page! # pylint: disable=fixme
         for i, _ in enumerate(lang_docs):
             lang_docs[i].metadata["title"] = title
         return DocumentDTO.to_ragcore_list(lang_docs)
+
+    def lazy_load_and_split(self, title: str) -> Iterator[Document]:
+        """Loads a PDF file page by page and yields its documents, like ``load_and_split``.
+
+        Only a few pages are held in memory at a time, so the memory does not grow with the size of
+        the file. Without workers, each page is extracted and split when the consumer reaches it. With
+        more than one worker, at most two page ranges per worker are extracted ahead of the consumer.
+
+        Args:
+            title: The title of the documents.
+
+        Returns:
+            An iterator over the documents, in the order of the pages.
+
+        """
+        lang_docs = self._iter_parallel() if self.workers > 1 else None
+        if lang_docs is None:
+            lang_docs = _iter_page_range(self.file_path)
+
+        for lang_doc in lang_docs:
+            lang_doc.metadata["title"] = title
+            yield from DocumentDTO.to_ragcore_list([lang_doc])
+
+    def _load_parallel(self) -> Optional[list[LangDocument]]:
+        """Loads the pages in a pool of processes, or returns None if the file is too small."""
+        lang_docs = self._iter_parallel()
+        return None if lang_docs is None else list(lang_docs)
+
+    def _iter_parallel(self) -> Optional[Iterator[LangDocument]]:
+        """Returns an iterator over the pages which are loaded in a pool of processes, or None if the file is too small."""
+        num_pages = len(PdfReader(self.file_path).pages)
+        num_workers = min(self.workers, num_pages // self.min_pages_per_worker)
+        if num_workers <= 1:
+            return None
+
+        # More ranges than workers balance pages which take longer, such as pages with many glyphs.
+        page_ranges = get_page_ranges(
+            num_pages,
+            min(
+                num_workers * LoaderConstants.RANGES_PER_WORKER,
+                num_pages // self.min_pages_per_worker,
+            ),
+        )
+        return self._iter_page_ranges(page_ranges, num_workers)
+
+    def _iter_page_ranges(
+        self, page_ranges: list[tuple[int, int]], num_workers: int
+    ) -> Iterator[LangDocument]:
+        """Yields the documents of page ranges which are extracted in a pool of processes, in order."""
+        # Forked processes can inherit locks held by threads of the parent, so new processes are spawned.
+        with ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            # Only a window of ranges is submitted, so that the results which are not consumed yet are bounded.
+            pending: deque[Future] = deque()
+            remaining = iter(page_ranges)
+            try:
+                while True:
+                    for start, end in remaining:
+                        pending.append(
+                            executor.submit(
+                                _load_page_range, self.file_path, start, end
+                            )
+                        )
+                        if len(pending) >= 2 * num_workers:
+                            break
+                    if not pending:
+                        return
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def get_page_ranges(num_pages: int, num_ranges: int) -> list[tuple[int, int]]:
+    """Splits the pages of a file into consecutive ranges of almost the same size.
+
+    Args:
+        num_pages: The number of pages.
+
+        num_ranges: The number of ranges.
+
+    Returns:
+        A list of ranges as tuples of the first page and the page after the last page.
+
+    """
+    if num_pages <= 0:
+        return []
+    num_ranges = max(min(num_ranges, num_pages), 1)
+    range_size = math.ceil(num_pages / num_ranges)
+    return [
+        (start, min(start + range_size, num_pages))
+        for start in range(0, num_pages, range_size)
+    ]
+
+
+def _load_page_range(file_path: str, start: int, end: int) -> list[LangDocument]:
+    """Extracts and splits the pages of a range.
+
+    It runs in a worker process, so it must be a function of the module.
+
+    """
+    return list(_iter_page_range(file_path, start, end))
+
+
+def _iter_page_range(
+    file_path: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[LangDocument]:
+    """Extracts and splits the pages of a range one page at a time.
+
+    All ways of loading a file use this function, so their documents are the same. Each page becomes a
+    document with the ``source`` and the ``page`` in the metadata, as with LangChain's ``PyPDFLoader``,
+    which is split with the default ``RecursiveCharacterTextSplitter``. The end is the page after the
+    last page, or None for all pages after ``start``.
+
+    """
+    reader = PdfReader(file_path)
+    splitter = RecursiveCharacterTextSplitter()
+    num_pages = len(reader.pages)
+    for page in range(start, num_pages if end is None else min(end, num_pages)):
+        doc = LangDocument(
+            page_content=reader.pages[page].extract_text(extraction_mode="plain"),
+            metadata={"source": file_path, "page": page},
+        )
+        yield from splitter.split_documents([doc])
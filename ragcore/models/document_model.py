@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional
 
 
 @dataclass
@@ -12,8 +12,33 @@ class Document:
         title: The title of the document.
 
         metadata: A mapping for the metadata.
+
+        id: The ID of the document in the database, if it has been retrieved from a database.
     """
 
     content: str
     title: str
     metadata: Mapping[str, Any]
+    id: Optional[str] = None
+
+
+@dataclass
+class UpdateStats:
+    """Model for the changes of an update of a document in the database.
+
+    Attributes:
+        num_documents: The number of chunks of the new version of the document.
+
+        num_embedded: The number of new or changed chunks which have been embedded and added.
+
+        num_unchanged: The number of chunks which were already in the database. Their metadata is updated
+            if it has changed, for example the page, but they are not embedded again.
+
+        num_deleted: The number of chunks which are not part of the new version and have been deleted.
+
+    """
+
+    num_documents: int
+    num_embedded: int
+    num_unchanged: int
+    num_deleted: int
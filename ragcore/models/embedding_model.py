@@ -1,9 +1,33 @@
 from abc import ABC, abstractmethod
+import asyncio
+import base64
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import os
-from openai import OpenAI, AzureOpenAI
-
-from ragcore.shared.utils import slice_list
+import queue
+import re
+import threading
+import time
+import numpy as np
+from typing import Any, Awaitable, Callable, Optional, TypeVar, Union
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI
+from openai._legacy_response import LegacyAPIResponse
+
+from ragcore.shared.cache import DiskCache
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+from ragcore.shared.endpoint_pool import EndpointPool
+from ragcore.shared.utils import batch_by_tokens, count_tokens, get_token_encoding
 from ragcore.shared.constants import EmbeddingConstants
+from ragcore.shared.errors import EmbeddingError
+
+T = TypeVar("T")
+
+# The format in which vectors are stored in the embedding cache.
+CACHE_VECTOR_FORMAT = "float32"
+
+# Marks the end of the texts in the queue of a ``BatchingEmbedding``.
+_STOP = object()
 
 
 class BaseEmbedding(ABC):
@@ -27,6 +51,40 @@ class BaseEmbedding(ABC):
 
         """
 
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Creates a list of embedding vectors for a list of text strings asynchronously.
+
+        The default implementation runs ``embed_texts`` in a thread, so that the event loop is not blocked.
+
+        Args:
+            texts: A list of strings to create embeddings from.
+
+        Returns:
+            A list of embedding vectors.
+
+        """
+        return await asyncio.to_thread(self.embed_texts, texts)
+
+    def embed_texts_array(self, texts: list[str]) -> np.ndarray:
+        """Creates a matrix of embedding vectors for a list of text strings.
+
+        The default implementation converts the result of ``embed_texts``. Subclasses can override it to
+        create the matrix without creating a Python float for every element.
+
+        Args:
+            texts: A list of strings to create embeddings from.
+
+        Returns:
+            A contiguous float32 matrix with one row for each text.
+
+        """
+        return np.asarray(self.embed_texts(texts), dtype=np.float32).reshape(
+            len(texts), -1
+        )
+
+    def close(self) -> None:
+        """Releases the threads and other resources of the embedding. The default implementation does nothing."""
+
 
 class BaseOpenAIEmbeddings(BaseEmbedding):
     """Base class for OpenAI and AzureOpenAI embeddings.
@@ -34,16 +92,48 @@ class BaseOpenAIEmbeddings(BaseEmbedding):
     A class to implement the embedding method ``embed_texts`` which is the same for
     both OpenAI embedding models and AzureOpenAI models.
 
+    Texts are packed into batches by their number of tokens, so that no request exceeds the token limit
+    of the provider, and the batches are sent concurrently.
+
     Attributes:
         client: The client for the embedding provider, either OpenAI or AzureOpenAI.
 
+        async_client: The asynchronous client for the embedding provider. It is created on first use.
+
+        max_concurrency: The maximum number of requests which are sent at the same time.
+
+        max_tokens_per_batch: The maximum total number of tokens of the texts in one request.
+
+        max_batch_size: The maximum number of texts in one request.
+
+        controller: An optional ``AdaptiveConcurrencyController`` through which all requests are sent. With
+            a controller, throttled and failed requests are retried by the controller instead of the client.
+
+        dimensions: An optional number of dimensions of the vectors, for models which support shortened
+            vectors, such as ``text-embedding-3-small``.
+
     """
 
     client: OpenAI | AzureOpenAI
+    async_client: Optional[AsyncOpenAI | AsyncAzureOpenAI]
     model: str
 
-    def __init__(self, client: OpenAI | AzureOpenAI) -> None:
-        self.client = client
+    def __init__(
+        self,
+        client: OpenAI | AzureOpenAI,
+        max_concurrency: int = EmbeddingConstants.DEFAULT_MAX_CONCURRENCY,
+        max_tokens_per_batch: int = EmbeddingConstants.DEFAULT_MAX_TOKENS_PER_BATCH,
+        max_batch_size: int = EmbeddingConstants.DEFAULT_MAX_BATCH_SIZE,
+        controller: Optional[AdaptiveConcurrencyController] = None,
+        dimensions: Optional[int] = None,
+    ) -> None:
+        self.controller = controller
+        self.dimensions = dimensions
+        self.client = client.with_options(max_retries=0) if controller else client
+        self.async_client = None
+        self.max_concurrency = max_concurrency
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_batch_size = max_batch_size
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
         """Create embedding vectors using the selected client.
@@ -55,18 +145,151 @@ class BaseOpenAIEmbeddings(BaseEmbedding):
             A list of embedding vectors, one vector for each text element.
 
         """
-        embedding_vectors = []
+        batches = self._get_batches(texts)
+
+        if len(batches) <= 1 or self.max_concurrency <= 1:
+            batch_vectors = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, len(batches))
+            ) as executor:
+                # Results of `map` are in the order of the batches.
+                batch_vectors = list(executor.map(self._embed_batch, batches))
+
+        return [vector for vectors in batch_vectors for vector in vectors]
 
-        query_slices: list[list[str]] = slice_list(texts, 200)
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Create embedding vectors asynchronously using the selected client.
+
+        The texts are batched like in ``embed_texts``, and at most ``max_concurrency`` requests are sent
+        at the same time.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
 
-        for query_slice in query_slices:
-            response = self.client.embeddings.create(
-                input=query_slice, model=self.model
+        """
+        semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        # Results of `gather` are in the order of the batches.
+        batch_vectors = await asyncio.gather(
+            *(embed_batch(batch) for batch in self._get_batches(texts))
+        )
+        return [vector for vectors in batch_vectors for vector in vectors]
+
+    def embed_texts_array(self, texts: list[str]) -> np.ndarray:
+        """Create a matrix of embedding vectors using the selected client.
+
+        The vectors are requested in the base64 wire format, which is decoded directly into a float32
+        matrix, so that no Python float is created for each element.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A contiguous float32 matrix with one row for each text element.
+
+        """
+        batches = self._get_batches(texts)
+
+        if len(batches) <= 1 or self.max_concurrency <= 1:
+            batch_matrices = [self._embed_batch_array(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, len(batches))
+            ) as executor:
+                batch_matrices = list(executor.map(self._embed_batch_array, batches))
+
+        if not batch_matrices:
+            return np.empty((0, 0), dtype=np.float32)
+        if len(batch_matrices) == 1:
+            return batch_matrices[0]
+        return np.concatenate(batch_matrices)
+
+    def _get_batches(self, texts: list[str]) -> list[list[str]]:
+        """Packs the texts into batches by their number of tokens."""
+        token_counts = count_tokens(texts, get_token_encoding(self.model))
+        return [
+            texts[start:end]
+            for start, end in batch_by_tokens(
+                token_counts, self.max_tokens_per_batch, self.max_batch_size
             )
-            for i in range(len(query_slice)):
-                embedding_vectors.append(response.data[i].embedding)
+        ]
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Creates the embedding vectors for one batch with a single request."""
+        response = self._create_embeddings(input=texts, model=self.model)
+        return [response.data[i].embedding for i in range(len(texts))]
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Creates the embedding vectors for one batch with a single asynchronous request."""
+        response = await self._acreate_embeddings(input=texts, model=self.model)
+        return [response.data[i].embedding for i in range(len(texts))]
+
+    def _create_embeddings(self, **kwargs: Any) -> Any:
+        """Sends an embedding request, through the concurrency controller if there is one."""
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+        if not self.controller:
+            return self._call_client(lambda client: client.embeddings.create(**kwargs))
+        raw_response: LegacyAPIResponse[Any] = self.controller.call(
+            self._call_client,
+            lambda client: client.embeddings.with_raw_response.create(**kwargs),
+        )
+        return raw_response.parse()
+
+    async def _acreate_embeddings(self, **kwargs: Any) -> Any:
+        """Sends an asynchronous embedding request, through the concurrency controller if there is one."""
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+        if not self.controller:
+            return await self._acall_client(
+                lambda client: client.embeddings.create(**kwargs)
+            )
+        raw_response: LegacyAPIResponse[Any] = await self.controller.acall(
+            self._acall_client,
+            lambda client: client.embeddings.with_raw_response.create(**kwargs),
+        )
+        return raw_response.parse()
+
+    def _call_client(self, function: Callable[[Any], T]) -> T:
+        """Calls a function which makes a request with the client."""
+        return function(self.client)
+
+    async def _acall_client(self, function: Callable[[Any], Awaitable[T]]) -> T:
+        """Awaits a coroutine function which makes a request with the asynchronous client."""
+        if not self.async_client:
+            async_client = self._create_async_client()
+            self.async_client = (
+                async_client.with_options(max_retries=0)
+                if self.controller
+                else async_client
+            )
+        return await function(self.async_client)
+
+    @abstractmethod
+    def _create_async_client(self) -> AsyncOpenAI | AsyncAzureOpenAI:
+        """Creates the asynchronous client for the embedding provider."""
+
+    def _embed_batch_array(self, texts: list[str]) -> np.ndarray:
+        """Creates the embedding matrix for one batch with a single base64 encoded request."""
+        response = self._create_embeddings(
+            input=texts, model=self.model, encoding_format="base64"
+        )
+        embeddings = [response.data[i].embedding for i in range(len(texts))]
 
-        return embedding_vectors
+        # Some deployments ignore the requested format and return floats.
+        if all(isinstance(embedding, str) for embedding in embeddings):
+            buffer = b"".join(base64.b64decode(embedding) for embedding in embeddings)
+            matrix = np.frombuffer(buffer, dtype="<f4").reshape(len(texts), -1)
+            return matrix.astype(np.float32, copy=False)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
 
 
 class OpenAIEmbedding(BaseOpenAIEmbeddings):
@@ -79,12 +302,36 @@ class OpenAIEmbedding(BaseOpenAIEmbeddings):
     Attributes:
         model: The string for the model which should be used, as specified by OpenAI.
 
+        max_concurrency: The maximum number of requests which are sent at the same time.
+
+        max_tokens_per_batch: The maximum total number of tokens of the texts in one request.
+
+        controller: An optional ``AdaptiveConcurrencyController`` through which all requests are sent.
+
+        dimensions: An optional number of dimensions of the vectors, for models which support it.
+
     """
 
-    def __init__(self, model: str):
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int = EmbeddingConstants.DEFAULT_MAX_CONCURRENCY,
+        max_tokens_per_batch: int = EmbeddingConstants.DEFAULT_MAX_TOKENS_PER_BATCH,
+        controller: Optional[AdaptiveConcurrencyController] = None,
+        dimensions: Optional[int] = None,
+    ):
         self.model = model
         client = OpenAI()  # Openai api key env variable must be set.
-        super().__init__(client)
+        super().__init__(
+            client,
+            max_concurrency=max_concurrency,
+            max_tokens_per_batch=max_tokens_per_batch,
+            controller=controller,
+            dimensions=dimensions,
+        )
+
+    def _create_async_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI()  # Openai api key env variable must be set.
 
 
 class AzureOpenAIEmbedding(BaseOpenAIEmbeddings):
@@ -92,6 +339,9 @@ class AzureOpenAIEmbedding(BaseOpenAIEmbeddings):
 
     Note that you must have your API key for OpenAI ``AZURE_OPENAI_API_KEY`` set.
 
+    With an ``EndpointPool``, requests are spread over several endpoints, for example regional deployments
+    with their own quota. Each endpoint has its own clients.
+
     For more information see: https://learn.microsoft.com/en-us/azure/ai-services/openai/concepts/models#embeddings-models
 
     Attributes:
@@ -99,15 +349,469 @@ class AzureOpenAIEmbedding(BaseOpenAIEmbeddings):
 
         api_version: The version string of the deployment.
 
-        endpoint: The endpoint of the deployment.
+        endpoint: The endpoint of the deployment. Defaults to the first endpoint of the pool.
+
+        max_concurrency: The maximum number of requests which are sent at the same time.
+
+        max_tokens_per_batch: The maximum total number of tokens of the texts in one request.
+
+        controller: An optional ``AdaptiveConcurrencyController`` through which all requests are sent.
+
+        dimensions: An optional number of dimensions of the vectors, for models which support it.
+
+        endpoint_pool: An optional ``EndpointPool`` which selects the endpoint of each request.
 
     """
 
-    def __init__(self, model: str, api_version: str, endpoint: str):
+    def __init__(
+        self,
+        model: str,
+        api_version: str,
+        endpoint: Optional[str],
+        max_concurrency: int = EmbeddingConstants.DEFAULT_MAX_CONCURRENCY,
+        max_tokens_per_batch: int = EmbeddingConstants.DEFAULT_MAX_TOKENS_PER_BATCH,
+        controller: Optional[AdaptiveConcurrencyController] = None,
+        dimensions: Optional[int] = None,
+        endpoint_pool: Optional[EndpointPool] = None,
+    ):
         self.model = model
-        client = AzureOpenAI(
+        self.api_version = api_version
+        self.endpoint = endpoint or (
+            endpoint_pool.endpoints[0] if endpoint_pool else None
+        )
+        self.endpoint_pool = endpoint_pool
+        self._endpoint_clients: dict[str, AzureOpenAI] = {}
+        self._endpoint_async_clients: dict[str, AsyncAzureOpenAI] = {}
+        super().__init__(
+            self._create_client(AzureOpenAI, self.endpoint),
+            max_concurrency=max_concurrency,
+            max_tokens_per_batch=max_tokens_per_batch,
+            controller=controller,
+            dimensions=dimensions,
+        )
+
+    def _create_async_client(self) -> AsyncAzureOpenAI:
+        return self._create_client(AsyncAzureOpenAI, self.endpoint)
+
+    def _call_client(self, function: Callable[[Any], T]) -> T:
+        """Calls a function with the client of the endpoint which is selected by the endpoint pool."""
+        if not self.endpoint_pool:
+            return super()._call_client(function)
+        return self.endpoint_pool.call(
+            lambda endpoint: function(self._get_endpoint_client(endpoint))
+        )
+
+    async def _acall_client(self, function: Callable[[Any], Awaitable[T]]) -> T:
+        """Awaits a coroutine function with the asynchronous client of the endpoint which is selected by the endpoint pool."""
+        if not self.endpoint_pool:
+            return await super()._acall_client(function)
+        return await self.endpoint_pool.acall(
+            lambda endpoint: function(self._get_endpoint_async_client(endpoint))
+        )
+
+    def _get_endpoint_client(self, endpoint: str) -> AzureOpenAI:
+        """Returns the client for an endpoint of the pool, which is created on first use."""
+        if endpoint not in self._endpoint_clients:
+            client = self._create_client(AzureOpenAI, endpoint)
+            self._endpoint_clients[endpoint] = (
+                client.with_options(max_retries=0) if self.controller else client
+            )
+        return self._endpoint_clients[endpoint]
+
+    def _get_endpoint_async_client(self, endpoint: str) -> AsyncAzureOpenAI:
+        """Returns the asynchronous client for an endpoint of the pool, which is created on first use."""
+        if endpoint not in self._endpoint_async_clients:
+            async_client = self._create_client(AsyncAzureOpenAI, endpoint)
+            self._endpoint_async_clients[endpoint] = (
+                async_client.with_options(max_retries=0)
+                if self.controller
+                else async_client
+            )
+        return self._endpoint_async_clients[endpoint]
+
+    def _create_client(self, client_class: type, endpoint: Optional[str]) -> Any:
+        """Creates a client of the given class for an endpoint."""
+        return client_class(
             api_key=os.getenv(EmbeddingConstants.KEY_AZURE_OPENAI_API_KEY),
-            api_version=api_version,
+            api_version=self.api_version,
             azure_endpoint=endpoint,
         )
-        super().__init__(client)
+
+
+class LocalEmbedding(BaseEmbedding):
+    """Class for a local embedding model which runs on the CPU without network requests.
+
+    Texts are represented by hashed features: lowercase words and the character trigrams of each word
+    are mapped to one of ``dimensions`` components with a signed hash. The counts are dampened
+    logarithmically and each vector is normalized to unit length. The hash is independent of the Python
+    process, so the same text always has the same vector. This makes the model useful for offline and
+    air-gapped setups, and for reproducible benchmarks of the pipeline.
+
+    Attributes:
+        model: A name for the model. It is used to identify the model, for example in caches.
+
+        dimensions: The number of components of each vector.
+
+    """
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int = EmbeddingConstants.LOCAL_DEFAULT_DIMENSIONS,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Creates embedding vectors from hashed word and character features.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
+
+        """
+        return self.embed_texts_array(texts).tolist()
+
+    def embed_texts_array(self, texts: list[str]) -> np.ndarray:
+        """Creates a matrix of embedding vectors from hashed word and character features.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A contiguous float32 matrix with one row for each text element.
+
+        """
+        rows: list[int] = []
+        hashes: list[int] = []
+
+        for row, text in enumerate(texts):
+            for feature in _get_features(text):
+                rows.append(row)
+                hashes.append(_hash_feature(feature))
+
+        hash_array = np.array(hashes, dtype=np.uint64)
+        columns = (hash_array % np.uint64(self.dimensions)).astype(np.intp)
+        # The highest bit decides the sign, so that collisions tend to cancel out.
+        signs = np.where(hash_array >> np.uint64(63), -1.0, 1.0)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), columns), signs)
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _get_features(text: str) -> list[str]:
+    """Returns the words of a text and the character trigrams of each word."""
+    features = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        features.append(word)
+        padded = f"<{word}>"
+        features.extend("#" + padded[i : i + 3] for i in range(max(len(padded) - 2, 1)))
+    return features
+
+
+@lru_cache(maxsize=2**16)
+def _hash_feature(feature: str) -> int:
+    """Returns a hash of a feature which is the same in every process."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embedding with a persistent, content-addressed cache in front of another embedding.
+
+    Vectors are cached on disk under a key which is derived from the provider, the model, and a hash of
+    the text. Only texts which are not in the cache are sent to the wrapped embedding, so re-ingesting a
+    document or repeating a query does not create new requests to the provider.
+
+    Attributes:
+        embedding: The wrapped embedding of type ``BaseEmbedding``.
+
+        provider: The provider of the wrapped embedding.
+
+        model: The model of the wrapped embedding.
+
+        cache: The ``DiskCache`` in which the vectors are stored.
+
+        dimensions: The number of dimensions of the vectors, if the model was configured with it.
+
+    """
+
+    def __init__(
+        self,
+        embedding: BaseEmbedding,
+        provider: str,
+        model: str,
+        cache: DiskCache,
+        dimensions: Optional[int] = None,
+    ):
+        self.embedding = embedding
+        self.provider = provider
+        self.model = model
+        self.cache = cache
+        self.dimensions = dimensions
+
+    def close(self) -> None:
+        """Closes the wrapped embedding."""
+        self.embedding.close()
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Returns the cached vectors and creates vectors for texts which are not in the cache yet.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
+
+        """
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            self._store(
+                cached, missing, self.embedding.embed_texts(list(missing.values()))
+            )
+        return [_decode_vector(cached[key]).tolist() for key in keys]
+
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Returns the cached vectors and creates vectors asynchronously for texts which are not in the cache yet.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
+
+        """
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            self._store(
+                cached,
+                missing,
+                await self.embedding.aembed_texts(list(missing.values())),
+            )
+        return [_decode_vector(cached[key]).tolist() for key in keys]
+
+    def embed_texts_array(self, texts: list[str]) -> np.ndarray:
+        """Returns the cached vectors as a matrix and creates vectors for texts which are not in the cache yet.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A contiguous float32 matrix with one row for each text element.
+
+        """
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            self._store(
+                cached,
+                missing,
+                self.embedding.embed_texts_array(list(missing.values())),
+            )
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([_decode_vector(cached[key]) for key in keys])
+
+    def _lookup(
+        self, texts: list[str]
+    ) -> tuple[list[str], dict[str, bytes], dict[str, str]]:
+        """Returns the keys of the texts, the cached entries, and the texts which are not cached by key.
+
+        Texts can appear more than once, but each missing text is embedded only once.
+
+        """
+        keys = [self._get_key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        return keys, cached, missing
+
+    def _store(
+        self,
+        cached: dict[str, bytes],
+        missing: dict[str, str],
+        vectors: Union[list[list[float]], np.ndarray],
+    ) -> None:
+        """Stores the vectors of the missing texts in the cache, and adds them to the cached entries."""
+        new_entries = {
+            key: np.asarray(vector, dtype=np.float32).tobytes()
+            for key, vector in zip(missing.keys(), vectors)
+        }
+        self.cache.set_many(new_entries)
+        cached.update(new_entries)
+
+    def _get_key(self, text: str) -> str:
+        """Returns the cache key for a text."""
+        # The format is part of the key, so that entries of an older format are not decoded as float32.
+        content = "\x00".join(
+            [
+                self.provider,
+                self.model,
+                str(self.dimensions or ""),
+                CACHE_VECTOR_FORMAT,
+                text,
+            ]
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _decode_vector(value: bytes) -> np.ndarray:
+    """Decodes a vector which is stored in the cache as float32 bytes."""
+    return np.frombuffer(value, dtype=np.float32)
+
+
+class BatchingEmbedding(BaseEmbedding):
+    """Embedding which coalesces concurrent single-text requests into batched requests.
+
+    Queries are embedded one at a time, so under load many requests with a single text are made, each
+    dominated by the overhead of the request. This embedding collects the single texts which arrive
+    within a short window, embeds them with one request to the wrapped embedding, and hands each caller
+    its vector. Requests with more than one text, for example during ingestion, are passed through.
+
+    Attributes:
+        embedding: The wrapped embedding of type ``BaseEmbedding``.
+
+        window_ms: The time in milliseconds to wait for more texts after the first text of a batch arrived.
+
+        max_batch_size: The maximum number of texts in a batch. A full batch is sent without waiting.
+
+        max_concurrency: The maximum number of batches which are embedded at the same time.
+
+    """
+
+    def __init__(
+        self,
+        embedding: BaseEmbedding,
+        window_ms: float,
+        max_batch_size: int = EmbeddingConstants.DEFAULT_BATCH_MAX_SIZE,
+        max_concurrency: int = EmbeddingConstants.DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.embedding = embedding
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(max_concurrency, 1))
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+
+    def close(self) -> None:
+        """Stops the dispatcher thread and the executor, and closes the wrapped embedding.
+
+        Batches which have been dispatched are still embedded. Single texts cannot be embedded after the
+        embedding is closed.
+
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            dispatcher = self._dispatcher
+        if dispatcher:
+            self._queue.put(_STOP)
+            dispatcher.join()
+        self._executor.shutdown(wait=False)
+        self.embedding.close()
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Creates embedding vectors, batching single texts with those of concurrent callers.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
+
+        """
+        if len(texts) != 1:
+            return self.embedding.embed_texts(texts)
+        return [self._submit(texts[0]).result().tolist()]
+
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Creates embedding vectors asynchronously, batching single texts with those of concurrent callers.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A list of embedding vectors, one vector for each text element.
+
+        """
+        if len(texts) != 1:
+            return await self.embedding.aembed_texts(texts)
+        vector = await asyncio.wrap_future(self._submit(texts[0]))
+        return [vector.tolist()]
+
+    def embed_texts_array(self, texts: list[str]) -> np.ndarray:
+        """Creates a matrix of embedding vectors, batching single texts with those of concurrent callers.
+
+        Args:
+            texts: A list of text strings.
+
+        Returns:
+            A contiguous float32 matrix with one row for each text element.
+
+        """
+        if len(texts) != 1:
+            return self.embedding.embed_texts_array(texts)
+        return self._submit(texts[0]).result().reshape(1, -1)
+
+    def _submit(self, text: str) -> Future:
+        """Queues a text and returns a future for its vector."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise EmbeddingError(
+                    "Tried to embed a text, but the embedding is closed."
+                )
+            if not self._dispatcher:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+            # Texts are queued with the lock held, so that no text is queued after the stop marker.
+            self._queue.put((text, future))
+        return future
+
+    def _dispatch(self) -> None:
+        """Collects queued texts into batches and hands them to the executor, until ``close`` is called."""
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+
+            self._executor.submit(self._embed_batch, batch)
+
+    def _embed_batch(self, batch: list[tuple[str, Future]]) -> None:
+        """Embeds a batch with one request and sets the result of each future."""
+        try:
+            matrix = self.embedding.embed_texts_array([text for text, _ in batch])
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        for (_, future), vector in zip(batch, matrix):
+            future.set_result(vector)
@@ -1,9 +1,23 @@
 from abc import ABC, abstractmethod
+import asyncio
+import hashlib
 import os
-from typing import Optional
-from openai import OpenAI, AzureOpenAI
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+from openai import AsyncAzureOpenAI, AsyncOpenAI, OpenAI, AzureOpenAI
+from openai._legacy_response import LegacyAPIResponse
 
-from ragcore.shared.constants import ConfigurationConstants, LLMProviderConstants
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+from ragcore.shared.constants import (
+    ConfigurationConstants,
+    EndpointConstants,
+    LLMProviderConstants,
+)
+from ragcore.shared.endpoint_pool import EndpointPool
+
+T = TypeVar("T")
 
 
 class BaseLLMModel(ABC):
@@ -19,7 +33,12 @@ class BaseLLMModel(ABC):
 
         llm_model: The llm from the provder as a string, as specified by the provider.
 
-        llm_config: Configuration for the LLM.
+        llm_config: Configuration for the LLM. An empty dict if there is no configuration.
+
+        controller: An optional ``AdaptiveConcurrencyController`` through which all requests are sent. With
+            a controller, throttled and failed requests are retried by the controller instead of the client.
+
+        async_llm: The asynchronous client for the LLM provider. It is created on first use.
 
     """
 
@@ -28,28 +47,130 @@ class BaseLLMModel(ABC):
         llm_provider: str,
         llm_model: str,
         llm_config: Optional[dict[str, str]],
+        controller: Optional[AdaptiveConcurrencyController] = None,
     ):
         self.llm_provider = llm_provider
         self.llm_model = llm_model
-        self.llm_config = llm_config
-        self.llm = self._get_llm()
+        self.llm_config: dict[str, str] = llm_config or {}
+        self.controller = controller
+        llm = self._get_llm()
+        self.llm = llm.with_options(max_retries=0) if controller and llm else llm
+        self.async_llm: Optional[AsyncOpenAI | AsyncAzureOpenAI] = None
 
     @abstractmethod
     def _get_llm(self):
         """Initializes the LLM."""
 
     @abstractmethod
-    def request(self, text: str) -> str:
+    def _get_async_llm(self) -> AsyncOpenAI | AsyncAzureOpenAI:
+        """Initializes the asynchronous client for the LLM."""
+
+    @abstractmethod
+    def request(self, text: str, system_prompt: Optional[str] = None) -> str:
         """Perform a request to an LLM and return the response.
 
         Args:
             text: A string with the request for the LLM.
 
+            system_prompt: An optional system message, which is sent before the request.
+
         Returns:
             A response from the llm as a string.
 
         """
 
+    async def arequest(self, text: str, system_prompt: Optional[str] = None) -> str:
+        """Perform an asynchronous request to an LLM and return the response.
+
+        The request is sent with the asynchronous client of the provider. If the task is cancelled,
+        the request is cancelled as well.
+
+        Args:
+            text: A string with the request for the LLM.
+
+            system_prompt: An optional system message, which is sent before the request.
+
+        Returns:
+            A response from the llm as a string.
+
+        """
+        response = await self._acreate_completion(
+            model=self.llm_model,
+            messages=_get_messages(text, system_prompt),
+        )
+        return response.choices[0].message.content
+
+    def request_stream(
+        self, text: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """Perform a streaming request to an LLM and yield the response as it is generated.
+
+        Args:
+            text: A string with the request for the LLM.
+
+            system_prompt: An optional system message, which is sent before the request.
+
+        Returns:
+            An iterator over the parts of the response, in the order in which they arrive. If the iterator
+            is closed before the end of the response, the stream of the provider is closed.
+
+        """
+        stream = self._create_completion(
+            model=self.llm_model,
+            messages=_get_messages(text, system_prompt),
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                # Some chunks, for example the content filter results of Azure OpenAI, have no choices.
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            # Releases the HTTP connection, also if the consumer stops early.
+            stream.close()
+
+    def _create_completion(self, **kwargs: Any) -> Any:
+        """Sends a chat completion request, through the concurrency controller if there is one.
+
+        For streaming requests, the controller limits the requests until the response has started.
+
+        """
+        if not self.controller:
+            return self._call_llm(lambda llm: llm.chat.completions.create(**kwargs))
+        raw_response: LegacyAPIResponse[Any] = self.controller.call(
+            self._call_llm,
+            lambda llm: llm.chat.completions.with_raw_response.create(**kwargs),
+        )
+        return raw_response.parse()
+
+    async def _acreate_completion(self, **kwargs: Any) -> Any:
+        """Sends an asynchronous chat completion request, through the concurrency controller if there is one."""
+        if not self.controller:
+            return await self._acall_llm(
+                lambda llm: llm.chat.completions.create(**kwargs)
+            )
+        raw_response: LegacyAPIResponse[Any] = await self.controller.acall(
+            self._acall_llm,
+            lambda llm: llm.chat.completions.with_raw_response.create(**kwargs),
+        )
+        return raw_response.parse()
+
+    def _call_llm(self, function: Callable[[Any], T]) -> T:
+        """Calls a function which makes a request with the client of the LLM."""
+        return function(self.llm)
+
+    async def _acall_llm(self, function: Callable[[Any], Awaitable[T]]) -> T:
+        """Awaits a coroutine function which makes a request with the asynchronous client of the LLM."""
+        if not self.async_llm:
+            async_llm = self._get_async_llm()
+            self.async_llm = (
+                async_llm.with_options(max_retries=0) if self.controller else async_llm
+            )
+        return await function(self.async_llm)
+
 
 class OpenAIModel(BaseLLMModel):
     """Class to interact with OpenAI LLMs.
@@ -63,19 +184,24 @@ class OpenAIModel(BaseLLMModel):
     def _get_llm(self):
         return OpenAI(api_key=os.getenv(LLMProviderConstants.KEY_OPENAI_API_KEY))
 
-    def request(self, text: str) -> str:
+    def _get_async_llm(self):
+        return AsyncOpenAI(api_key=os.getenv(LLMProviderConstants.KEY_OPENAI_API_KEY))
+
+    def request(self, text: str, system_prompt: Optional[str] = None) -> str:
         """Perform a request with an OpenAI LLM.
 
         Args:
             text: The text string for the request.
 
+            system_prompt: An optional system message, which is sent before the request.
+
         Returns:
             The response string from the LLM.
 
         """
-        response = self.llm.chat.completions.create(
+        response = self._create_completion(
             model=self.llm_model,
-            messages=[{"role": "user", "content": text}],
+            messages=_get_messages(text, system_prompt),
         )
         return response.choices[0].message.content
 
@@ -85,33 +211,266 @@ class AzureOpenAIModel(BaseLLMModel):
 
     Make sure to have your API key set in the environment as ``AZURE_OPENAI_API_KEY``.
 
+    If the configuration has a list of ``endpoints``, for example regional deployments with their own
+    quota, requests are spread over the endpoints by an ``EndpointPool``. Each endpoint has its own clients.
+
     For more information, see: https://learn.microsoft.com/en-us/azure/ai-services/openai/concepts/models
 
+    Attributes:
+        endpoint_pool: The ``EndpointPool`` which selects the endpoint of each request, or None if a single
+            endpoint is configured.
+
     """
 
-    def _get_llm(self):
-        return AzureOpenAI(
-            api_key=os.getenv(LLMProviderConstants.KEY_AZURE_OPENAI_API_KEY),
-            api_version=self.llm_config.get(
-                ConfigurationConstants.KEY_AZURE_OPENAI_API_VERSION
-            ),
-            azure_endpoint=self.llm_config.get(
-                ConfigurationConstants.KEY_AZURE_OPENAI_AZURE_ENDPOINT
-            ),
+    def __init__(
+        self,
+        llm_provider: str,
+        llm_model: str,
+        llm_config: Optional[dict[str, Any]],
+        controller: Optional[AdaptiveConcurrencyController] = None,
+    ):
+        llm_config = llm_config or {}
+        endpoints = llm_config.get(ConfigurationConstants.KEY_ENDPOINTS)
+        self.endpoint_pool = (
+            EndpointPool(
+                endpoints,
+                routing=llm_config.get(ConfigurationConstants.KEY_ENDPOINT_ROUTING)
+                or EndpointConstants.ROUTING_LEAST_OUTSTANDING,
+                max_errors=llm_config.get(
+                    ConfigurationConstants.KEY_ENDPOINT_MAX_ERRORS
+                )
+                or EndpointConstants.DEFAULT_MAX_ERRORS,
+                ejection_seconds=llm_config.get(
+                    ConfigurationConstants.KEY_ENDPOINT_EJECTION_SECONDS,
+                    EndpointConstants.DEFAULT_EJECTION_SECONDS,
+                ),
+            )
+            if endpoints
+            else None
         )
+        self._endpoint_llms: dict[str, AzureOpenAI] = {}
+        self._endpoint_async_llms: dict[str, AsyncAzureOpenAI] = {}
+        super().__init__(llm_provider, llm_model, llm_config, controller=controller)
+
+    def _get_llm(self):
+        return self._create_client(AzureOpenAI, self._get_default_endpoint())
 
-    def request(self, text: str) -> str:
+    def _get_async_llm(self):
+        return self._create_client(AsyncAzureOpenAI, self._get_default_endpoint())
+
+    def request(self, text: str, system_prompt: Optional[str] = None) -> str:
         """Perform a request with an Azure OpenAI LLM.
 
         Args:
             text: The text string for the request.
 
+            system_prompt: An optional system message, which is sent before the request.
+
         Returns:
             The response string from the LLM.
 
         """
-        response = self.llm.chat.completions.create(
+        response = self._create_completion(
             model=self.llm_model,
-            messages=[{"role": "user", "content": text}],
+            messages=_get_messages(text, system_prompt),
         )
         return response.choices[0].message.content
+
+    def _call_llm(self, function: Callable[[Any], T]) -> T:
+        """Calls a function with the client of the endpoint which is selected by the endpoint pool."""
+        if not self.endpoint_pool:
+            return super()._call_llm(function)
+        return self.endpoint_pool.call(
+            lambda endpoint: function(self._get_endpoint_llm(endpoint))
+        )
+
+    async def _acall_llm(self, function: Callable[[Any], Awaitable[T]]) -> T:
+        """Awaits a coroutine function with the asynchronous client of the endpoint which is selected by the endpoint pool."""
+        if not self.endpoint_pool:
+            return await super()._acall_llm(function)
+        return await self.endpoint_pool.acall(
+            lambda endpoint: function(self._get_endpoint_async_llm(endpoint))
+        )
+
+    def _get_default_endpoint(self) -> Optional[str]:
+        """Returns the configured endpoint, or the first endpoint of the pool."""
+        endpoint = self.llm_config.get(
+            ConfigurationConstants.KEY_AZURE_OPENAI_AZURE_ENDPOINT
+        )
+        if not endpoint and self.endpoint_pool:
+            return self.endpoint_pool.endpoints[0]
+        return endpoint
+
+    def _get_endpoint_llm(self, endpoint: str) -> AzureOpenAI:
+        """Returns the client for an endpoint of the pool, which is created on first use."""
+        if endpoint not in self._endpoint_llms:
+            llm = self._create_client(AzureOpenAI, endpoint)
+            self._endpoint_llms[endpoint] = (
+                llm.with_options(max_retries=0) if self.controller else llm
+            )
+        return self._endpoint_llms[endpoint]
+
+    def _get_endpoint_async_llm(self, endpoint: str) -> AsyncAzureOpenAI:
+        """Returns the asynchronous client for an endpoint of the pool, which is created on first use."""
+        if endpoint not in self._endpoint_async_llms:
+            async_llm = self._create_client(AsyncAzureOpenAI, endpoint)
+            self._endpoint_async_llms[endpoint] = (
+                async_llm.with_options(max_retries=0) if self.controller else async_llm
+            )
+        return self._endpoint_async_llms[endpoint]
+
+    def _create_client(self, client_class: type, endpoint: Optional[str]) -> Any:
+        """Creates a client of the given class for an endpoint."""
+        return client_class(
+            api_key=os.getenv(LLMProviderConstants.KEY_AZURE_OPENAI_API_KEY),
+            api_version=self.llm_config.get(
+                ConfigurationConstants.KEY_AZURE_OPENAI_API_VERSION
+            ),
+            azure_endpoint=endpoint,
+        )
+
+
+class LocalLLMModel(BaseLLMModel):
+    """Class for an offline LLM which runs in the process without network requests.
+
+    The model does not generate text. It answers with words which are picked from the prompt with a
+    random generator seeded by a hash of the prompt, so the same prompt always has the same response.
+    Before the response is returned, the model waits for a simulated latency until the first token and
+    for each token at a simulated token rate, where a token is a word. This makes it possible to benchmark
+    and load test the whole pipeline without credentials, and to measure the overhead of ragcore itself.
+    With a concurrency controller, the simulated time until the first token is spent through the
+    controller, so that it limits the local requests in flight like the requests to a provider.
+
+    Attributes:
+        latency_seconds: The simulated time in seconds until the first token.
+
+        tokens_per_second: The simulated number of generated tokens per second, or None to return all
+            tokens at once.
+
+        response_tokens: The number of tokens in each response.
+
+    """
+
+    def __init__(
+        self,
+        llm_provider: str,
+        llm_model: str,
+        llm_config: Optional[dict[str, Any]],
+        controller: Optional[AdaptiveConcurrencyController] = None,
+    ):
+        super().__init__(llm_provider, llm_model, llm_config, controller=controller)
+        llm_config = llm_config or {}
+        self.latency_seconds = (
+            llm_config.get(ConfigurationConstants.KEY_LLM_SIMULATED_LATENCY_SECONDS)
+            or 0.0
+        )
+        self.tokens_per_second = llm_config.get(
+            ConfigurationConstants.KEY_LLM_SIMULATED_TOKENS_PER_SECOND
+        )
+        self.response_tokens = (
+            llm_config.get(ConfigurationConstants.KEY_LLM_SIMULATED_RESPONSE_TOKENS)
+            or LLMProviderConstants.DEFAULT_LOCAL_RESPONSE_TOKENS
+        )
+
+    def _get_llm(self):
+        """The local model has no client."""
+        return None
+
+    def _get_async_llm(self):
+        """The local model has no client."""
+        return None
+
+    def request(self, text: str, system_prompt: Optional[str] = None) -> str:
+        """Returns the deterministic response for a text after the simulated generation time.
+
+        Args:
+            text: The text string for the request.
+
+            system_prompt: An optional system message, which is sent before the request.
+
+        Returns:
+            The response string.
+
+        """
+        tokens = self._get_response_tokens(text, system_prompt)
+        self._wait(self._get_generation_seconds(len(tokens)))
+        return " ".join(tokens)
+
+    async def arequest(self, text: str, system_prompt: Optional[str] = None) -> str:
+        """Returns the deterministic response for a text after the simulated generation time, without blocking the event loop.
+
+        Args:
+            text: The text string for the request.
+
+            system_prompt: An optional system message, which is sent before the request.
+
+        Returns:
+            The response string.
+
+        """
+        tokens = self._get_response_tokens(text, system_prompt)
+        await self._await(self._get_generation_seconds(len(tokens)))
+        return " ".join(tokens)
+
+    def request_stream(
+        self, text: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """Yields the deterministic response for a text token by token at the simulated token rate.
+
+        Args:
+            text: The text string for the request.
+
+            system_prompt: An optional system message, which is sent before the request.
+
+        Returns:
+            An iterator over the tokens of the response. Joined, they are equal to the response of ``request``.
+
+        """
+        tokens = self._get_response_tokens(text, system_prompt)
+        self._wait(self.latency_seconds)
+        for index, token in enumerate(tokens):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield token if index == 0 else " " + token
+
+    def _wait(self, seconds: float) -> None:
+        """Sleeps for a simulated time, through the concurrency controller if there is one."""
+        if self.controller:
+            self.controller.call(time.sleep, seconds)
+        else:
+            time.sleep(seconds)
+
+    async def _await(self, seconds: float) -> None:
+        """Sleeps for a simulated time without blocking the event loop, through the concurrency controller if there is one."""
+        if self.controller:
+            await self.controller.acall(asyncio.sleep, seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _get_response_tokens(
+        self, text: str, system_prompt: Optional[str]
+    ) -> list[str]:
+        """Returns the tokens of the response, picked from the words of the text."""
+        words = LOCAL_WORD_PATTERN.findall(text) or [self.llm_model or "response"]
+        seed = hashlib.sha256(
+            "\x00".join([system_prompt or "", text]).encode("utf-8")
+        ).digest()
+        generator = random.Random(seed)
+        return [generator.choice(words) for _ in range(self.response_tokens)]
+
+    def _get_generation_seconds(self, number_tokens: int) -> float:
+        """Returns the simulated time in seconds to generate a number of tokens."""
+        if not self.tokens_per_second:
+            return self.latency_seconds
+        return self.latency_seconds + number_tokens / self.tokens_per_second
+
+
+LOCAL_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _get_messages(text: str, system_prompt: Optional[str]) -> list[dict[str, str]]:
+    """Returns the chat messages for a request, with the system message first if there is one."""
+    messages = [{"role": "user", "content": text}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    return messages
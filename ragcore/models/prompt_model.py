@@ -1,16 +1,69 @@
+from typing import Optional
+from jinja2 import Environment, StrictUndefined, Template, TemplateError
+
+from ragcore.shared.errors import UserConfigurationError
+
+DEFAULT_SYSTEM_TEMPLATE = """You are a helpful assistant which answers questions about documents.
+Use only the pieces of context which are provided in triple backticks to answer the question.
+If you don't know the answer, just say that you don't know, don't try to make up an answer."""
+
+DEFAULT_PROMPT_TEMPLATE = """Answer the question at the end with the following pieces of context.
+Context: ```{{ context }}```
+Question: ```{{ question }}```
+Helpful Answer:"""
+
+TEMPLATE_ENVIRONMENT = Environment(
+    undefined=StrictUndefined, keep_trailing_newline=True, autoescape=False
+)
+
+
 class PromptGenerator:
     """Class to manage prompt templates and to generate prompts.
 
-    A prompt is generated from a template and two inputs. One input is the `question`, for example
-    a question about some content in a document. The second input is a context string, which is a
-    concatenated string of context which should be used in the prompt.
+    A prompt consists of a system message and a user message, which are both created from Jinja2
+    templates. The templates are compiled once, when the generator is created. The system message does not
+    depend on the inputs, so it is the same for every request. The user message is generated from two
+    inputs. One input is the `question`, for example a question about some content in a document. The
+    second input is a context string, which is a concatenated string of context which should be used in
+    the prompt.
+
+    The fixed parts of a prompt come first and the variable parts last, so that providers which cache
+    the longest common prefix of prompts can reuse as much as possible between requests.
+
+    Attributes:
+        system_prompt: The system message, or None if the system template is empty.
 
     """
 
+    def __init__(
+        self,
+        system_template: Optional[str] = None,
+        prompt_template: Optional[str] = None,
+    ):
+        system_template = (
+            DEFAULT_SYSTEM_TEMPLATE if system_template is None else system_template
+        )
+        try:
+            self.system_prompt: Optional[str] = (
+                _compile_template(system_template).render() or None
+            )
+        except TemplateError as error:
+            raise UserConfigurationError(
+                f"The system prompt template cannot use variables: {error}"
+            ) from error
+        self._prompt_template: Template = _compile_template(
+            DEFAULT_PROMPT_TEMPLATE if prompt_template is None else prompt_template
+        )
+
+    def get_system_prompt(self) -> Optional[str]:
+        """Returns the system message, which is the same for every prompt."""
+        return self.system_prompt
+
     def get_prompt(self, question: str, context_str: str) -> str:
-        """Creates a prompt from the template, the question, and the context.
+        """Creates the user message of a prompt from the template, the question, and the context.
 
         Typically, the question is the user input and the context is retrieved from a database.
+        The template can use the variables ``question`` and ``context``.
 
         Args:
             question: A question as a string.
@@ -21,10 +74,12 @@ class PromptGenerator:
             A prompt as a string to be used for a LLM.
 
         """
+        return self._prompt_template.render(question=question, context=context_str)
+
 
-        return f"""Use the following pieces of context, provided in the triple backticks,
-        to answer the question at the end.
-        If you don't know the answer, just say that you don't know, don't try to make up an answer.
-        Context: ```{context_str}```
-        Question: ```{question}```
-        Helpful Answer:"""
+def _compile_template(source: str) -> Template:
+    """Compiles a Jinja2 template and raises an error for invalid templates."""
+    try:
+        return TEMPLATE_ENVIRONMENT.from_string(source)
+    except TemplateError as error:
+        raise UserConfigurationError(f"Invalid prompt template: {error}") from error
@@ -0,0 +1,190 @@
+from typing import Callable, Optional
+import tiktoken
+
+from ragcore.models.document_model import Document
+from ragcore.shared.constants import DataConstants, SplitterConstants
+from ragcore.shared.errors import UserConfigurationError
+from ragcore.shared.utils import CHARACTERS_PER_TOKEN_ESTIMATE, get_token_encoding
+
+
+class RecursiveTextSplitter:
+    """Splits texts into overlapping chunks with a list of separators, from paragraphs to characters.
+
+    A text is split at the first separator which it contains, by default paragraphs, then lines, then
+    words and then characters. Parts which are shorter than ``chunk_size`` are merged into chunks of at
+    most ``chunk_size``, with an overlap of up to ``chunk_overlap`` between neighbouring chunks. Parts which
+    are too long are split again with the next separator. Separators are kept at the start of the following
+    part, and whitespace is stripped from the chunks.
+
+    The chunks are the same as the chunks of LangChain's ``RecursiveCharacterTextSplitter`` with the
+    default separators, but the splitter works directly on ``Document`` objects and computes the length of
+    each part only once, which matters when the length is counted in tokens.
+
+    Attributes:
+        chunk_size: The maximum length of a chunk.
+
+        chunk_overlap: The maximum overlap of neighbouring chunks.
+
+        length_unit: The unit of the lengths, ``characters`` or ``tokens``. Tokens are counted with a
+            tiktoken encoding, or estimated from the number of characters if no encoding can be loaded.
+
+        separators: The separators, from the coarsest to the finest. The empty string splits into characters.
+
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        length_unit: str = SplitterConstants.LENGTH_UNIT_CHARACTERS,
+        encoding: Optional[tiktoken.Encoding] = None,
+        separators: Optional[list[str]] = None,
+    ):
+        if chunk_overlap > chunk_size:
+            raise UserConfigurationError(
+                f"The chunk overlap {chunk_overlap} must not be larger than the chunk size {chunk_size}."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_unit = length_unit
+        self.separators = (
+            list(SplitterConstants.DEFAULT_SEPARATORS)
+            if separators is None
+            else separators
+        )
+        self._length: Callable[[str], int] = _get_length_function(length_unit, encoding)
+
+    def split_text(self, text: str) -> list[str]:
+        """Splits a text into chunks.
+
+        Args:
+            text: The text to be split.
+
+        Returns:
+            A list of chunks, in the order of the text.
+
+        """
+        return self._split(text, self.separators)
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        """Splits documents into chunks, and stores the position of each chunk in its document.
+
+        Each chunk has the title and a copy of the metadata of its document, with the position of the chunk
+        in the content of the document as ``start_index``.
+
+        Args:
+            documents: A list of ``Document``.
+
+        Returns:
+            A list of chunks as ``Document``, in the order of the documents.
+
+        """
+        chunks = []
+        for document in documents:
+            text = document.content
+            index = 0
+            previous_length = 0
+            for chunk in self.split_text(text):
+                # A chunk starts at most the overlap before the end of the previous chunk. The overlap
+                # is only known in characters when lengths are counted in characters.
+                if self.length_unit == SplitterConstants.LENGTH_UNIT_CHARACTERS:
+                    offset = index + previous_length - self.chunk_overlap
+                else:
+                    offset = index + 1 if previous_length else 0
+                index = text.find(chunk, max(0, offset))
+                previous_length = len(chunk)
+                chunks.append(
+                    Document(
+                        content=chunk,
+                        title=document.title,
+                        metadata={
+                            **document.metadata,
+                            DataConstants.KEY_START_INDEX: index,
+                        },
+                    )
+                )
+        return chunks
+
+    def _split(self, text: str, separators: list[str]) -> list[str]:
+        """Splits a text with the first separator it contains, and long parts with the following separators."""
+        separator = separators[-1]
+        next_separators: list[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if candidate in text:
+                separator = candidate
+                next_separators = separators[i + 1 :]
+                break
+
+        chunks: list[str] = []
+        parts: list[str] = []
+        lengths: list[int] = []
+        for part in _split_keep_separator(text, separator):
+            length = self._length(part)
+            if length < self.chunk_size:
+                parts.append(part)
+                lengths.append(length)
+                continue
+            if parts:
+                chunks += self._merge(parts, lengths)
+                parts, lengths = [], []
+            if next_separators:
+                chunks += self._split(part, next_separators)
+            else:
+                chunks.append(part)
+        if parts:
+            chunks += self._merge(parts, lengths)
+        return chunks
+
+    def _merge(self, parts: list[str], lengths: list[int]) -> list[str]:
+        """Merges consecutive parts into chunks of at most ``chunk_size``, which overlap by up to ``chunk_overlap``.
+
+        The parts keep their separators, so they are joined without a separator.
+
+        """
+        chunks = []
+        # Indices of the parts of the current chunk.
+        start = 0
+        total = 0
+        for end, length in enumerate(lengths):
+            if total + length > self.chunk_size and end > start:
+                chunk = "".join(parts[start:end]).strip()
+                if chunk:
+                    chunks.append(chunk)
+                # Drop parts from the start, until the rest fits into the overlap and leaves space for the next part.
+                while total > self.chunk_overlap or (
+                    total + length > self.chunk_size and total > 0
+                ):
+                    total -= lengths[start]
+                    start += 1
+            total += length
+        chunk = "".join(parts[start:]).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+
+def _split_keep_separator(text: str, separator: str) -> list[str]:
+    """Splits a text at a separator, and keeps the separator at the start of each following part."""
+    if not separator:
+        return list(text)
+    first, *rest = text.split(separator)
+    parts = [first] + [separator + part for part in rest]
+    return [part for part in parts if part]
+
+
+def _get_length_function(
+    length_unit: str, encoding: Optional[tiktoken.Encoding]
+) -> Callable[[str], int]:
+    """Returns a function which measures the length of a text in characters or tokens."""
+    if length_unit == SplitterConstants.LENGTH_UNIT_CHARACTERS:
+        return len
+    if length_unit == SplitterConstants.LENGTH_UNIT_TOKENS:
+        token_encoding = encoding or get_token_encoding()
+        if token_encoding is None:
+            return lambda text: -(-len(text) // CHARACTERS_PER_TOKEN_ESTIMATE)
+        encode = token_encoding.encode_ordinary
+        return lambda text: len(encode(text))
+    raise UserConfigurationError(f"Unsupported splitter length unit: {length_unit}")
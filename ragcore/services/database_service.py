@@ -1,16 +1,27 @@
+import asyncio
+from itertools import chain
 from logging import Logger
 import os
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+import numpy as np
 
 from ragcore.shared.constants import (
     DatabaseConstants,
     DataConstants,
     EmbeddingConstants,
+    LoaderConstants,
 )
 from ragcore.shared.errors import DatabaseError, MetadataError, EmbeddingError
-from ragcore.models.document_model import Document
+from ragcore.shared.cache import CacheStats, DiskCache, LRUCache
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+from ragcore.shared.endpoint_pool import EndpointPool, EndpointStats
+from ragcore.shared.pipeline import batched, prefetch
+from ragcore.models.document_model import Document, UpdateStats
 from ragcore.models.embedding_model import (
     BaseEmbedding,
+    BatchingEmbedding,
+    CachedEmbedding,
+    LocalEmbedding,
     OpenAIEmbedding,
     AzureOpenAIEmbedding,
 )
@@ -43,6 +54,14 @@ class DatabaseService:
 
         embedding_config: A configuration for the embedding, usually the embedding part of the config file.
 
+        concurrency_controller: The ``AdaptiveConcurrencyController`` for embedding requests, or None if
+            adaptive concurrency is not enabled.
+
+        query_cache: An in-memory ``LRUCache`` for the vectors of queries, or None if it is disabled.
+
+        endpoint_pool: The ``EndpointPool`` for Azure OpenAI embedding requests, or None if a single
+            endpoint is configured.
+
     """
 
     def __init__(
@@ -56,11 +75,60 @@ class DatabaseService:
         self.base_url: Optional[str] = config.base_url
         self.provider: str = config.provider
         self.number_search_results: int = config.number_search_results
+        self.concurrency_controller: Optional[AdaptiveConcurrencyController] = None
+        self.endpoint_pool: Optional[EndpointPool] = None
         self.embedding: BaseEmbedding = self._init_embedding(config=embedding_config)
+        self.embedding_model: str = embedding_config.model
+        self.embedding_dimensions: Optional[int] = embedding_config.dimensions
+        self.query_cache: Optional[LRUCache] = (
+            LRUCache(
+                max_entries=embedding_config.query_cache_max_entries,
+                ttl_seconds=embedding_config.query_cache_ttl_seconds,
+            )
+            if embedding_config.query_cache_max_entries > 0
+            else None
+        )
         self.database: Optional[BaseVectorDatabaseModel] = None
 
     def _init_embedding(self, config: EmbeddingConfiguration) -> BaseEmbedding:
-        """Initializes an embedding model."""
+        """Initializes an embedding model.
+
+        If a ``batch_window_ms`` is configured, concurrent single-text requests are coalesced into batches.
+        If a ``cache_dir`` is configured, the embedding model is wrapped in a persistent cache, so that
+        only cache misses are batched and sent to the provider.
+
+        """
+        embedding = self._init_provider_embedding(config)
+
+        if config.batch_window_ms:
+            self.logger.info(
+                f"Batching single-text embedding requests within {config.batch_window_ms} ms "
+                f"and up to {config.batch_max_size} texts."
+            )
+            embedding = BatchingEmbedding(
+                embedding=embedding,
+                window_ms=config.batch_window_ms,
+                max_batch_size=config.batch_max_size,
+                max_concurrency=config.max_concurrency,
+            )
+
+        if not config.cache_dir:
+            return embedding
+
+        cache_path = os.path.join(config.cache_dir, EmbeddingConstants.CACHE_FILENAME)
+        self.logger.info(
+            f"Using embedding cache `{cache_path}` with up to {config.cache_max_entries} entries."
+        )
+        return CachedEmbedding(
+            embedding=embedding,
+            provider=config.provider,
+            model=config.model,
+            cache=DiskCache(path=cache_path, max_entries=config.cache_max_entries),
+            dimensions=config.dimensions,
+        )
+
+    def _init_provider_embedding(self, config: EmbeddingConfiguration) -> BaseEmbedding:
+        """Initializes the embedding model of the configured provider."""
         provider = config.provider
         model = config.model
         api_version = config.api_version
@@ -68,21 +136,65 @@ class DatabaseService:
         if not provider or not model:
             raise EmbeddingError("Provider or model missing in the configuration.")
 
+        if (
+            config.adaptive_concurrency
+            and provider != EmbeddingConstants.PROVIDER_LOCAL
+        ):
+            self.logger.info(
+                f"Using adaptive concurrency with up to {config.max_concurrency} embedding requests."
+            )
+            self.concurrency_controller = AdaptiveConcurrencyController(
+                max_limit=config.max_concurrency
+            )
+
         if provider == EmbeddingConstants.PROVIDER_OPENAI:
             self.logger.info(
                 f"Using embedding model {model}, provider `{EmbeddingConstants.PROVIDER_OPENAI}`."
             )
-            return OpenAIEmbedding(model=model)
+            return OpenAIEmbedding(
+                model=model,
+                max_concurrency=config.max_concurrency,
+                max_tokens_per_batch=config.max_tokens_per_batch,
+                controller=self.concurrency_controller,
+                dimensions=config.dimensions,
+            )
         if (
             provider == EmbeddingConstants.PROVIDER_AZURE_OPENAI
             and api_version
-            and endpoint
+            and (endpoint or config.endpoints)
         ):
             self.logger.info(
                 f"Using embedding model {model}, provider `{EmbeddingConstants.PROVIDER_AZURE_OPENAI}`."
             )
+            if config.endpoints:
+                self.logger.info(
+                    f"Routing embedding requests over {len(config.endpoints)} endpoints "
+                    f"by `{config.endpoint_routing}`."
+                )
+                self.endpoint_pool = EndpointPool(
+                    config.endpoints,
+                    routing=config.endpoint_routing,
+                    max_errors=config.endpoint_max_errors,
+                    ejection_seconds=config.endpoint_ejection_seconds,
+                )
             return AzureOpenAIEmbedding(
-                model=model, api_version=api_version, endpoint=endpoint
+                model=model,
+                api_version=api_version,
+                endpoint=endpoint,
+                max_concurrency=config.max_concurrency,
+                max_tokens_per_batch=config.max_tokens_per_batch,
+                controller=self.concurrency_controller,
+                dimensions=config.dimensions,
+                endpoint_pool=self.endpoint_pool,
+            )
+        if provider == EmbeddingConstants.PROVIDER_LOCAL:
+            self.logger.info(
+                f"Using embedding model {model}, provider `{EmbeddingConstants.PROVIDER_LOCAL}`."
+            )
+            return LocalEmbedding(
+                model=model,
+                dimensions=config.dimensions
+                or EmbeddingConstants.LOCAL_DEFAULT_DIMENSIONS,
             )
         raise EmbeddingError(f"Selected embedding provider {provider} not supported.")
 
@@ -143,7 +255,7 @@ class DatabaseService:
 
     def add_documents(
         self, documents: list[Document], user: Optional[str] = None
-    ) -> None:
+    ) -> bool:
         """Adds documents to an existing database.
 
         Documents must have metadata, and the metadata must have a `title` specified.
@@ -154,6 +266,9 @@ class DatabaseService:
 
             user: An optional string to identify a user.
 
+        Returns:
+            True if the documents have been added, False if documents with the title already exist.
+
         """
         # Check if database exists on disk. If not exit.
         if not self.database:
@@ -173,19 +288,263 @@ class DatabaseService:
             f"`{self.base_path if self.base_path else self.base_url}` ..."
         )
 
-        if self.database.add_documents(documents, user):
+        if self.database.add_documents(utils.add_content_hashes(documents), user):
             self.logger.info(
                 "Added all documents to database. "
                 f"Total number of documents for user `{user}` in database: {self.database.get_number_of_documents(user)}",
             )
-        else:
+            return True
+        self.logger.warn(
+            (
+                "Did not add documents to database, because documents with the title you "
+                "are trying to add already exist in the database."
+            )
+        )
+        return False
+
+    def add_documents_stream(
+        self,
+        documents: Iterable[Document],
+        user: Optional[str] = None,
+        batch_size: int = LoaderConstants.DEFAULT_BATCH_SIZE,
+        queue_size: int = LoaderConstants.DEFAULT_QUEUE_SIZE,
+    ) -> Optional[int]:
+        """Adds the documents of one title from an iterable, in batches, while the iterable is consumed.
+
+        The documents are read in a worker thread and grouped into batches of ``batch_size``. The batches
+        are embedded in a second worker thread, and written to the database in the calling thread. The
+        stages are connected by queues with at most ``queue_size`` batches, so they run at the same time
+        and only a few batches are held in memory, independent of the number of documents.
+
+        All documents must have the title of the first document, otherwise a ``MetadataError`` is raised
+        when a document with another title is reached. If the title already exists, nothing is added. If
+        a batch fails, the batches which have been written are deleted again and the error is
+        raised.
+
+        Args:
+            documents: An iterable of documents of type ``Document``, for example from
+                ``DocumentService.iter_documents``.
+
+            user: An optional string to identify a user.
+
+            batch_size: The number of documents which are embedded and written together.
+
+            queue_size: The maximum number of batches which wait between two stages.
+
+        Returns:
+            The number of documents which have been added, or None if documents with the title already exist.
+
+        """
+        if not self.database:
+            raise DatabaseError(
+                f"Tried to add documents to database `{self.provider}`, but this database does not exist."
+            )
+
+        iterator = iter(documents)
+        first = next(iterator, None)
+        if first is None:
+            return 0
+        if not self._validate_documents_metadata(documents=[first]):
+            raise MetadataError(
+                "Tried to add documents with invalid metadata! Check if all documents have metadata and the field `title`."
+            )
+        title = first.metadata[DataConstants.KEY_TITLE]
+        if self.database.has_title(title, user):
             self.logger.warn(
-                (
-                    "Did not add documents to database, because documents with the title you "
-                    "are trying to add already exist in the database."
+                f"Did not add documents to database, because documents with the title `{title}` already exist."
+            )
+            return None
+
+        self.logger.info(
+            f"Streaming documents with the title `{title}` to database `{self.provider}` in batches "
+            f"of {batch_size} ..."
+        )
+        batches = prefetch(batched(chain([first], iterator), batch_size), queue_size)
+        embedded_batches = prefetch(self._embed_batches(batches, title), queue_size)
+        num_documents = 0
+        try:
+            for batch, embeddings in embedded_batches:
+                self.database.add_embedded_documents(batch, embeddings, user)
+                num_documents += len(batch)
+        except BaseException:
+            # Stop the worker threads, before the partial document is deleted.
+            embedded_batches.close()
+            batches.close()
+            if num_documents:
+                self.logger.error(
+                    f"Failed to add the documents with the title `{title}`. Deleting {num_documents} added documents ..."
                 )
+                self.database.delete_documents(title, user)
+            raise
+
+        self.logger.info(
+            f"Added {num_documents} documents with the title `{title}` to database."
+        )
+        return num_documents
+
+    def _embed_batches(
+        self, batches: Iterable[list[Document]], title: str
+    ) -> Iterator[tuple[list[Document], np.ndarray]]:
+        """Validates the metadata of batches of documents with a title and yields each batch with its vectors."""
+        for batch in batches:
+            self._validate_batch_metadata(batch, title)
+            batch = utils.add_content_hashes(batch)
+            yield batch, self.embedding.embed_texts_array(
+                [document.content for document in batch]
             )
 
+    def update_documents_stream(
+        self,
+        documents: Iterable[Document],
+        user: Optional[str] = None,
+        batch_size: int = LoaderConstants.DEFAULT_BATCH_SIZE,
+        queue_size: int = LoaderConstants.DEFAULT_QUEUE_SIZE,
+    ) -> UpdateStats:
+        """Replaces the documents of one title with a new version, and embeds only the chunks which changed.
+
+        Every chunk is stored with the hash of its content in the metadata field ``content_hash``. The
+        hashes of the new chunks are compared with the stored hashes: chunks with a stored hash keep their
+        vector, and only their metadata is updated if it differs, for example when the chunk moved to
+        another page. New and changed chunks are embedded and written in batches like in
+        ``add_documents_stream``. The metadata of unchanged chunks is updated after all batches are
+        written, and stored chunks which are not part of the new version are deleted at the end. If the
+        title does not exist yet, all documents are added.
+
+        Chunks which were added before content hashes were stored have no hash, so they are replaced once.
+        If a batch fails, for example because a document has another title than the first document, the
+        chunks added by the update are deleted again, the stored chunks are left unchanged, and the error
+        is raised.
+
+        Args:
+            documents: An iterable of documents of type ``Document`` with the same title, for example from
+                ``DocumentService.iter_documents``.
+
+            user: An optional string to identify a user.
+
+            batch_size: The number of documents which are compared, embedded and written together.
+
+            queue_size: The maximum number of batches which wait between two stages.
+
+        Returns:
+            An ``UpdateStats`` with the number of embedded, unchanged and deleted chunks.
+
+        """
+        if not self.database:
+            raise DatabaseError(
+                f"Tried to update documents in database `{self.provider}`, but this database does not exist."
+            )
+
+        iterator = iter(documents)
+        first = next(iterator, None)
+        if first is None:
+            return UpdateStats(
+                num_documents=0, num_embedded=0, num_unchanged=0, num_deleted=0
+            )
+        if not self._validate_documents_metadata(documents=[first]):
+            raise MetadataError(
+                "Tried to add documents with invalid metadata! Check if all documents have metadata and the field `title`."
+            )
+        title = first.metadata[DataConstants.KEY_TITLE]
+        stored_metadatas = self.database.get_metadatas(title, user)
+        if not stored_metadatas:
+            num_documents = (
+                self.add_documents_stream(
+                    chain([first], iterator), user, batch_size, queue_size
+                )
+                or 0
+            )
+            return UpdateStats(
+                num_documents=num_documents,
+                num_embedded=num_documents,
+                num_unchanged=0,
+                num_deleted=0,
+            )
+
+        # IDs of the stored chunks by content hash, which have not been matched with a new chunk yet.
+        unmatched_ids: dict[str, list[str]] = {}
+        # Stored chunks without a hash are replaced.
+        removed_ids: list[str] = []
+        for doc_id, metadata in stored_metadatas.items():
+            content_hash = metadata.get(DataConstants.KEY_CONTENT_HASH)
+            if content_hash:
+                unmatched_ids.setdefault(content_hash, []).append(doc_id)
+            else:
+                removed_ids.append(doc_id)
+        stats = UpdateStats(
+            num_documents=0, num_embedded=0, num_unchanged=0, num_deleted=0
+        )
+
+        def diff_batches(
+            batches: Iterable[list[Document]],
+        ) -> Iterator[tuple[list[Document], np.ndarray, list[str], list[dict]]]:
+            """Yields the changed chunks of each batch with their vectors, and the changed metadata of unchanged chunks."""
+            for batch in batches:
+                self._validate_batch_metadata(batch, title)
+                changed, update_ids, update_metadatas = [], [], []
+                for document in utils.add_content_hashes(batch):
+                    ids = unmatched_ids.get(
+                        document.metadata[DataConstants.KEY_CONTENT_HASH]
+                    )
+                    if not ids:
+                        changed.append(document)
+                        continue
+                    doc_id = ids.pop(0)
+                    stats.num_unchanged += 1
+                    if stored_metadatas[doc_id] != document.metadata:
+                        update_ids.append(doc_id)
+                        update_metadatas.append(dict(document.metadata))
+                stats.num_documents += len(batch)
+                stats.num_embedded += len(changed)
+                embeddings = (
+                    self.embedding.embed_texts_array(
+                        [document.content for document in changed]
+                    )
+                    if changed
+                    else np.empty((0, 0))
+                )
+                yield changed, embeddings, update_ids, update_metadatas
+
+        self.logger.info(
+            f"Updating documents with the title `{title}` in database `{self.provider}` ..."
+        )
+        batches = prefetch(batched(chain([first], iterator), batch_size), queue_size)
+        diffs = prefetch(diff_batches(batches), queue_size)
+        added_ids: list[str] = []
+        # Metadata is only updated once all changed chunks are written, so a failed update leaves the
+        # stored chunks as they were.
+        pending_ids: list[str] = []
+        pending_metadatas: list[dict] = []
+        try:
+            for changed, embeddings, update_ids, update_metadatas in diffs:
+                pending_ids += update_ids
+                pending_metadatas += update_metadatas
+                if changed:
+                    added_ids += self.database.add_embedded_documents(
+                        changed, embeddings, user
+                    )
+            self.database.update_metadatas(pending_ids, pending_metadatas, user)
+        except BaseException:
+            # Stop the worker threads, before the added chunks are deleted.
+            diffs.close()
+            batches.close()
+            if added_ids:
+                self.logger.error(
+                    f"Failed to update the documents with the title `{title}`. Deleting {len(added_ids)} added documents ..."
+                )
+                self.database.delete_ids(added_ids, user)
+            raise
+
+        # Stored chunks without a match are not part of the new version.
+        removed_ids += [doc_id for ids in unmatched_ids.values() for doc_id in ids]
+        self.database.delete_ids(removed_ids, user)
+        stats.num_deleted = len(removed_ids)
+
+        self.logger.info(
+            f"Updated documents with the title `{title}`: {stats.num_embedded} embedded, "
+            f"{stats.num_unchanged} unchanged, {stats.num_deleted} deleted."
+        )
+        return stats
+
     def delete_documents(self, title: str, user: Optional[str] = None) -> None:
         """Deletes all documents with the title ``title`` from the database.
 
@@ -213,7 +572,8 @@ class DatabaseService:
         """Query the database with a query.
 
         The instantiated database is queried with the given query string and returns
-        a list of documents for a query.
+        a list of documents for a query. The vector of the query is taken from the query cache
+        if the same query has been embedded before.
 
         Args:
             query: A query as a string.
@@ -229,7 +589,217 @@ class DatabaseService:
                 "Database does not exist. Please create it before running a query."
             )
 
-        return self.database.query(query, user)
+        return self.query_by_embedding(self.embed_query(query), user)
+
+    def query_by_embedding(
+        self, embedding: np.ndarray, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Query the database with the vector of a query, for example from ``embed_query``.
+
+        Args:
+            embedding: A float vector of the query.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list of documents or None.
+
+        """
+        if not self.database:
+            raise DatabaseError(
+                "Database does not exist. Please create it before running a query."
+            )
+
+        return self.database.query_by_embedding(embedding, user)
+
+    def query_batch(
+        self, queries: list[str], user: Optional[str] = None
+    ) -> list[list[Document]]:
+        """Query the database with many queries.
+
+        All queries which are not in the query cache are embedded in one request, and the database
+        is queried with all vectors at once if it supports it.
+
+        Args:
+            queries: A list of queries.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with the documents for each query, in the order of the queries.
+
+        """
+        return self.query_by_embeddings(self.embed_queries(queries), user)
+
+    def query_by_embeddings(
+        self, embeddings: np.ndarray, user: Optional[str] = None
+    ) -> list[list[Document]]:
+        """Query the database with many query vectors, one per row of ``embeddings``.
+
+        Args:
+            embeddings: A float matrix with one query vector per row.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list with the documents for each query, in the order of the queries.
+
+        """
+        if not self.database:
+            raise DatabaseError(
+                "Database does not exist. Please create it before running a query."
+            )
+
+        return self.database.query_by_embeddings(embeddings, user)
+
+    async def aquery(
+        self, query: str, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Query the database with a query asynchronously.
+
+        The query is embedded with the asynchronous client of the embedding provider, and the
+        database request runs in a worker thread.
+
+        Args:
+            query: A query as a string.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            A list of documents or None.
+
+        """
+        if not self.database:
+            raise DatabaseError(
+                "Database does not exist. Please create it before running a query."
+            )
+
+        embedding = await self.aembed_query(query)
+        return await self.aquery_by_embedding(embedding, user)
+
+    async def aquery_by_embedding(
+        self, embedding: np.ndarray, user: Optional[str] = None
+    ) -> Optional[list[Document]]:
+        """Query the database with the vector of a query in a worker thread. See ``query_by_embedding``."""
+        return await asyncio.to_thread(self.query_by_embedding, embedding, user)
+
+    async def aadd_documents(
+        self, documents: list[Document], user: Optional[str] = None
+    ) -> None:
+        """Adds documents to an existing database in a worker thread. See ``add_documents``."""
+        await asyncio.to_thread(self.add_documents, documents, user)
+
+    async def adelete_documents(self, title: str, user: Optional[str] = None) -> None:
+        """Deletes all documents with the title ``title`` in a worker thread. See ``delete_documents``."""
+        await asyncio.to_thread(self.delete_documents, title, user)
+
+    async def aget_titles(self, user: Optional[str] = None) -> list[Optional[str]]:
+        """Gets the document titles for the user in a worker thread. See ``get_titles``."""
+        return await asyncio.to_thread(self.get_titles, user)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Returns the vector of a query, from the query cache if possible.
+
+        Queries are cached by embedding model and normalized text, so queries which differ only in
+        whitespace or case share a vector.
+
+        Args:
+            query: A query as a string.
+
+        Returns:
+            A float32 vector.
+
+        """
+        if self.query_cache is None:
+            return self.embedding.embed_texts_array([query])[0]
+
+        key = self._get_query_cache_key(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self._cache_query_embedding(
+                key, self.embedding.embed_texts_array([query])[0]
+            )
+        return embedding
+
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Returns the vectors of many queries. Queries which are not cached are embedded in one request.
+
+        Args:
+            queries: A list of queries.
+
+        Returns:
+            A float32 matrix with one vector per query.
+
+        """
+        if self.query_cache is None:
+            return self.embedding.embed_texts_array(queries)
+
+        vectors: dict[str, np.ndarray] = {}
+        for query in queries:
+            embedding = self.query_cache.get(self._get_query_cache_key(query))
+            if embedding is not None:
+                vectors[query] = embedding
+        # Embed each distinct missing query once.
+        missing = list(
+            dict.fromkeys(query for query in queries if query not in vectors)
+        )
+        if missing:
+            for query, embedding in zip(
+                missing, self.embedding.embed_texts_array(missing)
+            ):
+                vectors[query] = self._cache_query_embedding(
+                    self._get_query_cache_key(query), embedding
+                )
+        if not queries:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[query] for query in queries])
+
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """Returns the vector of a query asynchronously, from the query cache if possible. See ``embed_query``."""
+        if self.query_cache is None:
+            return await self._aembed(query)
+
+        key = self._get_query_cache_key(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self._cache_query_embedding(key, await self._aembed(query))
+        return embedding
+
+    def _cache_query_embedding(self, key: tuple, embedding: np.ndarray) -> np.ndarray:
+        """Stores a read-only copy of a query vector in the query cache and returns it.
+
+        The vector is usually a row of a batch matrix, which would keep the whole matrix alive while it
+        is cached. The copy is shared by all requests for the query, so it is read-only.
+
+        """
+        cached = embedding.copy()
+        cached.flags.writeable = False
+        if self.query_cache is not None:
+            self.query_cache.set(key, cached)
+        return cached
+
+    async def _aembed(self, query: str) -> np.ndarray:
+        vectors = await self.embedding.aembed_texts([query])
+        return np.asarray(vectors[0], dtype=np.float32)
+
+    def _get_query_cache_key(self, query: str) -> tuple:
+        return (
+            self.embedding_model,
+            self.embedding_dimensions,
+            _normalize_query(query),
+        )
+
+    def close(self) -> None:
+        """Stops the threads of the embedding, for example the dispatcher of batched query embeddings."""
+        self.embedding.close()
+
+    def get_endpoint_stats(self) -> Optional[list[EndpointStats]]:
+        """Returns the metrics of each embedding endpoint, or None if there is no endpoint pool."""
+        return self.endpoint_pool.stats() if self.endpoint_pool is not None else None
+
+    def get_query_cache_stats(self) -> Optional[CacheStats]:
+        """Returns the hit and miss counters of the query cache, or None if it is disabled."""
+        return self.query_cache.stats() if self.query_cache is not None else None
 
     def get_titles(self, user: Optional[str] = None) -> list[Optional[str]]:
         """Get the document titles for the user in the database, sorted in alphabetical order.
@@ -262,6 +832,19 @@ class DatabaseService:
                 return False
         return True
 
+    def _validate_batch_metadata(self, batch: list[Document], title: str) -> None:
+        """Raises a ``MetadataError`` if a document of a batch has no title or another title."""
+        if not self._validate_documents_metadata(documents=batch):
+            raise MetadataError(
+                "Tried to add documents with invalid metadata! Check if all documents have metadata and the field `title`."
+            )
+        for document in batch:
+            if document.metadata[DataConstants.KEY_TITLE] != title:
+                raise MetadataError(
+                    f"Tried to add a document with the title `{document.metadata[DataConstants.KEY_TITLE]}` "
+                    f"to the documents with the title `{title}`. All documents must have the same title."
+                )
+
     def _create_base_dir(self) -> None:
         """
         Helper to make sure database base dir exists.
@@ -271,3 +854,8 @@ class DatabaseService:
         self.logger.info(f"Creating base dir for database `{self.base_path}` ...")
         if not os.path.exists(self.base_path):
             os.makedirs(self.base_path)
+
+
+def _normalize_query(query: str) -> str:
+    """Collapses whitespace and ignores case, so that equivalent queries share a cache entry."""
+    return " ".join(query.split()).casefold()
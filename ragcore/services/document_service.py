@@ -1,10 +1,18 @@
 import re
 from logging import Logger
+from typing import Iterator, Optional
 
 from ragcore.services.text_splitter_service import TextSplitterService
+from ragcore.models.config_model import LoaderConfiguration
 from ragcore.models.document_model import Document
 from ragcore.models.document_loader_model import PDFLoader
+from ragcore.shared.constants import DataConstants, SplitterConstants
 from ragcore.shared.errors import UserConfigurationError
+from ragcore.shared.utils import (
+    count_tokens,
+    get_token_encoding,
+    get_token_encoding_name,
+)
 
 PDF_PATTERN = r"\.pdf$"
 
@@ -20,6 +28,9 @@ class DocumentService:
     should then be split into overlapping chunks using the method ``split_pages``. The resulting splits
     are then available in the ``documents`` property.
 
+    For large files, ``iter_documents`` loads and splits the pages one at a time and yields the chunks,
+    without keeping the pages or the chunks in memory.
+
     Attributes:
         logger: A logger instance.
 
@@ -27,10 +38,16 @@ class DocumentService:
 
         documents: A list of ``Document`` of overlapping chunks.
 
+        loader_config: The configuration of the document loaders, for example the number of worker
+            processes for large PDF files.
+
     """
 
-    def __init__(self, logger: Logger) -> None:
+    def __init__(
+        self, logger: Logger, config: Optional[LoaderConfiguration] = None
+    ) -> None:
         self.logger: Logger = logger
+        self.loader_config: LoaderConfiguration = config or LoaderConfiguration()
         self.pages: list[Document] = []
         self.documents: list[Document] = []
 
@@ -47,29 +64,86 @@ class DocumentService:
             path: The string path to a file to be loaded into the service as ``pages``.
         """
 
-        filename = path.split("/")[-1]
-        title = filename.split(".")[0]
+        title = get_title(path)
 
-        if not re.search(PDF_PATTERN, filename, re.IGNORECASE):
+        if not is_supported_file(path):
             raise UserConfigurationError(
                 "Prodived document does not have PDF file extension."
             )
 
         self.logger.info("Loading documents into memory ...")
 
-        loader = PDFLoader(path)
+        loader = PDFLoader(
+            path,
+            workers=self.loader_config.workers,
+            min_pages_per_worker=self.loader_config.min_pages_per_worker,
+        )
         self.pages = loader.load_and_split(title)
 
         self.logger.info(f"Loaded {len(self.pages)} pages from PDF from path `{path}`.")
 
-    def split_pages(self, chunk_size: int, chunk_overlap: int) -> None:
+    def iter_documents(
+        self,
+        path: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        length_unit: str = SplitterConstants.LENGTH_UNIT_CHARACTERS,
+    ) -> Iterator[Document]:
+        """Loads a file page by page and yields its overlapping chunks.
+
+        The chunks are the same as with ``load_texts`` followed by ``split_pages``, but only the current
+        page is held in memory. Neither ``pages`` nor ``documents`` are changed.
+
+        Args:
+            path: The string path to a file.
+
+            chunk_size: The size of the chunks.
+
+            chunk_overlap: The overlap of the chunks.
+
+            length_unit: The unit of the chunk size and the overlap, ``characters`` or ``tokens``.
+
+        Returns:
+            An iterator over the chunks, in the order of the pages.
+
+        """
+        if not is_supported_file(path):
+            raise UserConfigurationError(
+                "Prodived document does not have PDF file extension."
+            )
+
+        self.logger.info(f"Streaming chunks from PDF from path `{path}` ...")
+
+        loader = PDFLoader(
+            path,
+            workers=self.loader_config.workers,
+            min_pages_per_worker=self.loader_config.min_pages_per_worker,
+        )
+        splitter = TextSplitterService(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_unit=length_unit,
+        )
+        for page in loader.lazy_load_and_split(get_title(path)):
+            yield from _add_token_counts(splitter.split_documents([page]))
+
+    def split_pages(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        length_unit: str = SplitterConstants.LENGTH_UNIT_CHARACTERS,
+    ) -> None:
         """Splits pages into overlapping chunks and stores them in documents.
 
-        Must have loaded text with the ``load_texts`` method prior to splitting it.
+        Must have loaded text with the ``load_texts`` method prior to splitting it. The number of tokens
+        of each chunk is stored in its metadata as ``token_count``, with the name of the encoding as
+        ``token_encoding``, so that prompts can be limited to a token budget without tokenizing the chunks
+        again if the LLM uses the same encoding.
 
         Args:
             chunk_size: The size of the chunks.
             chunk_overlap: The overlap of the chunks.
+            length_unit: The unit of the chunk size and the overlap, ``characters`` or ``tokens``.
 
         """
         if not self.pages:
@@ -83,10 +157,51 @@ class DocumentService:
         )
 
         splitter = TextSplitterService(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_unit=length_unit,
         )
 
-        self.documents = splitter.split_documents(self.pages)
+        self.documents = _add_token_counts(splitter.split_documents(self.pages))
         self.logger.info(
             f"Created {len(self.documents)} documents from {len(self.pages)} pages."
         )
+
+
+def _add_token_counts(documents: list[Document]) -> list[Document]:
+    """Returns copies of the documents with the number of tokens and the encoding in the metadata."""
+    encoding = get_token_encoding()
+    token_counts = count_tokens([document.content for document in documents], encoding)
+    encoding_name = get_token_encoding_name(encoding)
+    return [
+        Document(
+            content=document.content,
+            title=document.title,
+            metadata={
+                **document.metadata,
+                DataConstants.KEY_TOKEN_COUNT: num_tokens,
+                DataConstants.KEY_TOKEN_ENCODING: encoding_name,
+            },
+        )
+        for document, num_tokens in zip(documents, token_counts)
+    ]
+
+
+def get_title(path: str) -> str:
+    """Returns the title of a document, which is the file name without the file extension.
+
+    Args:
+        path: The path to a file.
+
+    Returns:
+        The title as a string.
+
+    """
+    filename = path.split("/")[-1]
+    return filename.split(".")[0]
+
+
+def is_supported_file(path: str) -> bool:
+    """Returns True if the file format of a path can be loaded by the ``DocumentService``."""
+    filename = path.split("/")[-1]
+    return bool(re.search(PDF_PATTERN, filename, re.IGNORECASE))
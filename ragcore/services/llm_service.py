@@ -1,12 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import hashlib
 from logging import Logger
-from typing import Optional
+import os
+from typing import Iterator, Optional
+import numpy as np
 
 from ragcore.models.document_model import Document
 from ragcore.models.prompt_model import PromptGenerator
-from ragcore.models.llm_model import OpenAIModel, AzureOpenAIModel
-from ragcore.shared.constants import ConfigurationConstants
+from ragcore.models.llm_model import (
+    AzureOpenAIModel,
+    BaseLLMModel,
+    LocalLLMModel,
+    OpenAIModel,
+)
+from ragcore.shared.cache import (
+    DiskCache,
+    LRUCache,
+    SemanticCache,
+    SemanticCacheStats,
+)
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+from ragcore.shared.constants import (
+    ConfigurationConstants,
+    HedgingConstants,
+    LLMProviderConstants,
+)
+from ragcore.shared.endpoint_pool import EndpointStats
+from ragcore.shared.hedging import HedgeStats, RequestHedger
 from ragcore.shared.errors import LLMError, PromptError, UserConfigurationError
-from ragcore.shared.utils import document_to_str
+from ragcore.shared.utils import (
+    document_to_str,
+    fit_documents_to_token_budget,
+    merge_adjacent_documents,
+    get_token_encoding,
+    sort_documents_by_position,
+)
 from ragcore.models.config_model import LLMConfiguration
 
 
@@ -16,12 +45,25 @@ class LLMService:
     Currently supported providers are:
         - OpenAI
         - AzureOpenAI
+        - Local, an offline model with simulated latency for benchmarks
 
     Attributes:
         logger: A logger instance.
         llm_provider: The provider for the LLM.
         llm_model: The name of the LLM, as specified by the provider.
         llm_config: A configuration for the LLM.
+        max_concurrency: The maximum number of requests which are sent at the same time by ``make_llm_requests``.
+        max_context_tokens: The maximum number of tokens of the context in a prompt, or None for no limit.
+        prompt_generator: The ``PromptGenerator`` with the compiled prompt templates.
+        system_prompt: The system message which is sent with every request, or None for no system message.
+        concurrency_controller: The ``AdaptiveConcurrencyController`` for LLM requests, or None if adaptive
+            concurrency is not enabled.
+        semantic_cache: The ``SemanticCache`` for responses to similar questions, or None if it is not enabled.
+        response_cache: The in-memory ``LRUCache`` for responses to identical prompts, or None if it is not enabled.
+        response_disk_cache: The ``DiskCache`` for responses to identical prompts, or None if it is not enabled.
+        hedger: The ``RequestHedger`` for slow requests, or None if hedging is not enabled.
+        hedge_model: The name of the model to which hedged requests are sent, or None to use ``llm_model``.
+        hedge_llm: The LLM to which hedged requests are sent, or None if hedging is not enabled.
 
     """
 
@@ -36,8 +78,69 @@ class LLMService:
         self.llm_config = {
             ConfigurationConstants.KEY_AZURE_OPENAI_AZURE_ENDPOINT: config.endpoint,
             ConfigurationConstants.KEY_AZURE_OPENAI_API_VERSION: config.api_version,
+            ConfigurationConstants.KEY_ENDPOINTS: config.endpoints,
+            ConfigurationConstants.KEY_ENDPOINT_ROUTING: config.endpoint_routing,
+            ConfigurationConstants.KEY_ENDPOINT_MAX_ERRORS: config.endpoint_max_errors,
+            ConfigurationConstants.KEY_ENDPOINT_EJECTION_SECONDS: config.endpoint_ejection_seconds,
+            ConfigurationConstants.KEY_LLM_SIMULATED_LATENCY_SECONDS: config.simulated_latency_seconds,
+            ConfigurationConstants.KEY_LLM_SIMULATED_TOKENS_PER_SECOND: config.simulated_tokens_per_second,
+            ConfigurationConstants.KEY_LLM_SIMULATED_RESPONSE_TOKENS: config.simulated_response_tokens,
         }
         self.llm = None
+        self.prompt_generator = PromptGenerator(
+            system_template=config.system_prompt_template,
+            prompt_template=config.prompt_template,
+        )
+        self.system_prompt = self.prompt_generator.get_system_prompt()
+        self.max_concurrency = config.max_concurrency
+        self.max_context_tokens = config.max_context_tokens
+        self.concurrency_controller = (
+            AdaptiveConcurrencyController(max_limit=config.max_concurrency)
+            if config.adaptive_concurrency
+            else None
+        )
+        self.semantic_cache = (
+            SemanticCache(
+                threshold=config.semantic_cache_threshold,
+                max_entries=config.semantic_cache_max_entries,
+            )
+            if config.semantic_cache_threshold is not None
+            else None
+        )
+        self.response_cache: Optional[LRUCache] = (
+            LRUCache(
+                max_entries=config.response_cache_max_entries,
+                ttl_seconds=config.response_cache_ttl_seconds,
+            )
+            if config.response_cache_max_entries > 0
+            else None
+        )
+        self.hedger: Optional[RequestHedger] = (
+            RequestHedger(
+                percentile=config.hedge_percentile,
+                max_hedges_per_minute=config.hedge_max_per_minute,
+                # Each request uses up to two workers, for itself and its hedge.
+                max_workers=2 * config.max_concurrency,
+            )
+            if config.hedge_percentile is not None
+            else None
+        )
+        self.hedge_model = config.hedge_model
+        self.hedge_llm: Optional[BaseLLMModel] = None
+        self.response_disk_cache: Optional[DiskCache] = None
+        if config.response_cache_dir:
+            cache_path = os.path.join(
+                config.response_cache_dir, LLMProviderConstants.RESPONSE_CACHE_FILENAME
+            )
+            self.logger.info(
+                f"Using LLM response cache `{cache_path}` with up to "
+                f"{config.response_cache_disk_max_entries} entries."
+            )
+            self.response_disk_cache = DiskCache(
+                path=cache_path,
+                max_entries=config.response_cache_disk_max_entries,
+                ttl_seconds=config.response_cache_ttl_seconds,
+            )
 
     def initialize_llm(self):
         """Initializes the selected Large Language Model from the specified provider.
@@ -51,12 +154,27 @@ class LLMService:
         model_classes = {
             ConfigurationConstants.LLM_PROVIDER_OPENAI: OpenAIModel,
             ConfigurationConstants.LLM_PROVIDER_AZUREOPENAI: AzureOpenAIModel,
+            ConfigurationConstants.LLM_PROVIDER_LOCAL: LocalLLMModel,
         }
 
         model_class = model_classes.get(self.llm_provider)
 
         if model_class:
-            self.llm = model_class(self.llm_provider, self.llm_model, self.llm_config)
+            self.llm = model_class(
+                self.llm_provider,
+                self.llm_model,
+                self.llm_config,
+                controller=self.concurrency_controller,
+            )
+            if self.hedger and self.hedge_model:
+                self.hedge_llm = model_class(
+                    self.llm_provider,
+                    self.hedge_model,
+                    self.llm_config,
+                    controller=self.concurrency_controller,
+                )
+            elif self.hedger:
+                self.hedge_llm = self.llm
         else:
             raise UserConfigurationError(
                 f"Unsupported model provider: {self.llm_provider}"
@@ -69,7 +187,10 @@ class LLMService:
         """Creates the prompt which is used to make the request.
 
         The prompt is created from the prompt template and a concatenation of the document
-        chunks as strings.
+        chunks as strings. Retrieved chunks which overlap in the same page are merged first, so
+        that the overlap is sent only once. If ``max_context_tokens`` is set, the chunks are added in their order until
+        the budget is reached, and the last chunk is truncated. The remaining chunks are sorted by their position in
+        the documents, so that the same chunks always result in the same prompt.
 
         Args:
             question: A question as string.
@@ -82,9 +203,26 @@ class LLMService:
         """
         if not question:
             raise PromptError("Tried to create prompt, but no question provided.")
-        prompt_generator = PromptGenerator()
+        num_retrieved = len(contexts)
+        contexts = merge_adjacent_documents(contexts)
+        if len(contexts) < num_retrieved:
+            self.logger.info(
+                f"Merged {num_retrieved} overlapping documents into {len(contexts)}."
+            )
+        if self.max_context_tokens is not None:
+            num_contexts = len(contexts)
+            contexts = fit_documents_to_token_budget(
+                contexts, self.max_context_tokens, get_token_encoding(self.llm_model)
+            )
+            if len(contexts) < num_contexts:
+                self.logger.info(
+                    f"Dropped {num_contexts - len(contexts)} documents to fit the context "
+                    f"into {self.max_context_tokens} tokens."
+                )
+        # The same chunks are always in the same order, so that the prompt prefix can be cached.
+        contexts = sort_documents_by_position(contexts)
         context_str = document_to_str(contexts)
-        prompt = prompt_generator.get_prompt(question, context_str)
+        prompt = self.prompt_generator.get_prompt(question, context_str)
         self.logger.info(
             f"Created prompt from question and {len(contexts)} documents as context."
         )
@@ -106,7 +244,317 @@ class LLMService:
         if not self.llm:
             raise LLMError("Tried to make a request, but the llm is not initialized.")
 
+        cached_response = self._get_response_from_cache(prompt)
+        if cached_response is not None:
+            return cached_response
+
         self.logger.info(f"Sending request to llm of type {self.llm_provider} ...")
-        response: str = self.llm.request(text=prompt)
+        if self.hedger and self.hedge_llm:
+            llm, response = self.hedger.call(
+                partial(_request, self.llm, prompt, self.system_prompt),
+                partial(_request, self.hedge_llm, prompt, self.system_prompt),
+            )
+        else:
+            llm = self.llm
+            response = self.llm.request(text=prompt, system_prompt=self.system_prompt)
         self.logger.info("Received response from llm.")
+        self._add_response_to_cache(prompt, response, llm)
         return response
+
+    def make_llm_requests(self, prompts: list[str]) -> list[Optional[str]]:
+        """Makes requests for many prompts to the initialized Large Language Model concurrently.
+
+        At most ``max_concurrency`` requests are sent at the same time.
+
+        Args:
+            prompts: A list of prompts.
+
+        Returns:
+            A list with the response for each prompt, in the order of the prompts.
+
+        """
+        if not prompts:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=max(min(len(prompts), self.max_concurrency), 1)
+        ) as executor:
+            return list(executor.map(self.make_llm_request, prompts))
+
+    async def amake_llm_request(self, prompt: str) -> Optional[str]:
+        """Makes an asynchronous request to the initialized Large Language Model.
+
+        Args:
+            prompt: A prompt as a string for the request.
+
+        Returns:
+            The response from the LLM as a string or None if no response could be generated.
+
+        """
+        if not prompt:
+            return None
+
+        if not self.llm:
+            raise LLMError("Tried to make a request, but the llm is not initialized.")
+
+        cached_response = self._get_response_from_cache(prompt)
+        if cached_response is not None:
+            return cached_response
+
+        self.logger.info(f"Sending request to llm of type {self.llm_provider} ...")
+        if self.hedger and self.hedge_llm:
+            llm, response = await self.hedger.acall(
+                partial(_arequest, self.llm, prompt, self.system_prompt),
+                partial(_arequest, self.hedge_llm, prompt, self.system_prompt),
+            )
+        else:
+            llm = self.llm
+            response = await self.llm.arequest(
+                text=prompt, system_prompt=self.system_prompt
+            )
+        self.logger.info("Received response from llm.")
+        self._add_response_to_cache(prompt, response, llm)
+        return response
+
+    def make_llm_request_stream(self, prompt: str) -> Iterator[str]:
+        """Makes a streaming request to the initialized Large Language Model.
+
+        Args:
+            prompt: A prompt as a string for the request.
+
+        Returns:
+            An iterator over the parts of the response as they are generated. Empty if there is no prompt.
+
+        """
+        if not prompt:
+            return
+
+        if not self.llm:
+            raise LLMError("Tried to make a request, but the llm is not initialized.")
+
+        cached_response = self._get_response_from_cache(prompt)
+        if cached_response is not None:
+            yield cached_response
+            return
+
+        self.logger.info(
+            f"Sending streaming request to llm of type {self.llm_provider} ..."
+        )
+        if self.hedger and self.hedge_llm:
+            # Hedging applies to the first part, after which the stream which started first is used.
+            llm, first_part, stream = self.hedger.call(
+                partial(_start_stream, self.llm, prompt, self.system_prompt),
+                partial(_start_stream, self.hedge_llm, prompt, self.system_prompt),
+                kind=HedgingConstants.KIND_STREAM,
+                on_discard=_close_stream,
+            )
+        else:
+            llm, first_part, stream = (
+                self.llm,
+                None,
+                self.llm.request_stream(text=prompt, system_prompt=self.system_prompt),
+            )
+
+        parts = []
+        try:
+            if first_part is not None:
+                parts.append(first_part)
+                yield first_part
+            for part in stream:
+                parts.append(part)
+                yield part
+        finally:
+            # Closes the stream of the provider, also if the consumer stops early.
+            _close_stream((llm, first_part, stream))
+        self.logger.info("Received response from llm.")
+        self._add_response_to_cache(prompt, "".join(parts), llm)
+
+    def get_cached_response(
+        self,
+        embedding: np.ndarray,
+        contexts: list[Document],
+        user: Optional[str] = None,
+    ) -> Optional[str]:
+        """Returns a cached response to a similar question with the same contexts, if there is one.
+
+        Args:
+            embedding: The vector of the question.
+
+            contexts: The documents which were retrieved for the question.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            The cached response, or None if there is none or the semantic cache is not enabled.
+
+        """
+        if self.semantic_cache is None:
+            return None
+
+        response = self.semantic_cache.get(embedding, _get_chunk_ids(contexts), user)
+        if response is not None:
+            stats = self.semantic_cache.stats()
+            self.logger.info(
+                f"Found response in semantic cache. Hit rate {stats.hit_rate:.2f}, "
+                f"saved {stats.saved_seconds:.2f} s in total."
+            )
+        return response
+
+    def cache_response(
+        self,
+        embedding: np.ndarray,
+        contexts: list[Document],
+        response: str,
+        duration_seconds: float,
+        user: Optional[str] = None,
+    ) -> None:
+        """Adds a response to the semantic cache, if it is enabled.
+
+        Args:
+            embedding: The vector of the question.
+
+            contexts: The documents which were retrieved for the question.
+
+            response: The response of the LLM.
+
+            duration_seconds: The duration of the LLM request.
+
+            user: An optional string to identify a user.
+
+        """
+        if self.semantic_cache is None or not response:
+            return
+        self.semantic_cache.set(
+            embedding, _get_chunk_ids(contexts), response, duration_seconds, user
+        )
+
+    def invalidate_cached_responses(self, user: Optional[str] = None) -> None:
+        """Removes the cached responses of a user, because the documents of the user have changed."""
+        if self.semantic_cache is None:
+            return
+        self.semantic_cache.invalidate(user)
+        self.logger.info(f"Invalidated semantic cache for user `{user}`.")
+
+    def _get_response_cache_key(self, prompt: str, model: Optional[str] = None) -> str:
+        """Returns a key from the provider, the model, the system prompt and the prompt.
+
+        The model is the model which answered, by default ``llm_model``.
+
+        """
+        content = "\x00".join(
+            [
+                self.llm_provider,
+                model or self.llm_model,
+                self.system_prompt or "",
+                prompt,
+            ]
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _get_response_from_cache(self, prompt: str) -> Optional[str]:
+        """Returns the cached response to an identical prompt from memory or disk, or None."""
+        if self.response_cache is None and self.response_disk_cache is None:
+            return None
+
+        key = self._get_response_cache_key(prompt)
+        if self.response_cache is not None:
+            response = self.response_cache.get(key)
+            if response is not None:
+                self.logger.info("Found response in memory cache.")
+                return response
+
+        if self.response_disk_cache is not None:
+            value = self.response_disk_cache.get(key)
+            if value is not None:
+                self.logger.info("Found response in disk cache.")
+                response = value.decode("utf-8")
+                if self.response_cache is not None:
+                    self.response_cache.set(key, response)
+                return response
+        return None
+
+    def _add_response_to_cache(
+        self, prompt: str, response: Optional[str], llm: Optional[BaseLLMModel] = None
+    ) -> None:
+        """Caches a response under the model of the LLM which answered, so that a response of the
+        hedge model is not returned for the primary model."""
+        if not response:
+            return
+        model = None if llm is None or llm is self.llm else llm.llm_model
+        key = self._get_response_cache_key(prompt, model)
+        if self.response_cache is not None:
+            self.response_cache.set(key, response)
+        if self.response_disk_cache is not None:
+            self.response_disk_cache.set(key, response.encode("utf-8"))
+
+    def get_endpoint_stats(self) -> Optional[list[EndpointStats]]:
+        """Returns the metrics of each LLM endpoint.
+
+        Returns:
+            A list of ``EndpointStats``, or None if the LLM has no endpoint pool.
+
+        """
+        endpoint_pool = getattr(self.llm, "endpoint_pool", None)
+        if endpoint_pool is None:
+            return None
+        return endpoint_pool.stats()
+
+    def get_hedge_stats(self) -> Optional[HedgeStats]:
+        """Returns the counters of hedged requests.
+
+        Returns:
+            The ``HedgeStats`` of the hedger, or None if hedging is not enabled.
+
+        """
+        if self.hedger is None:
+            return None
+        return self.hedger.stats()
+
+    def get_semantic_cache_stats(self) -> Optional[SemanticCacheStats]:
+        """Returns the hit rate and the time saved by the semantic cache, or None if it is not enabled."""
+        return self.semantic_cache.stats() if self.semantic_cache is not None else None
+
+
+def _get_chunk_ids(contexts: list[Document]) -> list[str]:
+    """Returns the database IDs of the documents, or a hash of the content for documents without ID."""
+    return [
+        doc.id or hashlib.sha256(doc.content.encode("utf-8")).hexdigest()
+        for doc in contexts
+    ]
+
+
+def _request(
+    llm: BaseLLMModel, prompt: str, system_prompt: Optional[str]
+) -> tuple[BaseLLMModel, str]:
+    """Sends a request and returns the LLM with its response, so that the caller knows which LLM answered."""
+    return llm, llm.request(text=prompt, system_prompt=system_prompt)
+
+
+async def _arequest(
+    llm: BaseLLMModel, prompt: str, system_prompt: Optional[str]
+) -> tuple[BaseLLMModel, str]:
+    """Sends an asynchronous request and returns the LLM with its response."""
+    return llm, await llm.arequest(text=prompt, system_prompt=system_prompt)
+
+
+def _start_stream(
+    llm: BaseLLMModel, prompt: str, system_prompt: Optional[str]
+) -> tuple[BaseLLMModel, Optional[str], Iterator[str]]:
+    """Starts a streaming request and waits for the first part of the response.
+
+    Returns:
+        The LLM, the first part or None if the response is empty, and an iterator over the remaining parts.
+
+    """
+    stream = llm.request_stream(text=prompt, system_prompt=system_prompt)
+    return llm, next(stream, None), stream
+
+
+def _close_stream(
+    started_stream: tuple[BaseLLMModel, Optional[str], Iterator[str]]
+) -> None:
+    """Closes a stream which was started by ``_start_stream``."""
+    _, _, stream = started_stream
+    close = getattr(stream, "close", None)
+    if close:
+        close()
@@ -1,22 +1,35 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import Optional
+import tiktoken
 
 from ragcore.models.document_model import Document
-from ragcore.dto.document_dto import DocumentDTO
+from ragcore.models.text_splitter_model import RecursiveTextSplitter
+from ragcore.shared.constants import SplitterConstants
 
 
 class TextSplitterService:
     """Handles splitting of text.
 
-    To split the documents, a recursive text splitter is used.
+    To split the documents, a recursive text splitter is used. The position of each chunk in its page
+    is stored in the metadata as ``start_index``, so that overlapping chunks can be merged later.
 
     Attributes:
         chunk_size: The size of the chunks.
         chunk_overlap: The overlap of the chunks.
+        length_unit: The unit of the chunk size and the overlap, ``characters`` or ``tokens``.
     """
 
-    def __init__(self, chunk_size: int, chunk_overlap: int):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        length_unit: str = SplitterConstants.LENGTH_UNIT_CHARACTERS,
+        encoding: Optional[tiktoken.Encoding] = None,
+    ):
+        self.text_splitter = RecursiveTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_unit=length_unit,
+            encoding=encoding,
         )
 
     def split_documents(self, documents: list[Document]) -> list[Document]:
@@ -29,25 +42,4 @@ class TextSplitterService:
             A list of split documents.
 
         """
-        documents_lang = []
-
-        for document in documents:
-            document_dto = DocumentDTO(
-                content=document.content,
-                title=document.title,
-                metadata=document.metadata,
-            )
-            documents_lang.append(document_dto.to_langchain())
-
-        splits_lang = self.text_splitter.split_documents(documents=documents_lang)
-
-        splits = []
-        for split_lang in splits_lang:
-            document_dto = DocumentDTO(
-                content=split_lang.page_content,
-                title=split_lang.metadata.get("title", ""),
-                metadata=split_lang.metadata,
-            )
-            splits.append(document_dto.to_ragcore())
-
-        return splits
+        return self.text_splitter.split_documents(documents)
@@ -0,0 +1,397 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Mapping, Optional, Sequence
+import numpy as np
+
+
+@dataclass
+class CacheStats:
+    """Model for the counters of an in-memory cache.
+
+    Attributes:
+        hits: The number of lookups which found a value.
+
+        misses: The number of lookups which did not find a value, including expired values.
+
+        size: The number of entries in the cache.
+
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+class LRUCache:
+    """In-memory key-value cache with least-recently-used eviction.
+
+    The cache is bounded by ``max_entries``. When it is full, the entry which has not been read for the
+    longest time is evicted. The cache is safe to use from several threads, and counts hits and misses.
+
+    Attributes:
+        max_entries: The maximum number of entries in the cache.
+
+        ttl_seconds: An optional time to live for entries in seconds. Expired entries are treated as missing.
+
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the value for the key, or None if the key is not in the cache or has expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[1], now):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Adds a value to the cache and evicts the least recently used entry if the cache is full."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all entries from the cache. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Returns the hit and miss counters and the number of entries."""
+        with self._lock:
+            return CacheStats(
+                hits=self.hits, misses=self.misses, size=len(self._entries)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at < now - self.ttl_seconds
+
+
+class DiskCache:
+    """Persistent key-value cache on local disk with least-recently-used eviction.
+
+    Values are stored as bytes in a SQLite database, so the cache survives restarts and can be shared by
+    several processes on the same machine. When the number of entries exceeds ``max_entries``, the entries
+    which have not been read for the longest time are evicted.
+
+    Attributes:
+        path: Path to the SQLite file. Parent folders are created if they do not exist.
+
+        max_entries: The maximum number of entries in the cache.
+
+        ttl_seconds: An optional time to live for entries in seconds. Expired entries are treated as missing.
+
+    """
+
+    def __init__(
+        self, path: str, max_entries: int, ttl_seconds: Optional[float] = None
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the value for the key, or None if the key is not in the cache."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Returns the cached values for the keys.
+
+        Args:
+            keys: A list of keys.
+
+        Returns:
+            A dict with the keys which are in the cache and their values. Missing keys are omitted.
+
+        """
+        values: dict[str, bytes] = {}
+        if not keys:
+            return values
+
+        now = time.time()
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock, self._connection:
+            # SQLite limits the number of variables per statement.
+            for i in range(0, len(unique_keys), 500):
+                key_slice = unique_keys[i : i + 500]
+                placeholders = ",".join("?" * len(key_slice))
+                rows = self._connection.execute(
+                    f"SELECT key, value, created_at FROM entries WHERE key IN ({placeholders})",
+                    key_slice,
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if self._is_expired(created_at, now):
+                        continue
+                    values[key] = value
+
+            self._connection.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in values],
+            )
+
+        return values
+
+    def set(self, key: str, value: bytes) -> None:
+        """Adds a value to the cache, replacing an existing value for the key."""
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping[str, bytes]) -> None:
+        """Adds values to the cache and evicts the least recently used entries if the cache is full.
+
+        Args:
+            items: A mapping from keys to values.
+
+        """
+        if not items:
+            return
+
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()],
+            )
+            if self.ttl_seconds is not None:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+            (num_entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()
+            if num_entries > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                    (num_entries - self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (num_entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()
+        return num_entries
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at < now - self.ttl_seconds
+
+
+@dataclass
+class SemanticCacheStats:
+    """Model for the counters of a semantic cache.
+
+    Attributes:
+        hits: The number of lookups which returned a cached answer.
+
+        misses: The number of lookups which did not return a cached answer.
+
+        hit_rate: The share of lookups which returned a cached answer, between 0 and 1.
+
+        saved_seconds: The sum of the durations of the original requests for all answers returned from the cache.
+
+        size: The number of entries in the cache.
+
+    """
+
+    hits: int
+    misses: int
+    hit_rate: float
+    saved_seconds: float
+    size: int
+
+
+@dataclass
+class _SemanticCacheEntry:
+    user: Optional[str]
+    embedding: np.ndarray
+    chunk_ids: tuple[str, ...]
+    answer: str
+    duration_seconds: float
+
+
+class SemanticCache:
+    """In-memory cache for answers to similar questions.
+
+    An answer is returned for a new question if the cosine similarity of the question vector to the vector
+    of a cached question is at least ``threshold``, and if the same chunks were retrieved for both. Requiring
+    the same chunks makes sure that the cached answer is based on the same context as a new answer would be.
+
+    Entries are stored per user, so that they can be invalidated when the documents of a user change. When
+    the cache is full, the least recently used entry is evicted.
+
+    Attributes:
+        threshold: The minimum cosine similarity between the vectors of two questions to share an answer.
+
+        max_entries: The maximum number of entries in the cache, for all users.
+
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries: OrderedDict[int, _SemanticCacheEntry] = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: Sequence[str],
+        user: Optional[str] = None,
+    ) -> Optional[str]:
+        """Returns the cached answer for a question, or None if there is no similar question.
+
+        Args:
+            embedding: The vector of the question.
+
+            chunk_ids: The IDs of the chunks which were retrieved for the question, in order.
+
+            user: An optional string to identify a user.
+
+        Returns:
+            The answer of the most similar cached question with the same chunks, or None.
+
+        """
+        query = _normalize_vector(embedding)
+        chunk_ids = tuple(chunk_ids)
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.user == user and entry.chunk_ids == chunk_ids
+            ]
+            best_key = None
+            if candidates:
+                scores = np.stack([entry.embedding for _, entry in candidates]) @ query
+                index = int(np.argmax(scores))
+                if scores[index] >= self.threshold:
+                    best_key = candidates[index][0]
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.saved_seconds += entry.duration_seconds
+            return entry.answer
+
+    def set(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: Sequence[str],
+        answer: str,
+        duration_seconds: float,
+        user: Optional[str] = None,
+    ) -> None:
+        """Adds an answer to the cache.
+
+        Args:
+            embedding: The vector of the question.
+
+            chunk_ids: The IDs of the chunks which were retrieved for the question, in order.
+
+            answer: The answer to the question.
+
+            duration_seconds: The duration of the request which created the answer.
+
+            user: An optional string to identify a user.
+
+        """
+        if self.max_entries <= 0:
+            return
+        entry = _SemanticCacheEntry(
+            user=user,
+            embedding=_normalize_vector(embedding),
+            chunk_ids=tuple(chunk_ids),
+            answer=answer,
+            duration_seconds=duration_seconds,
+        )
+        with self._lock:
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user: Optional[str] = None) -> None:
+        """Removes all entries of a user, for example after documents have been added or deleted."""
+        with self._lock:
+            for key in [
+                key for key, entry in self._entries.items() if entry.user == user
+            ]:
+                del self._entries[key]
+
+    def stats(self) -> SemanticCacheStats:
+        """Returns the hit and miss counters, the hit rate and the time saved by cache hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return SemanticCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+                saved_seconds=self.saved_seconds,
+                size=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _normalize_vector(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,338 @@
+import asyncio
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import random
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from ragcore.shared.constants import ConcurrencyConstants
+
+T = TypeVar("T")
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Errors which do not change the limit, but are retried with an exponential backoff like the client would.
+# ``APITimeoutError`` is a subclass of ``APIConnectionError``.
+TRANSIENT_ERRORS = (APIConnectionError, InternalServerError)
+
+
+@dataclass
+class ConcurrencyStats:
+    """Model for the state of a concurrency controller.
+
+    Attributes:
+        limit: The current maximum number of requests in flight.
+
+        in_flight: The number of requests in flight.
+
+        request_count: The total number of requests which have been sent.
+
+        throttle_count: The total number of requests which have been throttled by the provider.
+
+    """
+
+    limit: int
+    in_flight: int
+    request_count: int
+    throttle_count: int
+
+
+class AdaptiveConcurrencyController:
+    """Limits the number of requests in flight to a provider and adapts the limit to rate limiting.
+
+    The limit follows an additive-increase/multiplicative-decrease (AIMD) scheme. Each successful request
+    increases the limit by ``1 / limit``, so roughly by one per round of requests, up to ``max_limit``.
+    When the provider throttles a request with status 429, or reports that no requests or tokens are
+    remaining, the limit is multiplied by ``decrease_factor`` and no requests are sent until the time
+    given in the ``retry-after`` header has passed. Throttled requests are retried up to ``max_retries``
+    times.
+
+    Clients are used without their own retries when a controller is set, so the controller also retries
+    connection errors, timeouts and server errors up to ``max_retries`` times, with an exponential backoff
+    and without changing the limit.
+
+    A request only decreases the limit if it was sent after the last decrease, so a burst of throttled
+    requests counts as a single event.
+
+    Attributes:
+        min_limit: The lowest limit.
+
+        max_limit: The highest limit, and the initial limit.
+
+        decrease_factor: The factor by which the limit is multiplied when requests are throttled.
+
+        max_retries: The maximum number of retries of a throttled request.
+
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        decrease_factor: float = ConcurrencyConstants.DEFAULT_DECREASE_FACTOR,
+        max_retries: int = ConcurrencyConstants.DEFAULT_MAX_RETRIES,
+    ):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._request_count = 0
+        self._throttle_count = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        # Events of waiting coroutines, with their event loops, which are set when a slot may be free.
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def limit(self) -> int:
+        """The current maximum number of requests in flight."""
+        return int(self._limit)
+
+    def stats(self) -> ConcurrencyStats:
+        """Returns the current limit, the requests in flight, and the request and throttle counts."""
+        with self._condition:
+            return ConcurrencyStats(
+                limit=self.limit,
+                in_flight=self._in_flight,
+                request_count=self._request_count,
+                throttle_count=self._throttle_count,
+            )
+
+    def call(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Calls a function which makes a provider request once the limit allows it.
+
+        If the result has ``headers``, for example a raw response of the OpenAI SDK, the rate limit
+        headers are used to adapt the limit.
+
+        Args:
+            function: The function which makes the request.
+
+            args: The positional arguments for the function.
+
+            kwargs: The keyword arguments for the function.
+
+        Returns:
+            The result of the function.
+
+        """
+        retries = 0
+        while True:
+            started = self._acquire()
+            backoff: Optional[float] = None
+            try:
+                result = function(*args, **kwargs)
+            except RateLimitError as error:
+                self._on_throttle(started, error.response.headers)
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                continue
+            except TRANSIENT_ERRORS:
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                backoff = _get_backoff_seconds(retries)
+            finally:
+                self._release()
+            if backoff is not None:
+                time.sleep(backoff)
+                continue
+            self._on_success(started, getattr(result, "headers", None))
+            return result
+
+    async def acall(
+        self, function: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """Awaits a coroutine function which makes a provider request once the limit allows it.
+
+        Args:
+            function: The coroutine function which makes the request.
+
+            args: The positional arguments for the function.
+
+            kwargs: The keyword arguments for the function.
+
+        Returns:
+            The result of the function.
+
+        """
+        retries = 0
+        while True:
+            started = await self._aacquire()
+            backoff: Optional[float] = None
+            try:
+                result = await function(*args, **kwargs)
+            except RateLimitError as error:
+                self._on_throttle(started, error.response.headers)
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                continue
+            except TRANSIENT_ERRORS:
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                backoff = _get_backoff_seconds(retries)
+            finally:
+                self._release()
+            if backoff is not None:
+                await asyncio.sleep(backoff)
+                continue
+            self._on_success(started, getattr(result, "headers", None))
+            return result
+
+    def _try_acquire(self) -> tuple[Optional[float], Optional[float]]:
+        """Takes a slot if one is free.
+
+        Returns the start time, or None and the time until the pause ends. The time is None if all
+        slots are taken, in which case waiters are notified when a slot is released.
+
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return None, self._paused_until - now
+        if self._in_flight >= self.limit:
+            return None, None
+        self._in_flight += 1
+        self._request_count += 1
+        return now, 0.0
+
+    def _acquire(self) -> float:
+        with self._condition:
+            while True:
+                started, wait = self._try_acquire()
+                if started is not None:
+                    return started
+                self._condition.wait(timeout=wait)
+
+    async def _aacquire(self) -> float:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                started, wait = self._try_acquire()
+                if started is not None:
+                    return started
+                waiter = (loop, asyncio.Event())
+                self._async_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1].wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def _notify(self) -> None:
+        """Wakes up all waiters, in threads and in event loops. Must be called with the condition held."""
+        self._condition.notify_all()
+        for loop, event in self._async_waiters:
+            # The event belongs to its loop, which can run in another thread.
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop is closed, so the waiter is gone.
+                pass
+        self._async_waiters.clear()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._notify()
+
+    def _on_success(self, started: float, headers: Optional[Mapping[str, str]]):
+        if headers is not None and self._is_exhausted(headers):
+            self._decrease(started, self._get_reset_seconds(headers))
+            return
+        with self._condition:
+            self._limit = min(self._limit + 1 / self._limit, float(self.max_limit))
+            self._notify()
+
+    def _on_throttle(self, started: float, headers: Mapping[str, str]) -> None:
+        with self._condition:
+            self._throttle_count += 1
+        self._decrease(started, self._get_retry_after_seconds(headers))
+
+    def _decrease(self, started: float, pause_seconds: float) -> None:
+        with self._condition:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + pause_seconds)
+            # Requests which were sent before the last decrease do not decrease the limit again.
+            if started >= self._last_decrease:
+                self._limit = max(
+                    self._limit * self.decrease_factor, float(self.min_limit)
+                )
+                self._last_decrease = now
+
+    @staticmethod
+    def _is_exhausted(headers: Mapping[str, str]) -> bool:
+        """Returns True if the provider reports that no requests or tokens are remaining."""
+        for key in (
+            ConcurrencyConstants.HEADER_REMAINING_REQUESTS,
+            ConcurrencyConstants.HEADER_REMAINING_TOKENS,
+        ):
+            value = headers.get(key)
+            if value is not None and value.isdigit() and int(value) == 0:
+                return True
+        return False
+
+    @staticmethod
+    def _get_reset_seconds(headers: Mapping[str, str]) -> float:
+        """Returns the time until the rate limit resets, for example from ``x-ratelimit-reset-requests: 1m3s``."""
+        resets = [
+            _parse_duration(headers.get(key, ""))
+            for key in (
+                ConcurrencyConstants.HEADER_RESET_REQUESTS,
+                ConcurrencyConstants.HEADER_RESET_TOKENS,
+            )
+        ]
+        return max(resets + [0.0])
+
+    @staticmethod
+    def _get_retry_after_seconds(headers: Mapping[str, str]) -> float:
+        """Returns the time to wait from the ``retry-after-ms`` or ``retry-after`` headers."""
+        retry_after_ms = headers.get(ConcurrencyConstants.HEADER_RETRY_AFTER_MS)
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get(ConcurrencyConstants.HEADER_RETRY_AFTER)
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+            try:
+                return max(
+                    parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0
+                )
+            except (TypeError, ValueError):
+                pass
+
+        return ConcurrencyConstants.DEFAULT_RETRY_AFTER_SECONDS
+
+
+def _get_backoff_seconds(retries: int) -> float:
+    """Returns the time to wait before a retry, which doubles with each retry and has a random jitter."""
+    backoff = min(
+        ConcurrencyConstants.INITIAL_BACKOFF_SECONDS * 2 ** (retries - 1),
+        ConcurrencyConstants.MAX_BACKOFF_SECONDS,
+    )
+    return backoff * (1 - 0.25 * random.random())
+
+
+def _parse_duration(value: str) -> float:
+    """Parses a duration like ``6m0s`` or ``250ms`` into seconds. Returns 0 for invalid values."""
+    return sum(
+        float(amount) * DURATION_UNITS[unit]
+        for amount, unit in DURATION_PATTERN.findall(value)
+    )
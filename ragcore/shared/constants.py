@@ -10,6 +10,33 @@ class AppConstants:
     KEY_CONFIGURATION_PATH = "config_path"
     KEY_LOGGER_FLAG = "verbose_logger"
     DEFAULT_CONFIG_FILE_PATH = "./config.yaml"
+    KEY_COMMAND = "command"
+    KEY_INGEST_TARGET = "target"
+    KEY_INGEST_WORKERS = "workers"
+    KEY_USER = "user"
+    KEY_INGEST_UPDATE = "update"
+    COMMAND_INGEST = "ingest"
+    DEFAULT_INGEST_WORKERS = 4
+    INGEST_STATUS_ADDED = "added"
+    INGEST_STATUS_SKIPPED = "skipped"
+    INGEST_STATUS_UPDATED = "updated"
+    INGEST_STATUS_FAILED = "failed"
+
+
+class ConcurrencyConstants:
+    """Constants for the adaptive concurrency controller."""
+
+    DEFAULT_DECREASE_FACTOR = 0.5
+    DEFAULT_MAX_RETRIES = 5
+    DEFAULT_RETRY_AFTER_SECONDS = 1.0
+    INITIAL_BACKOFF_SECONDS = 0.5
+    MAX_BACKOFF_SECONDS = 8.0
+    HEADER_RETRY_AFTER = "retry-after"
+    HEADER_RETRY_AFTER_MS = "retry-after-ms"
+    HEADER_REMAINING_REQUESTS = "x-ratelimit-remaining-requests"
+    HEADER_REMAINING_TOKENS = "x-ratelimit-remaining-tokens"
+    HEADER_RESET_REQUESTS = "x-ratelimit-reset-requests"
+    HEADER_RESET_TOKENS = "x-ratelimit-reset-tokens"
 
 
 class ConfigurationConstants:
@@ -27,6 +54,14 @@ class ConfigurationConstants:
     KEY_SPLITTER = "splitter"
     KEY_CHUNK_SIZE = "chunk_size"
     KEY_CHUNK_OVERLAP = "chunk_overlap"
+    KEY_LENGTH_UNIT = "length_unit"
+
+    # Loader
+    KEY_LOADER = "loader"
+    KEY_LOADER_WORKERS = "workers"
+    KEY_LOADER_MIN_PAGES_PER_WORKER = "min_pages_per_worker"
+    KEY_LOADER_BATCH_SIZE = "batch_size"
+    KEY_LOADER_QUEUE_SIZE = "queue_size"
 
     # Embedding
     KEY_EMBEDDING = "embedding"
@@ -34,6 +69,22 @@ class ConfigurationConstants:
     KEY_EMBEDDING_MODEL = "model"
     KEY_EMBEDDING_AZURE_OPENAI_API_VERSION = "api_version"
     KEY_EMBEDDING_AZURE_OPENAI_AZURE_ENDPOINT = "endpoint"
+    KEY_EMBEDDING_CACHE_DIR = "cache_dir"
+    KEY_EMBEDDING_CACHE_MAX_ENTRIES = "cache_max_entries"
+    KEY_EMBEDDING_MAX_CONCURRENCY = "max_concurrency"
+    KEY_EMBEDDING_MAX_TOKENS_PER_BATCH = "max_tokens_per_batch"
+    KEY_EMBEDDING_BATCH_WINDOW_MS = "batch_window_ms"
+    KEY_EMBEDDING_BATCH_MAX_SIZE = "batch_max_size"
+    KEY_EMBEDDING_ADAPTIVE_CONCURRENCY = "adaptive_concurrency"
+    KEY_EMBEDDING_DIMENSIONS = "dimensions"
+    KEY_EMBEDDING_QUERY_CACHE_MAX_ENTRIES = "query_cache_max_entries"
+    KEY_EMBEDDING_QUERY_CACHE_TTL_SECONDS = "query_cache_ttl_seconds"
+
+    # Endpoint pools, for the embedding and the LLM
+    KEY_ENDPOINTS = "endpoints"
+    KEY_ENDPOINT_ROUTING = "endpoint_routing"
+    KEY_ENDPOINT_MAX_ERRORS = "endpoint_max_errors"
+    KEY_ENDPOINT_EJECTION_SECONDS = "endpoint_ejection_seconds"
 
     # LLMs
     KEY_LLM = "llm"
@@ -41,16 +92,62 @@ class ConfigurationConstants:
     KEY_LLM_MODEL = "model"
     LLM_PROVIDER_OPENAI = "openai"
     LLM_PROVIDER_AZUREOPENAI = "azure"
+    LLM_PROVIDER_LOCAL = "local"
+    KEY_LLM_MAX_CONCURRENCY = "max_concurrency"
+    KEY_LLM_ADAPTIVE_CONCURRENCY = "adaptive_concurrency"
+    KEY_LLM_SEMANTIC_CACHE_THRESHOLD = "semantic_cache_threshold"
+    KEY_LLM_SEMANTIC_CACHE_MAX_ENTRIES = "semantic_cache_max_entries"
+    KEY_LLM_RESPONSE_CACHE_MAX_ENTRIES = "response_cache_max_entries"
+    KEY_LLM_RESPONSE_CACHE_DIR = "response_cache_dir"
+    KEY_LLM_RESPONSE_CACHE_DISK_MAX_ENTRIES = "response_cache_disk_max_entries"
+    KEY_LLM_RESPONSE_CACHE_TTL_SECONDS = "response_cache_ttl_seconds"
+    KEY_LLM_MAX_CONTEXT_TOKENS = "max_context_tokens"
+    KEY_LLM_SYSTEM_PROMPT_TEMPLATE = "system_prompt_template"
+    KEY_LLM_PROMPT_TEMPLATE = "prompt_template"
+    KEY_LLM_HEDGE_PERCENTILE = "hedge_percentile"
+    KEY_LLM_HEDGE_MODEL = "hedge_model"
+    KEY_LLM_HEDGE_MAX_PER_MINUTE = "hedge_max_per_minute"
+    KEY_LLM_SIMULATED_LATENCY_SECONDS = "simulated_latency_seconds"
+    KEY_LLM_SIMULATED_TOKENS_PER_SECOND = "simulated_tokens_per_second"
+    KEY_LLM_SIMULATED_RESPONSE_TOKENS = "simulated_response_tokens"
     KEY_AZURE_OPENAI_API_VERSION = "api_version"
     KEY_AZURE_OPENAI_AZURE_ENDPOINT = "endpoint"
 
 
+class LoaderConstants:
+    """Constants for document loaders."""
+
+    DEFAULT_WORKERS = 1
+    DEFAULT_MIN_PAGES_PER_WORKER = 50
+    RANGES_PER_WORKER = 4
+    DEFAULT_BATCH_SIZE = 64
+    DEFAULT_QUEUE_SIZE = 2
+
+
+class SplitterConstants:
+    """Constants for text splitters."""
+
+    LENGTH_UNIT_CHARACTERS = "characters"
+    LENGTH_UNIT_TOKENS = "tokens"
+    DEFAULT_SEPARATORS = ("\n\n", "\n", " ", "")
+
+
+class PipelineConstants:
+    """Constants for pipelines of worker threads."""
+
+    POLL_INTERVAL_SECONDS = 0.1
+
+
 class DataConstants:
     """Constants for the data model."""
 
     KEY_TITLE = "title"
     KEY_PAGE = "page"
     KEY_DOC = "doc"
+    KEY_TOKEN_COUNT = "token_count"
+    KEY_TOKEN_ENCODING = "token_encoding"
+    KEY_START_INDEX = "start_index"
+    KEY_CONTENT_HASH = "content_hash"
 
 
 class DatabaseConstants:
@@ -58,8 +155,11 @@ class DatabaseConstants:
 
     PROVIDER_CHROMA = "chroma"
     PROVIDER_PINECONE = "pinecone"
+    PINECONE_BATCH_SIZE = 100
     KEY_DOC = "doc"
     KEY_DOCUMENTS = "documents"
+    KEY_IDS = "ids"
+    MAX_PARALLEL_QUERIES = 16
     KEY_HEADERS_ACCEPT = "accept"
     KEY_METADATAS = "metadatas"
     KEY_METADATA = "metadata"
@@ -83,6 +183,37 @@ class EmbeddingConstants:
     KEY_AZURE_OPENAI_API_KEY = "AZURE_OPENAI_API_KEY"
     PROVIDER_AZURE_OPENAI = "azure"
     PROVIDER_OPENAI = "openai"
+    PROVIDER_LOCAL = "local"
+    LOCAL_DEFAULT_DIMENSIONS = 384
+    CACHE_FILENAME = "embeddings.sqlite3"
+    DEFAULT_CACHE_MAX_ENTRIES = 100_000
+    DEFAULT_MAX_BATCH_SIZE = 200
+    DEFAULT_MAX_CONCURRENCY = 4
+    DEFAULT_MAX_TOKENS_PER_BATCH = 100_000
+    DEFAULT_BATCH_MAX_SIZE = 64
+    DEFAULT_QUERY_CACHE_MAX_ENTRIES = 1024
+
+
+class EndpointConstants:
+    """Constants for pools of provider endpoints."""
+
+    ROUTING_LEAST_OUTSTANDING = "least_outstanding"
+    ROUTING_LATENCY = "latency"
+    DEFAULT_MAX_ERRORS = 3
+    DEFAULT_EJECTION_SECONDS = 30.0
+    LATENCY_SMOOTHING = 0.2
+
+
+class HedgingConstants:
+    """Constants for hedged requests."""
+
+    KIND_REQUEST = "request"
+    KIND_STREAM = "stream"
+    DEFAULT_MAX_HEDGES_PER_MINUTE = 60
+    DEFAULT_WINDOW_SIZE = 200
+    DEFAULT_MIN_SAMPLES = 20
+    DEFAULT_MAX_WORKERS = 8
+    RATE_WINDOW_SECONDS = 60.0
 
 
 class LLMProviderConstants:
@@ -90,3 +221,8 @@ class LLMProviderConstants:
 
     KEY_AZURE_OPENAI_API_KEY = "AZURE_OPENAI_API_KEY"
     KEY_OPENAI_API_KEY = "OPENAI_API_KEY"
+    DEFAULT_MAX_CONCURRENCY = 8
+    DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES = 1000
+    DEFAULT_RESPONSE_CACHE_DISK_MAX_ENTRIES = 10_000
+    RESPONSE_CACHE_FILENAME = "responses.sqlite3"
+    DEFAULT_LOCAL_RESPONSE_TOKENS = 64
@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from ragcore.shared.constants import EndpointConstants
+from ragcore.shared.errors import UserConfigurationError
+
+T = TypeVar("T")
+
+
+@dataclass
+class EndpointStats:
+    """Model for the state of an endpoint in an endpoint pool.
+
+    Attributes:
+        endpoint: The URL of the endpoint.
+
+        in_flight: The number of requests in flight.
+
+        request_count: The total number of requests which have been sent to the endpoint.
+
+        error_count: The total number of requests which failed because of the endpoint.
+
+        average_latency: The moving average of the latency of successful requests in seconds, or None if
+            no request has succeeded yet.
+
+        healthy: False if the endpoint is ejected because of repeated errors.
+
+    """
+
+    endpoint: str
+    in_flight: int
+    request_count: int
+    error_count: int
+    average_latency: Optional[float]
+    healthy: bool
+
+
+class _Endpoint:
+    """The mutable state of an endpoint. It is only changed while the lock of the pool is held."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.in_flight = 0
+        self.request_count = 0
+        self.error_count = 0
+        self.consecutive_errors = 0
+        self.average_latency: Optional[float] = None
+        self.ejected_until = 0.0
+
+
+class EndpointPool:
+    """Routes requests to one of several endpoints of a provider, for example regional Azure deployments.
+
+    With the routing ``least_outstanding``, a request is sent to the endpoint with the fewest requests in
+    flight. With the routing ``latency``, the expected wait is estimated from the moving average of the
+    latency and the number of requests in flight, and the endpoint with the shortest wait is used.
+    Endpoints without a measured latency are tried first.
+
+    An endpoint which fails ``max_errors`` times in a row, because of connection errors, rate limiting, or
+    server errors, is ejected for ``ejection_seconds``. Afterwards, it receives requests again, and one
+    more error ejects it again. If all endpoints are ejected, the endpoint which returns first is used.
+
+    Attributes:
+        endpoints: The URLs of the endpoints.
+
+        routing: The routing strategy, either ``least_outstanding`` or ``latency``.
+
+        max_errors: The number of consecutive errors after which an endpoint is ejected.
+
+        ejection_seconds: The time in seconds for which an endpoint is ejected.
+
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        routing: str = EndpointConstants.ROUTING_LEAST_OUTSTANDING,
+        max_errors: int = EndpointConstants.DEFAULT_MAX_ERRORS,
+        ejection_seconds: float = EndpointConstants.DEFAULT_EJECTION_SECONDS,
+    ):
+        if not endpoints:
+            raise UserConfigurationError(
+                "An endpoint pool requires at least one endpoint."
+            )
+        if routing not in (
+            EndpointConstants.ROUTING_LEAST_OUTSTANDING,
+            EndpointConstants.ROUTING_LATENCY,
+        ):
+            raise UserConfigurationError(f"Unsupported endpoint routing: {routing}")
+        self.endpoints = list(endpoints)
+        self.routing = routing
+        self.max_errors = max(max_errors, 1)
+        self.ejection_seconds = ejection_seconds
+        self._states = [_Endpoint(endpoint) for endpoint in self.endpoints]
+        self._lock = threading.Lock()
+
+    def stats(self) -> list[EndpointStats]:
+        """Returns the metrics of each endpoint, in the order of the endpoints."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                EndpointStats(
+                    endpoint=state.endpoint,
+                    in_flight=state.in_flight,
+                    request_count=state.request_count,
+                    error_count=state.error_count,
+                    average_latency=state.average_latency,
+                    healthy=state.ejected_until <= now,
+                )
+                for state in self._states
+            ]
+
+    def call(self, function: Callable[[str], T]) -> T:
+        """Calls a function which makes a request to the endpoint which is selected by the routing.
+
+        Args:
+            function: The function which makes the request. It is called with the URL of the endpoint.
+
+        Returns:
+            The result of the function.
+
+        """
+        state, started = self._acquire()
+        try:
+            result = function(state.endpoint)
+        except BaseException as error:
+            self._release(state, started, error)
+            raise
+        self._release(state, started)
+        return result
+
+    async def acall(self, function: Callable[[str], Awaitable[T]]) -> T:
+        """Awaits a coroutine function which makes a request to the endpoint which is selected by the routing.
+
+        Args:
+            function: The coroutine function which makes the request. It is called with the URL of the endpoint.
+
+        Returns:
+            The result of the function.
+
+        """
+        state, started = self._acquire()
+        try:
+            result = await function(state.endpoint)
+        except BaseException as error:
+            self._release(state, started, error)
+            raise
+        self._release(state, started)
+        return result
+
+    def _acquire(self) -> tuple[_Endpoint, float]:
+        """Selects an endpoint and counts the request as in flight."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [state for state in self._states if state.ejected_until <= now]
+            if not healthy:
+                state = min(self._states, key=lambda state: state.ejected_until)
+            elif self.routing == EndpointConstants.ROUTING_LATENCY:
+                state = min(
+                    healthy,
+                    key=lambda state: (
+                        (state.average_latency or 0.0) * (state.in_flight + 1),
+                        state.request_count,
+                    ),
+                )
+            else:
+                state = min(
+                    healthy, key=lambda state: (state.in_flight, state.request_count)
+                )
+            state.in_flight += 1
+            state.request_count += 1
+        return state, now
+
+    def _release(
+        self, state: _Endpoint, started: float, error: Optional[BaseException] = None
+    ) -> None:
+        """Updates the metrics and the health of an endpoint after a request."""
+        now = time.monotonic()
+        with self._lock:
+            state.in_flight -= 1
+            if error is None:
+                latency = now - started
+                state.consecutive_errors = 0
+                state.average_latency = (
+                    latency
+                    if state.average_latency is None
+                    else state.average_latency
+                    + EndpointConstants.LATENCY_SMOOTHING
+                    * (latency - state.average_latency)
+                )
+            elif _is_endpoint_error(error):
+                state.error_count += 1
+                state.consecutive_errors += 1
+                if state.consecutive_errors >= self.max_errors:
+                    state.ejected_until = now + self.ejection_seconds
+
+
+def _is_endpoint_error(error: BaseException) -> bool:
+    """Returns True if an error is caused by the endpoint rather than by the request."""
+    if isinstance(error, (APIConnectionError, RateLimitError, OSError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
@@ -0,0 +1,320 @@
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ragcore.shared.constants import HedgingConstants
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgeStats:
+    """Model for the state of a request hedger.
+
+    Attributes:
+        request_count: The total number of requests which have been sent, without hedges.
+
+        hedge_count: The total number of hedged requests which have been sent.
+
+        hedge_win_count: The number of hedged requests which finished before the original request.
+
+    """
+
+    request_count: int
+    hedge_count: int
+    hedge_win_count: int
+
+
+class RequestHedger:
+    """Sends a duplicate request if a request takes longer than most recent requests, and uses the first response.
+
+    The latencies of recent requests are kept in a window for each kind of request, for example complete
+    responses and the first token of streams. Once a window has ``min_samples`` latencies, a request which
+    has not finished after the ``percentile`` of the window is hedged: a second request is sent, and the
+    result of the request which finishes first is returned. At most ``max_hedges_per_minute`` hedged
+    requests are sent, so that the additional cost is bounded.
+
+    Asynchronous requests which lose are cancelled. A synchronous request cannot be interrupted, so the
+    request which loses runs to completion in its worker thread and its result is discarded. The worker
+    threads of synchronous requests are shared by all calls of the hedger, and requests never wait for a
+    worker: if all workers are busy, a request is sent in the calling thread without a hedge, and a
+    hedge is only sent if a worker is free.
+
+    Only the latencies of original requests are recorded, also if the hedged request wins, so that the
+    window is not biased towards fast requests. The latency is measured from the time the request starts,
+    so it does not include any scheduling delay. A cancelled original request is recorded with the time
+    until it was cancelled, which is a lower bound of its latency.
+
+    Attributes:
+        percentile: The percentile of recent latencies after which a request is hedged, between 0 and 100.
+
+        max_hedges_per_minute: The maximum number of hedged requests in any minute.
+
+        window_size: The number of recent latencies of each kind which are kept.
+
+        min_samples: The number of latencies which are required before requests are hedged.
+
+        max_workers: The maximum number of worker threads for synchronous requests. Each hedged call uses
+            up to two workers.
+
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        max_hedges_per_minute: int = HedgingConstants.DEFAULT_MAX_HEDGES_PER_MINUTE,
+        window_size: int = HedgingConstants.DEFAULT_WINDOW_SIZE,
+        min_samples: int = HedgingConstants.DEFAULT_MIN_SAMPLES,
+        max_workers: int = HedgingConstants.DEFAULT_MAX_WORKERS,
+    ):
+        self.percentile = min(max(percentile, 0.0), 100.0)
+        self.max_hedges_per_minute = max_hedges_per_minute
+        self.window_size = window_size
+        self.min_samples = max(min_samples, 1)
+        self.max_workers = max(max_workers, 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._busy_workers = 0
+        self._latencies: dict[str, deque[float]] = {}
+        self._hedge_times: deque[float] = deque()
+        self._request_count = 0
+        self._hedge_count = 0
+        self._hedge_win_count = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> HedgeStats:
+        """Returns the counters of the hedger."""
+        with self._lock:
+            return HedgeStats(
+                request_count=self._request_count,
+                hedge_count=self._hedge_count,
+                hedge_win_count=self._hedge_win_count,
+            )
+
+    def get_delay(self, kind: str = HedgingConstants.KIND_REQUEST) -> Optional[float]:
+        """Returns the time in seconds after which a request of a kind is hedged.
+
+        Args:
+            kind: The kind of request.
+
+        Returns:
+            The percentile of the recent latencies, or None if there are not enough latencies yet.
+
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(kind, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = round(self.percentile / 100 * (len(latencies) - 1))
+        return latencies[index]
+
+    def record(self, seconds: float, kind: str = HedgingConstants.KIND_REQUEST) -> None:
+        """Adds the latency of a finished request to the window of its kind.
+
+        Args:
+            seconds: The latency in seconds.
+
+            kind: The kind of request.
+
+        """
+        with self._lock:
+            latencies = self._latencies.get(kind)
+            if latencies is None:
+                latencies = self._latencies[kind] = deque(maxlen=self.window_size)
+            latencies.append(seconds)
+
+    def call(
+        self,
+        primary: Callable[[], T],
+        hedge: Callable[[], T],
+        kind: str = HedgingConstants.KIND_REQUEST,
+        on_discard: Optional[Callable[[T], Any]] = None,
+    ) -> T:
+        """Calls a function, and a hedge function if the first call does not finish in time.
+
+        Args:
+            primary: The function which sends the request.
+
+            hedge: The function which sends the hedged request.
+
+            kind: The kind of request, which selects the window of latencies.
+
+            on_discard: An optional function which is called with the result of the request which loses,
+                for example to close a stream.
+
+        Returns:
+            The result of the request which finishes first without an error.
+
+        Raises:
+            Exception: The error of the original request, if both requests fail.
+
+        """
+        delay = self.get_delay(kind)
+        self._count_request()
+
+        if delay is None or not self._try_reserve_worker():
+            started = time.monotonic()
+            result = primary()
+            self.record(time.monotonic() - started, kind)
+            return result
+
+        def record_primary() -> T:
+            # The latency is recorded when the original request finishes, also if the hedged request has won.
+            started = time.monotonic()
+            result = primary()
+            self.record(time.monotonic() - started, kind)
+            return result
+
+        executor = self._get_executor()
+        primary_future = executor.submit(record_primary)
+        primary_future.add_done_callback(self._release_worker)
+        done, _ = wait([primary_future], timeout=delay)
+        if done or not self._try_reserve_worker():
+            return primary_future.result()
+        if not self._try_acquire():
+            self._release_worker()
+            return primary_future.result()
+
+        hedge_future = executor.submit(hedge)
+        hedge_future.add_done_callback(self._release_worker)
+        pending: set[Future] = {primary_future, hedge_future}
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next(
+                (future for future in done if future.exception() is None), None
+            )
+        if winner is None:
+            # Both requests have failed, so this raises the error of the original request.
+            return primary_future.result()
+
+        loser = hedge_future if winner is primary_future else primary_future
+        if winner is hedge_future:
+            self._count_hedge_win()
+        loser.cancel()
+        if on_discard:
+            loser.add_done_callback(_get_discard_callback(on_discard))
+        return winner.result()
+
+    async def acall(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+        kind: str = HedgingConstants.KIND_REQUEST,
+    ) -> T:
+        """Awaits a coroutine function, and a hedge coroutine function if the first request does not finish in time.
+
+        The request which loses is cancelled. If the caller is cancelled, both requests are cancelled.
+
+        Args:
+            primary: The coroutine function which sends the request.
+
+            hedge: The coroutine function which sends the hedged request.
+
+            kind: The kind of request, which selects the window of latencies.
+
+        Returns:
+            The result of the request which finishes first without an error.
+
+        Raises:
+            Exception: The error of the original request, if both requests fail.
+
+        """
+        delay = self.get_delay(kind)
+        self._count_request()
+        started = time.monotonic()
+
+        if delay is None:
+            result = await primary()
+            self.record(time.monotonic() - started, kind)
+            return result
+
+        primary_task = asyncio.ensure_future(primary())
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._try_acquire():
+                result = await primary_task
+                self.record(time.monotonic() - started, kind)
+                return result
+
+            hedge_task = asyncio.ensure_future(hedge())
+            tasks.append(hedge_task)
+            pending = set(tasks)
+            winner = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next((task for task in done if task.exception() is None), None)
+            if winner is None:
+                # Both requests have failed, so this raises the error of the original request.
+                return primary_task.result()
+
+            if winner is hedge_task:
+                self._count_hedge_win()
+            # If the hedged request has won, the original request is cancelled, and the time until now is
+            # a lower bound of its latency.
+            self.record(time.monotonic() - started, kind)
+            return winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Returns the executor for synchronous requests, which is created on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hedge"
+                )
+            return self._executor
+
+    def _try_reserve_worker(self) -> bool:
+        """Returns True and reserves a worker thread, if one is free."""
+        with self._lock:
+            if self._busy_workers >= self.max_workers:
+                return False
+            self._busy_workers += 1
+            return True
+
+    def _release_worker(self, _: Optional[Future] = None) -> None:
+        """Releases a reserved worker thread, also as a callback of the future which used it."""
+        with self._lock:
+            self._busy_workers -= 1
+
+    def _try_acquire(self) -> bool:
+        """Returns True and counts a hedge, if another hedge is allowed in the current minute."""
+        now = time.monotonic()
+        with self._lock:
+            while (
+                self._hedge_times
+                and now - self._hedge_times[0] >= HedgingConstants.RATE_WINDOW_SECONDS
+            ):
+                self._hedge_times.popleft()
+            if len(self._hedge_times) >= self.max_hedges_per_minute:
+                return False
+            self._hedge_times.append(now)
+            self._hedge_count += 1
+            return True
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self._request_count += 1
+
+    def _count_hedge_win(self) -> None:
+        with self._lock:
+            self._hedge_win_count += 1
+
+
+def _get_discard_callback(on_discard: Callable[[T], Any]) -> Callable[[Future], None]:
+    """Returns a callback which passes the result of a finished future to ``on_discard``."""
+
+    def callback(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            on_discard(future.result())
+
+    return callback
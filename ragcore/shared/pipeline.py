@@ -0,0 +1,95 @@
+from itertools import islice
+import queue
+import threading
+from typing import Generator, Iterable, Iterator, TypeVar
+
+from ragcore.shared.constants import PipelineConstants
+
+T = TypeVar("T")
+
+# Marks the end of the items in a queue.
+_END = object()
+
+
+class _Error:
+    """Wraps an error of a worker, so that it can be told apart from the items in a queue."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def batched(items: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+    """Yields lists of up to ``batch_size`` consecutive items, without reading all items first.
+
+    Args:
+        items: An iterable of items.
+
+        batch_size: The maximum number of items in a batch.
+
+    Returns:
+        An iterator over the batches.
+
+    """
+    iterator = iter(items)
+    batch_size = max(batch_size, 1)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def prefetch(items: Iterable[T], max_items: int) -> Generator[T, None, None]:
+    """Produces the items of an iterable in a worker thread, ahead of the consumer.
+
+    The worker puts the items into a queue with at most ``max_items`` entries and waits while it is
+    full, so a slow consumer limits how much is held in memory. Chained calls form a pipeline of stages
+    which run at the same time, for example loading, embedding and writing. An error in the worker is
+    raised to the consumer. If the consumer stops early, the worker stops and closes the iterable.
+
+    Args:
+        items: An iterable of items, which is only consumed in the worker thread.
+
+        max_items: The maximum number of items which are produced but not consumed yet.
+
+    Returns:
+        A generator over the items, in the order of the iterable. Closing it stops the worker.
+
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(max_items, 1))
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        """Waits for space in the queue, and returns False if the consumer has stopped."""
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=PipelineConstants.POLL_INTERVAL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            put(_Error(error))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Error):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        worker.join()
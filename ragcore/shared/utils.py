@@ -1,10 +1,23 @@
+from dataclasses import replace
+import hashlib
 import re
 from typing import Any, Optional, Generator
+import tiktoken
 
 from ragcore.models.document_model import Document
+from ragcore.shared.constants import DataConstants
 
 
 FILE_EXTENSION_PATTERN = re.compile(r"\.pdf$")
+DEFAULT_TOKEN_ENCODING = "cl100k_base"
+CHARACTERS_PER_TOKEN_ESTIMATE = 4
+# Name of the token counts which are estimated from the number of characters.
+TOKEN_ESTIMATE_NAME = "estimate"
+# Minimum length of a common suffix and prefix for chunks without start index to be merged.
+MIN_OVERLAP_CHARACTERS = 16
+
+# Loaded encodings by model name. An entry is None if no encoding could be loaded.
+_token_encodings: dict[Optional[str], Optional[tiktoken.Encoding]] = {}
 
 
 def slice_list(input_list: list[Any], slice_size: int) -> list[list[Any]]:
@@ -24,6 +37,216 @@ def slice_list(input_list: list[Any], slice_size: int) -> list[list[Any]]:
     ]
 
 
+def get_token_encoding(model: Optional[str] = None) -> Optional[tiktoken.Encoding]:
+    """Returns the tiktoken encoding for a model.
+
+    If the model is not known to tiktoken, the ``cl100k_base`` encoding is used. Encodings are loaded only
+    once. If no encoding can be loaded, for example because the encoding files cannot be downloaded in an
+    offline environment, None is returned.
+
+    Args:
+        model: An optional model name, as specified by the provider.
+
+    Returns:
+        The encoding, or None if it could not be loaded.
+
+    """
+    if model in _token_encodings:
+        return _token_encodings[model]
+
+    encoding: Optional[tiktoken.Encoding]
+    try:
+        encoding = _load_token_encoding(model)
+    except Exception:  # pylint: disable=broad-exception-caught
+        encoding = None
+
+    _token_encodings[model] = encoding
+    return encoding
+
+
+def _load_token_encoding(model: Optional[str]) -> tiktoken.Encoding:
+    """Loads the encoding for the model, or the default encoding for unknown models."""
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(DEFAULT_TOKEN_ENCODING)
+
+
+def get_token_encoding_name(encoding: Optional[tiktoken.Encoding]) -> str:
+    """Returns the name of an encoding, or ``estimate`` if tokens are estimated from the number of characters."""
+    return encoding.name if encoding is not None else TOKEN_ESTIMATE_NAME
+
+
+def count_tokens(texts: list[str], encoding: Optional[tiktoken.Encoding]) -> list[int]:
+    """Counts the tokens of each text.
+
+    Without an encoding, the number of tokens is estimated from the number of characters.
+
+    Args:
+        texts: A list of strings.
+
+        encoding: The tiktoken encoding, or None.
+
+    Returns:
+        A list with the number of tokens of each text.
+
+    """
+    if encoding is None:
+        return [-(-len(text) // CHARACTERS_PER_TOKEN_ESTIMATE) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, encoding: Optional[tiktoken.Encoding]
+) -> str:
+    """Truncates a text to at most ``max_tokens`` tokens.
+
+    The text is cut at the last whitespace within the limit, so that no word is split.
+
+    Args:
+        text: A string.
+
+        max_tokens: The maximum number of tokens.
+
+        encoding: The tiktoken encoding, or None to estimate tokens from characters.
+
+    Returns:
+        The truncated text, or the text if it is within the limit.
+
+    """
+    if max_tokens <= 0:
+        return ""
+    if encoding is None:
+        truncated = text[: max_tokens * CHARACTERS_PER_TOKEN_ESTIMATE]
+    else:
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        truncated = encoding.decode(tokens[:max_tokens])
+    if len(truncated) >= len(text):
+        return text
+
+    boundary = max(truncated.rfind(" "), truncated.rfind("\n"))
+    if boundary > 0:
+        truncated = truncated[:boundary]
+    return truncated.rstrip()
+
+
+def fit_documents_to_token_budget(
+    docs: list[Document], max_tokens: int, encoding: Optional[tiktoken.Encoding]
+) -> list[Document]:
+    """Selects documents in their order until their total number of tokens reaches ``max_tokens``.
+
+    The number of tokens of a document is taken from its ``token_count`` metadata, which is set when
+    documents are added, so that they are not tokenized again. The count is only used if the
+    ``token_encoding`` metadata names the same encoding, otherwise the document is counted again, because
+    models with different encodings split the same text into different numbers of tokens.
+
+    The last document which does not fit completely is truncated, and all following documents are
+    dropped. Each line break between two documents is counted as one token.
+
+    Args:
+        docs: A list of documents, ordered by relevance.
+
+        max_tokens: The maximum total number of tokens.
+
+        encoding: The tiktoken encoding, or None to estimate tokens from characters.
+
+    Returns:
+        A list with the selected documents.
+
+    """
+    selected: list[Document] = []
+    num_tokens_used = 0
+    encoding_name = get_token_encoding_name(encoding)
+
+    for doc in docs:
+        metadata = doc.metadata or {}
+        num_tokens = metadata.get(DataConstants.KEY_TOKEN_COUNT)
+        if (
+            not isinstance(num_tokens, int)
+            or metadata.get(DataConstants.KEY_TOKEN_ENCODING) != encoding_name
+        ):
+            num_tokens = count_tokens([doc.content], encoding)[0]
+
+        separator = 1 if selected else 0
+        if num_tokens_used + separator + num_tokens <= max_tokens:
+            selected.append(doc)
+            num_tokens_used += separator + num_tokens
+            continue
+
+        content = truncate_to_tokens(
+            doc.content, max_tokens - num_tokens_used - separator, encoding
+        )
+        if content:
+            selected.append(replace(doc, content=content))
+        break
+
+    return selected
+
+
+def batch_by_tokens(
+    token_counts: list[int], max_tokens: int, max_items: int
+) -> list[tuple[int, int]]:
+    """Packs consecutive items into batches limited by their total number of tokens.
+
+    Items stay in their order. An item with more tokens than ``max_tokens`` gets a batch of its own.
+
+    Args:
+        token_counts: The number of tokens of each item.
+
+        max_tokens: The maximum total number of tokens in a batch.
+
+        max_items: The maximum number of items in a batch.
+
+    Returns:
+        A list of ``(start, end)`` index pairs, one for each batch.
+
+    """
+    batches = []
+    start = 0
+    batch_tokens = 0
+
+    for i, num_tokens in enumerate(token_counts):
+        if i > start and (
+            batch_tokens + num_tokens > max_tokens or i - start >= max_items
+        ):
+            batches.append((start, i))
+            start = i
+            batch_tokens = 0
+        batch_tokens += num_tokens
+
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+
+    return batches
+
+
+def get_content_hash(content: str) -> str:
+    """Returns the SHA-256 hash of the content of a chunk as a hexadecimal string.
+
+    The hash depends only on the content, so that a chunk which moves to another page keeps its hash.
+
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def add_content_hashes(documents: list[Document]) -> list[Document]:
+    """Returns copies of the documents with the hash of their content in the metadata as ``content_hash``."""
+    return [
+        replace(
+            document,
+            metadata={
+                **document.metadata,
+                DataConstants.KEY_CONTENT_HASH: get_content_hash(document.content),
+            },
+        )
+        for document in documents
+    ]
+
+
 def chunk_list(nums: list, chunk_size: int) -> Generator:
     """Returns a chunked list."""
     for i in range(0, len(nums), chunk_size):
@@ -46,6 +269,148 @@ def document_to_str(docs: list[Document]) -> str:
     return "\n".join(docs_text)
 
 
+def sort_documents_by_position(docs: list[Document]) -> list[Document]:
+    """Sorts documents by their title, page and ``start_index``, independent of their relevance.
+
+    Documents without a position are sorted by their content, so that the order of the same documents is
+    always the same.
+
+    Args:
+        docs: A list of documents.
+
+    Returns:
+        A new list with the documents in the order of their position.
+
+    """
+    return sorted(docs, key=_get_position_key)
+
+
+def _get_position_key(doc: Document) -> tuple:
+    """Returns a key by which documents can be compared, even if metadata values have different types."""
+    metadata = doc.metadata or {}
+    return (
+        _get_sortable(doc.title),
+        _get_sortable(metadata.get(DataConstants.KEY_PAGE)),
+        _get_sortable(metadata.get(DataConstants.KEY_START_INDEX)),
+        doc.content,
+    )
+
+
+def _get_sortable(value: Any) -> tuple:
+    """Returns a key for a value, so that numbers come before other values and None comes last."""
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    if value is None:
+        return (2, 0, "")
+    return (1, 0, str(value))
+
+
+def merge_adjacent_documents(docs: list[Document]) -> list[Document]:
+    """Merges documents which overlap or touch in the same title and page, without repeating the overlap.
+
+    Chunks are split with an overlap, so two neighbouring chunks which are both retrieved share some text.
+    Their positions are taken from the ``start_index`` metadata. For documents without it, a common
+    suffix and prefix of at least ``MIN_OVERLAP_CHARACTERS`` characters is searched instead.
+
+    A merged document takes the place of the highest ranked of its parts. Its ``token_count`` and
+    ``token_encoding`` metadata are removed, because the count no longer matches the content.
+
+    Args:
+        docs: A list of documents, ordered by relevance.
+
+    Returns:
+        A list of documents in which overlapping documents are merged.
+
+    """
+    merged_docs: list[Document] = []
+    for doc in docs:
+        index = len(merged_docs)
+        merged_docs.append(doc)
+        # A merged document can overlap with further documents, so merge until nothing changes.
+        changed = True
+        while changed:
+            changed = False
+            for i, other in enumerate(merged_docs):
+                if i == index:
+                    continue
+                merged = _merge_documents(other, merged_docs[index])
+                if merged is None:
+                    continue
+                keep, drop = min(i, index), max(i, index)
+                merged_docs[keep] = merged
+                del merged_docs[drop]
+                index = keep
+                changed = True
+                break
+    return merged_docs
+
+
+def _merge_documents(first: Document, second: Document) -> Optional[Document]:
+    """Returns the merge of two documents, or None if they are not from the same page or do not overlap.
+
+    If both documents have a start index, they are merged only if the positions and the texts agree.
+
+    """
+    first_metadata = first.metadata or {}
+    second_metadata = second.metadata or {}
+    if first.title != second.title or first_metadata.get(
+        DataConstants.KEY_PAGE
+    ) != second_metadata.get(DataConstants.KEY_PAGE):
+        return None
+
+    first_start = first_metadata.get(DataConstants.KEY_START_INDEX)
+    second_start = second_metadata.get(DataConstants.KEY_START_INDEX)
+    if isinstance(first_start, int) and isinstance(second_start, int):
+        if second_start < first_start:
+            first, second = second, first
+            first_start, second_start = second_start, first_start
+        first_end = first_start + len(first.content)
+        if second_start > first_end:
+            return None
+        if second_start + len(second.content) <= first_end:
+            return _with_content(first, first.content)
+        overlap = first_end - second_start
+        if overlap == 0:
+            # Adjacent chunks lost the whitespace between them when the text was split.
+            separator = _get_separator(first.content, second.content)
+            return _with_content(first, first.content + separator + second.content)
+        if first.content[len(first.content) - overlap :] == second.content[:overlap]:
+            return _with_content(first, first.content + second.content[overlap:])
+        return None
+
+    # Without positions, look for text at the end of one document which starts the other.
+    for head, tail in ((first, second), (second, first)):
+        overlap = _get_overlap_length(head.content, tail.content)
+        if overlap:
+            return _with_content(head, head.content + tail.content[overlap:])
+    return None
+
+
+def _get_overlap_length(head: str, tail: str) -> int:
+    """Returns the length of the longest suffix of ``head`` which is a prefix of ``tail``, or 0 if it is too short."""
+    for length in range(min(len(head), len(tail)), MIN_OVERLAP_CHARACTERS - 1, -1):
+        if head.endswith(tail[:length]):
+            return length
+    return 0
+
+
+def _get_separator(head: str, tail: str) -> str:
+    """Returns a space to put between two adjacent texts, or an empty string if one of them already has
+    whitespace at the boundary."""
+    if not head or not tail or head[-1].isspace() or tail[0].isspace():
+        return ""
+    return " "
+
+
+def _with_content(doc: Document, content: str) -> Document:
+    metadata = {
+        key: value
+        for key, value in (doc.metadata or {}).items()
+        if key not in (DataConstants.KEY_TOKEN_COUNT, DataConstants.KEY_TOKEN_ENCODING)
+    }
+    return replace(doc, content=content, metadata=metadata)
+
+
 def remove_file_extension(string: str) -> str:
     """Removes ``.pdf`` file extensions from a string.
 
@@ -1,6 +1,11 @@
+import asyncio
+import numpy as np
 import pytest
 
 from ragcore.app import RAGCore
+from ragcore.models.config_model import LLMConfiguration
+from ragcore.models.document_model import Document
+from ragcore.services.llm_service import LLMService
 from tests import BaseTest
 
 
@@ -53,3 +58,147 @@ class TestRAGCore(BaseTest):
         assert app.configuration.llm_config.model == "gpt-azure"
         assert app.configuration.llm_config.endpoint == "https://endpoint.com"
         assert app.configuration.llm_config.api_version == "some-version"
+
+    def test_query_stream(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        documents = [mocker.Mock()]
+        app.database_service = mocker.Mock()
+        app.database_service.query_by_embedding.return_value = documents
+        app.llm_service = mocker.Mock()
+        app.llm_service.get_cached_response.return_value = None
+        app.llm_service.make_llm_request_stream.return_value = iter(["Hello", " world"])
+
+        chunks = list(app.query_stream("A question", user="user1"))
+
+        assert chunks[0].content is None
+        assert chunks[0].documents == documents
+        assert [chunk.content for chunk in chunks[1:]] == ["Hello", " world"]
+        assert all(chunk.user == "user1" for chunk in chunks)
+
+    def test_query_stream_no_documents(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        app.database_service = mocker.Mock()
+        app.database_service.query_by_embedding.return_value = []
+        app.llm_service = mocker.Mock()
+
+        assert list(app.query_stream("A question")) == []
+        app.llm_service.make_llm_request_stream.assert_not_called()
+
+    def test_aquery(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        documents = [mocker.Mock()]
+        app.database_service = mocker.Mock()
+        app.database_service.aembed_query = mocker.AsyncMock()
+        app.database_service.aquery_by_embedding = mocker.AsyncMock(
+            return_value=documents
+        )
+        app.llm_service = mocker.Mock()
+        app.llm_service.get_cached_response.return_value = None
+        app.llm_service.amake_llm_request = mocker.AsyncMock(return_value="Answer")
+
+        response = asyncio.run(app.aquery("A question", user="user1"))
+
+        assert response.content == "Answer"
+        assert response.documents == documents
+        assert response.user == "user1"
+
+    def test_aget_titles(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        app.database_service = mocker.Mock()
+        app.database_service.aget_titles = mocker.AsyncMock(return_value=["A", "B"])
+
+        response = asyncio.run(app.aget_titles())
+
+        assert response.contents == ["A", "B"]
+
+    def test_query_semantic_cache(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        app.database_service = mocker.Mock()
+        app.database_service.embed_query.side_effect = [
+            np.array([1.0, 0.0]),
+            np.array([0.99, 0.05]),
+            np.array([0.99, 0.05]),
+        ]
+        app.database_service.query_by_embedding.return_value = [
+            Document(content="Chunk", title="Book", metadata={}, id="1")
+        ]
+        app.llm_service = LLMService(
+            app.logger,
+            LLMConfiguration(
+                provider="openai",
+                model="model",
+                endpoint=None,
+                api_version=None,
+                semantic_cache_threshold=0.95,
+            ),
+        )
+        mock_request = mocker.patch.object(
+            app.llm_service, "make_llm_request", return_value="Answer"
+        )
+
+        first = app.query("What did the elk say?")
+        second = app.query("What was said by the elk?")
+        app.delete("Book")
+        third = app.query("What was said by the elk?")
+
+        assert first.content == second.content == third.content == "Answer"
+        assert mock_request.call_count == 2
+        stats = app.llm_service.get_semantic_cache_stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+
+    def test_query_batch(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        documents = [Document(content="Chunk", title="Book", metadata={})]
+        app.database_service = mocker.Mock()
+        app.database_service.embed_queries.return_value = np.eye(2)
+        app.database_service.query_by_embeddings.return_value = [documents, []]
+        app.llm_service = mocker.Mock()
+        app.llm_service.get_cached_response.return_value = None
+        app.llm_service.create_prompt.side_effect = lambda query, _: f"Prompt {query}"
+        app.llm_service.make_llm_requests.return_value = ["Answer"]
+
+        responses = app.query_batch(["First", "", "Second"], user="user1")
+
+        assert [response.content for response in responses] == ["Answer", None, None]
+        assert responses[0].documents == documents
+        app.database_service.embed_queries.assert_called_once_with(["First", "Second"])
+        app.llm_service.make_llm_requests.assert_called_once_with(["Prompt First"])
+
+    def test_add_many(self, mocker, mock_method_inits):
+        app = RAGCore(config="./tests/unit/mock/mock_config_openai.yaml")
+        app.database_service = mocker.Mock()
+        app.database_service.get_titles.return_value = ["Existing"]
+        app.database_service.add_documents_stream.side_effect = (
+            lambda documents, user, **kwargs: len(list(documents))
+        )
+        app.llm_service = mocker.Mock()
+
+        class MockDocumentService:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def iter_documents(self, path, **kwargs):
+                if path == "Broken.pdf":
+                    raise ValueError("Broken file")
+                yield from [mocker.Mock(), mocker.Mock()]
+
+        mocker.patch("ragcore.app.DocumentService", MockDocumentService)
+
+        result = app.add_many(
+            ["New.pdf", "Existing.pdf", "Notes.txt", "Broken.pdf", "dir/New.pdf"],
+            user="user1",
+            workers=1,
+        )
+
+        assert [file.status for file in result.files] == [
+            "added",
+            "skipped",
+            "skipped",
+            "failed",
+            "skipped",
+        ]
+        assert result.files[0].num_documents == 2
+        assert result.files[3].message == "Broken file"
+        assert result.user == "user1"
+        assert app.database_service.add_documents_stream.call_count == 2
+        app.llm_service.invalidate_cached_responses.assert_called_once_with("user1")
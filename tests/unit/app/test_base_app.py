@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+
+from ragcore.app.base_app import AbstractApp
+from ragcore.models.app_model import QueryResponse, TitlesResponse
+from tests import BaseTest
+
+
+class MinimalApp(AbstractApp):
+    """An app which only implements the required methods."""
+
+    def query(self, query, user=None):
+        return QueryResponse(content=query, documents=[], user=user)
+
+    def add(self, path, user=None):
+        pass
+
+    def delete(self, title, user=None):
+        pass
+
+    def get_titles(self, user=None):
+        return TitlesResponse(user=user, contents=["A"])
+
+
+class TestAbstractApp(BaseTest):
+    def test_app_with_required_methods(self):
+        app = MinimalApp(log_level="INFO")
+
+        async def run():
+            return await app.aquery("A query"), await app.aget_titles("user")
+
+        response, titles = asyncio.run(run())
+
+        assert response.content == "A query"
+        assert titles.contents == ["A"]
+        with pytest.raises(NotImplementedError):
+            app.update("file.pdf")
+        with pytest.raises(NotImplementedError):
+            app.add_many(["file.pdf"])
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from requests.exceptions import HTTPError
 from ragcore.models.database_model import ChromaDatabase, PineconeDatabase
@@ -22,8 +23,12 @@ class TestChromaDatabaseModel(BaseTest, RAGCoreTestSetup):
             "ragcore.models.database_model.ChromaDatabase._get_number_of_documents_by_title",
             return_value=0,
         )
+        mock_add = mocker.patch.object(chromadb_client.collection, "add")
         res = chromadb_client.add_documents(mock_documents)
         assert res == True
+        embeddings = mock_add.call_args.kwargs["embeddings"]
+        assert isinstance(embeddings, list)
+        assert len(embeddings) == 2
 
     def test_add_documents_already_in_database(
         self, mocker, chromadb_client, mock_documents
@@ -63,6 +68,25 @@ class TestChromaDatabaseModel(BaseTest, RAGCoreTestSetup):
 
         assert len(res) == 2
 
+    def test_query_by_embeddings_single_request(self, mocker, chromadb_client):
+        query_response = {
+            "ids": [["1"], ["2"]],
+            "documents": [["Document 1"], ["Document 2"]],
+            "metadatas": [[{"title": "A"}], [{"title": "B"}]],
+        }
+        mock_query = mocker.patch.object(
+            chromadb_client.collection, "query", return_value=query_response
+        )
+
+        res = chromadb_client.query_by_embeddings(np.eye(2, dtype=np.float32))
+
+        assert [[doc.content for doc in docs] for docs in res] == [
+            ["Document 1"],
+            ["Document 2"],
+        ]
+        assert res[1][0].id == "2"
+        assert mock_query.call_count == 1
+
     def test_get_number_of_documents(self, mocker, chromadb_client):
         mocker.patch.object(chromadb_client.collection, "count", return_value=42)
         res = chromadb_client.get_number_of_documents()
@@ -0,0 +1,121 @@
+from pypdf import PageObject
+import pytest
+
+from ragcore.models import document_loader_model
+from ragcore.models.document_loader_model import PDFLoader, get_page_ranges
+
+
+def write_pdf(path, texts):
+    """Writes a minimal PDF file with one line of text on each page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for text in texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (len(objects))
+        )
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(texts))
+
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(content)
+
+
+class TestPDFLoader:
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        path = tmp_path / "manual.pdf"
+        write_pdf(path, [f"Text of page {page}" for page in range(12)])
+        return str(path)
+
+    def test_load_and_split_parallel_equals_sequential(self, pdf_path):
+        sequential = PDFLoader(pdf_path).load_and_split("manual")
+        parallel = PDFLoader(
+            pdf_path, workers=2, min_pages_per_worker=2
+        ).load_and_split("manual")
+
+        assert len(sequential) == 12
+        assert parallel == sequential
+        assert [doc.metadata["page"] for doc in parallel] == list(range(12))
+        assert parallel[3].content == "Text of page 3"
+        assert parallel[3].metadata["title"] == "manual"
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_lazy_load_and_split_equals_load_and_split(self, pdf_path, workers):
+        loader = PDFLoader(pdf_path, workers=workers, min_pages_per_worker=2)
+
+        documents = loader.lazy_load_and_split("manual")
+
+        assert not isinstance(documents, list)
+        assert list(documents) == PDFLoader(pdf_path).load_and_split("manual")
+
+    def test_lazy_load_and_split_extracts_pages_on_demand(self, pdf_path, mocker):
+        extract_text = mocker.spy(PageObject, "extract_text")
+
+        documents = PDFLoader(pdf_path).lazy_load_and_split("manual")
+
+        assert next(documents).content == "Text of page 0"
+        assert extract_text.call_count == 1
+        assert len(list(documents)) == 11
+        assert extract_text.call_count == 12
+
+    def test_load_and_split_uses_shared_extraction(self, pdf_path, mocker):
+        iter_page_range = mocker.patch(
+            "ragcore.models.document_loader_model._iter_page_range",
+            wraps=document_loader_model._iter_page_range,
+        )
+
+        docs = PDFLoader(pdf_path).load_and_split("manual")
+
+        iter_page_range.assert_called_once_with(pdf_path)
+        assert docs == list(PDFLoader(pdf_path).lazy_load_and_split("manual"))
+        assert docs[0].metadata == {
+            "source": pdf_path,
+            "page": 0,
+            "title": "manual",
+        }
+
+    def test_load_and_split_small_file_is_sequential(self, pdf_path, mocker):
+        mock_executor = mocker.patch(
+            "ragcore.models.document_loader_model.ProcessPoolExecutor"
+        )
+
+        docs = PDFLoader(pdf_path, workers=4, min_pages_per_worker=10).load_and_split(
+            "manual"
+        )
+
+        assert len(docs) == 12
+        mock_executor.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "num_pages, num_ranges, expected",
+        [
+            (10, 3, [(0, 4), (4, 8), (8, 10)]),
+            (4, 8, [(0, 1), (1, 2), (2, 3), (3, 4)]),
+            (5, 1, [(0, 5)]),
+            (0, 2, []),
+        ],
+    )
+    def test_get_page_ranges(self, num_pages, num_ranges, expected):
+        assert get_page_ranges(num_pages, num_ranges) == expected
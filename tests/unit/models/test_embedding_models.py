@@ -1,4 +1,20 @@
-from ragcore.models.embedding_model import OpenAIEmbedding, AzureOpenAIEmbedding
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+
+from ragcore.models.embedding_model import (
+    OpenAIEmbedding,
+    AzureOpenAIEmbedding,
+    BatchingEmbedding,
+    CachedEmbedding,
+    LocalEmbedding,
+)
+from ragcore.shared.cache import DiskCache
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+from ragcore.shared.endpoint_pool import EndpointPool
+from ragcore.shared.errors import EmbeddingError
 from tests import BaseTest
 
 from tests.unit.services import RAGCoreTestSetup
@@ -52,3 +68,336 @@ class TestAzureOpenAIEmbeddingModels(BaseTest, RAGCoreTestSetup):
         # Assert
         expected_result = [[0.1, 0.2, 0.3], [0.6, 0.5, 0.4]]
         assert result == expected_result
+
+    def test_embed_queries_endpoint_pool(self, mocker):
+        def create_client(**kwargs):
+            client = mocker.Mock()
+            client.embeddings.create.return_value = mocker.Mock(
+                data=[mocker.Mock(embedding=[0.1, 0.2])]
+            )
+            return client
+
+        mock_azure = mocker.patch(
+            "ragcore.models.embedding_model.AzureOpenAI", side_effect=create_client
+        )
+        endpoint_pool = EndpointPool(["https://a.com", "https://b.com"])
+        embedding = AzureOpenAIEmbedding(
+            model="some-model",
+            endpoint=None,
+            api_version="azure-1",
+            endpoint_pool=endpoint_pool,
+        )
+
+        for _ in range(2):
+            assert embedding.embed_texts(texts=["First query"]) == [[0.1, 0.2]]
+
+        assert embedding.endpoint == "https://a.com"
+        endpoints = [
+            call.kwargs["azure_endpoint"] for call in mock_azure.call_args_list
+        ]
+        assert endpoints == ["https://a.com", "https://a.com", "https://b.com"]
+        assert [stat.request_count for stat in endpoint_pool.stats()] == [1, 1]
+
+
+class TestCachedEmbedding(BaseTest, RAGCoreTestSetup):
+    def test_embed_texts_only_missing_texts(self, mocker, tmp_path):
+        embedding = mocker.Mock()
+        embedding.embed_texts.side_effect = lambda texts: [
+            [float(len(text)), 0.5] for text in texts
+        ]
+        cached_embedding = CachedEmbedding(
+            embedding=embedding,
+            provider="openai",
+            model="some-model",
+            cache=DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10),
+        )
+
+        first = cached_embedding.embed_texts(["a", "bb", "a"])
+        second = cached_embedding.embed_texts(["bb", "ccc"])
+
+        assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+        assert second == [[2.0, 0.5], [3.0, 0.5]]
+        assert embedding.embed_texts.call_args_list == [
+            mocker.call(["a", "bb"]),
+            mocker.call(["ccc"]),
+        ]
+
+    def test_embed_texts_array(self, mocker, tmp_path):
+        embedding = mocker.Mock()
+        embedding.embed_texts_array.side_effect = lambda texts: np.array(
+            [[float(len(text)), 0.5] for text in texts], dtype=np.float32
+        )
+        cached_embedding = CachedEmbedding(
+            embedding=embedding,
+            provider="openai",
+            model="some-model",
+            cache=DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10),
+        )
+
+        cached_embedding.embed_texts_array(["a"])
+        result = cached_embedding.embed_texts_array(["a", "bb"])
+
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, [[1.0, 0.5], [2.0, 0.5]])
+        assert cached_embedding.embed_texts(["bb"]) == [[2.0, 0.5]]
+        assert embedding.embed_texts_array.call_args_list == [
+            mocker.call(["a"]),
+            mocker.call(["bb"]),
+        ]
+        # Vectors are stored as float32, with four bytes per dimension.
+        entry = cached_embedding.cache.get(cached_embedding._get_key("a"))
+        assert len(entry) == 2 * 4
+
+    def test_aembed_texts(self, mocker, tmp_path):
+        embedding = mocker.Mock()
+        embedding.aembed_texts = mocker.AsyncMock(
+            side_effect=lambda texts: [[float(len(text))] for text in texts]
+        )
+        cached_embedding = CachedEmbedding(
+            embedding=embedding,
+            provider="openai",
+            model="some-model",
+            cache=DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10),
+        )
+
+        asyncio.run(cached_embedding.aembed_texts(["a"]))
+        result = asyncio.run(cached_embedding.aembed_texts(["a", "bb"]))
+
+        assert result == [[1.0], [2.0]]
+        assert embedding.aembed_texts.call_args_list == [
+            mocker.call(["a"]),
+            mocker.call(["bb"]),
+        ]
+
+    def test_key_depends_on_model(self, mocker, tmp_path):
+        cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10)
+        embedding_a = CachedEmbedding(mocker.Mock(), "openai", "model-a", cache)
+        embedding_b = CachedEmbedding(mocker.Mock(), "openai", "model-b", cache)
+
+        assert embedding_a._get_key("text") != embedding_b._get_key("text")
+
+    def test_key_depends_on_dimensions(self, mocker, tmp_path):
+        cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10)
+        embedding_a = CachedEmbedding(mocker.Mock(), "openai", "model", cache)
+        embedding_b = CachedEmbedding(
+            mocker.Mock(), "openai", "model", cache, dimensions=256
+        )
+
+        assert embedding_a._get_key("text") != embedding_b._get_key("text")
+
+
+class TestBaseOpenAIEmbeddings(BaseTest, RAGCoreTestSetup):
+    @pytest.mark.parametrize("max_concurrency", [1, 4])
+    def test_embed_texts_batches_in_order(self, mocker, max_concurrency):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mocker.Mock())
+        mocker.patch(
+            "ragcore.models.embedding_model.get_token_encoding", return_value=None
+        )
+        embedding = OpenAIEmbedding(
+            model="some-model",
+            max_concurrency=max_concurrency,
+            max_tokens_per_batch=2,
+        )
+
+        def mock_create(input, model):
+            return mocker.Mock(
+                data=[mocker.Mock(embedding=[float(text)]) for text in input]
+            )
+
+        mock_create = mocker.patch.object(
+            embedding.client.embeddings, "create", side_effect=mock_create
+        )
+
+        # Four characters per token estimate, so every text has one token.
+        texts = [str(i) for i in range(7)]
+        result = embedding.embed_texts(texts=texts)
+
+        assert result == [[float(i)] for i in range(7)]
+        assert mock_create.call_count == 4
+
+    def test_embed_texts_with_controller(self, mocker):
+        mock_openai = mocker.patch(
+            "ragcore.models.embedding_model.OpenAI", mocker.Mock()
+        )
+        controller = AdaptiveConcurrencyController(max_limit=2)
+        embedding = OpenAIEmbedding(model="some-model", controller=controller)
+        client = mock_openai.return_value.with_options.return_value
+        raw_response = client.embeddings.with_raw_response.create.return_value
+        raw_response.headers = {"x-ratelimit-remaining-requests": "10"}
+        raw_response.parse.return_value = mocker.Mock(
+            data=[mocker.Mock(embedding=[0.1, 0.2])]
+        )
+
+        result = embedding.embed_texts(texts=["First query"])
+
+        assert result == [[0.1, 0.2]]
+        mock_openai.return_value.with_options.assert_called_once_with(max_retries=0)
+        assert controller.stats().request_count == 1
+
+    def test_embed_texts_array_base64(self, mocker):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mocker.Mock())
+        embedding = OpenAIEmbedding(model="some-model")
+        vectors = np.array([[0.1, 0.2, 0.3], [0.6, 0.5, 0.4]], dtype="<f4")
+        mock_create = mocker.patch.object(
+            embedding.client.embeddings,
+            "create",
+            return_value=mocker.Mock(
+                data=[
+                    mocker.Mock(embedding=base64.b64encode(vector.tobytes()).decode())
+                    for vector in vectors
+                ]
+            ),
+        )
+
+        result = embedding.embed_texts_array(texts=["First query", "second query"])
+
+        assert result.dtype == np.float32
+        assert result.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(result, vectors)
+        assert mock_create.call_args.kwargs["encoding_format"] == "base64"
+
+    def test_embed_texts_passes_dimensions(self, mocker):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mocker.Mock())
+        embedding = OpenAIEmbedding(model="text-embedding-3-small", dimensions=256)
+        mock_create = mocker.patch.object(
+            embedding.client.embeddings,
+            "create",
+            return_value=mocker.Mock(data=[mocker.Mock(embedding=[0.1, 0.2])]),
+        )
+
+        embedding.embed_texts(texts=["First query"])
+        embedding.embed_texts_array(texts=["First query"])
+
+        for call in mock_create.call_args_list:
+            assert call.kwargs["dimensions"] == 256
+
+    def test_embed_texts_array_float_response(self, mock_openai_embedding_values):
+        result = mock_openai_embedding_values.embed_texts_array(
+            texts=["First query", "second query"]
+        )
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [[0.1, 0.2, 0.3], [0.6, 0.5, 0.4]])
+
+    def test_aembed_texts(self, mocker):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mocker.Mock())
+        mock_async_openai = mocker.patch(
+            "ragcore.models.embedding_model.AsyncOpenAI", mocker.Mock()
+        )
+        mocker.patch(
+            "ragcore.models.embedding_model.get_token_encoding", return_value=None
+        )
+        embedding = OpenAIEmbedding(model="some-model", max_tokens_per_batch=2)
+
+        async def mock_create(input, model):
+            return mocker.Mock(
+                data=[mocker.Mock(embedding=[float(text)]) for text in input]
+            )
+
+        mock_create = mocker.AsyncMock(side_effect=mock_create)
+        mock_async_openai.return_value.embeddings.create = mock_create
+
+        texts = [str(i) for i in range(5)]
+        result = asyncio.run(embedding.aembed_texts(texts))
+
+        assert result == [[float(i)] for i in range(5)]
+        assert mock_create.await_count == 3
+        assert mock_async_openai.call_count == 1
+
+
+class TestLocalEmbedding(BaseTest, RAGCoreTestSetup):
+    def test_embed_texts_array(self):
+        embedding = LocalEmbedding(model="hashing", dimensions=64)
+        result = embedding.embed_texts_array(
+            ["The first query.", "the FIRST query", "Something else entirely", ""]
+        )
+
+        assert result.shape == (4, 64)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(result[:3], axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_allclose(result[0], result[1])
+        assert result[0] @ result[2] < 0.5
+        assert not result[3].any()
+
+    def test_aembed_texts(self):
+        embedding = LocalEmbedding(model="hashing")
+        texts = ["Very useful text.", "Another day, another sentence."]
+        assert asyncio.run(embedding.aembed_texts(texts)) == embedding.embed_texts(
+            texts
+        )
+
+    def test_embed_texts_deterministic(self):
+        texts = ["Very useful text.", "Another day, another sentence."]
+        first = LocalEmbedding(model="hashing").embed_texts(texts)
+        second = LocalEmbedding(model="hashing").embed_texts(texts)
+
+        assert first == second
+        assert len(first) == 2
+        assert len(first[0]) == 384
+
+
+class TestBatchingEmbedding(BaseTest, RAGCoreTestSetup):
+    @pytest.fixture
+    def mock_embedding(self, mocker):
+        embedding = mocker.Mock()
+        embedding.embed_texts_array.side_effect = lambda texts: np.array(
+            [[float(text)] for text in texts], dtype=np.float32
+        )
+        return embedding
+
+    def test_embed_texts_coalesces_concurrent_texts(self, mock_embedding):
+        embedding = BatchingEmbedding(
+            embedding=mock_embedding, window_ms=200, max_batch_size=8
+        )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(lambda i: embedding.embed_texts([str(i)]), range(8))
+            )
+
+        assert results == [[[float(i)]] for i in range(8)]
+        assert mock_embedding.embed_texts_array.call_count < 8
+
+    def test_embed_texts_array_single_text(self, mock_embedding):
+        embedding = BatchingEmbedding(embedding=mock_embedding, window_ms=1)
+        result = embedding.embed_texts_array(["3"])
+
+        assert result.shape == (1, 1)
+        assert result[0, 0] == 3.0
+
+    def test_embed_texts_passes_through_multiple_texts(self, mock_embedding):
+        embedding = BatchingEmbedding(embedding=mock_embedding, window_ms=1)
+        embedding.embed_texts(["1", "2"])
+
+        mock_embedding.embed_texts.assert_called_once_with(["1", "2"])
+
+    def test_aembed_texts(self, mock_embedding):
+        embedding = BatchingEmbedding(embedding=mock_embedding, window_ms=1)
+
+        async def embed():
+            return await asyncio.gather(
+                embedding.aembed_texts(["1"]), embedding.aembed_texts(["2"])
+            )
+
+        assert asyncio.run(embed()) == [[[1.0]], [[2.0]]]
+
+    def test_embed_texts_error(self, mock_embedding):
+        mock_embedding.embed_texts_array.side_effect = ValueError("Failed")
+        embedding = BatchingEmbedding(embedding=mock_embedding, window_ms=1)
+
+        with pytest.raises(ValueError):
+            embedding.embed_texts(["1"])
+
+    def test_close_stops_dispatcher_and_executor(self, mock_embedding):
+        embedding = BatchingEmbedding(embedding=mock_embedding, window_ms=1)
+        embedding.embed_texts(["1"])
+        dispatcher = embedding._dispatcher
+
+        embedding.close()
+        embedding.close()
+
+        assert not dispatcher.is_alive()
+        assert embedding._executor._shutdown
+        mock_embedding.close.assert_called_once()
+        with pytest.raises(EmbeddingError):
+            embedding.embed_texts(["2"])
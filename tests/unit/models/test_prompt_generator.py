@@ -1,4 +1,7 @@
+import pytest
+
 from ragcore.models.prompt_model import PromptGenerator
+from ragcore.shared.errors import UserConfigurationError
 
 
 class TestPromptGenerator:
@@ -7,3 +10,25 @@ class TestPromptGenerator:
         prompt = model.get_prompt("What a question here?", "Context a, context b")
         assert isinstance(prompt, str)
         assert len(prompt) > 0
+
+    def test_get_prompt_fixed_prefix(self):
+        model = PromptGenerator()
+        prompt = model.get_prompt("What a question here?", "Context a")
+        other_prompt = model.get_prompt("Another question?", "Context b")
+        prefix = prompt[: prompt.index("Context a")]
+        assert other_prompt.startswith(prefix)
+        assert prompt.endswith("Helpful Answer:")
+        assert model.get_system_prompt()
+
+    def test_get_prompt_custom_templates(self):
+        model = PromptGenerator(
+            system_template="", prompt_template="Q: {{ question }} C: {{ context }}"
+        )
+        assert model.get_system_prompt() is None
+        assert model.get_prompt("question", "context") == "Q: question C: context"
+
+    def test_invalid_templates(self):
+        with pytest.raises(UserConfigurationError):
+            PromptGenerator(prompt_template="{{ question ")
+        with pytest.raises(UserConfigurationError):
+            PromptGenerator(system_template="{{ question }}")
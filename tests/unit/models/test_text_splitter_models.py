@@ -0,0 +1,91 @@
+import random
+import re
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from ragcore.models.document_model import Document
+from ragcore.models.text_splitter_model import RecursiveTextSplitter
+from ragcore.shared.errors import UserConfigurationError
+
+
+class WordEncoding:
+    """Counts words and punctuation as tokens, in place of a tiktoken encoding."""
+
+    def encode_ordinary(self, text):
+        return re.findall(r"\w+|[^\w\s]", text)
+
+
+def make_text(seed):
+    """Creates a text with paragraphs, lines, and some words which are longer than a chunk."""
+    rng = random.Random(seed)
+    words = ["elk", "said", "the", "forest", "river,", "quiet.", "a" * 120, "Ok!"]
+    paragraphs = []
+    for _ in range(rng.randint(1, 6)):
+        lines = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 40)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+class TestRecursiveTextSplitter:
+    @pytest.mark.parametrize("seed", range(20))
+    @pytest.mark.parametrize("chunk_size, chunk_overlap", [(100, 20), (40, 0), (7, 3)])
+    def test_split_documents_equals_langchain(self, seed, chunk_size, chunk_overlap):
+        text = make_text(seed)
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+        ).create_documents([text], [{"title": "Book", "page": 1}])
+
+        splits = RecursiveTextSplitter(chunk_size, chunk_overlap).split_documents(
+            [
+                Document(
+                    content=text, title="Book", metadata={"title": "Book", "page": 1}
+                )
+            ]
+        )
+
+        assert [split.content for split in splits] == [
+            doc.page_content for doc in expected
+        ]
+        assert [split.metadata for split in splits] == [
+            doc.metadata for doc in expected
+        ]
+        assert all(split.title == "Book" for split in splits)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_split_text_tokens_equals_langchain(self, seed):
+        encoding = WordEncoding()
+        text = make_text(seed)
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=30,
+            chunk_overlap=5,
+            length_function=lambda text: len(encoding.encode_ordinary(text)),
+        ).split_text(text)
+
+        splitter = RecursiveTextSplitter(30, 5, length_unit="tokens", encoding=encoding)
+
+        assert splitter.split_text(text) == expected
+
+    def test_split_documents_tokens_start_index(self):
+        text = "one two three. " * 20
+        splitter = RecursiveTextSplitter(
+            10, 4, length_unit="tokens", encoding=WordEncoding()
+        )
+
+        splits = splitter.split_documents(
+            [Document(content=text, title="Book", metadata={"title": "Book"})]
+        )
+
+        assert len(splits) > 1
+        assert all(
+            text[split.metadata["start_index"] :].startswith(split.content)
+            for split in splits
+        )
+
+    def test_invalid_configuration(self):
+        with pytest.raises(UserConfigurationError):
+            RecursiveTextSplitter(10, 20)
+        with pytest.raises(UserConfigurationError):
+            RecursiveTextSplitter(10, 2, length_unit="pages")
@@ -1,9 +1,19 @@
+import asyncio
+import numpy as np
 import pytest
 
 from ragcore.shared.errors import EmbeddingError, DatabaseError, MetadataError
 from ragcore.models.database_model import ChromaDatabase
-from ragcore.models.embedding_model import BaseEmbedding
+from ragcore.models.document_model import Document
+from ragcore.models.embedding_model import (
+    BaseEmbedding,
+    BatchingEmbedding,
+    CachedEmbedding,
+    LocalEmbedding,
+    OpenAIEmbedding,
+)
 from ragcore.services.database_service import DatabaseService
+from ragcore.shared.utils import get_content_hash
 
 from tests import BaseTest
 from tests.unit.services import RAGCoreTestSetup
@@ -21,6 +31,48 @@ class TestDatabaseService(BaseTest, RAGCoreTestSetup):
         )
         assert isinstance(database_service.embedding.client, mock_openai_embedding)
 
+    def test_init_embedding_local(self, mock_logger, mock_config_localdb):
+        mock_config_localdb.embedding_config.provider = "local"
+        mock_config_localdb.embedding_config.model = "hashing"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        assert isinstance(database_service.embedding, LocalEmbedding)
+
+    def test_init_embedding_cache(
+        self, mocker, mock_logger, mock_config_localdb, mock_openai_embedding, tmp_path
+    ):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mock_openai_embedding)
+        mock_config_localdb.embedding_config.cache_dir = str(tmp_path)
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        assert isinstance(database_service.embedding, CachedEmbedding)
+        assert isinstance(database_service.embedding.embedding, OpenAIEmbedding)
+
+    def test_init_embedding_batching_and_cache(
+        self, mocker, mock_logger, mock_config_localdb, mock_openai_embedding, tmp_path
+    ):
+        mocker.patch("ragcore.models.embedding_model.OpenAI", mock_openai_embedding)
+        mock_config_localdb.embedding_config.cache_dir = str(tmp_path)
+        mock_config_localdb.embedding_config.batch_window_ms = 5
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        assert isinstance(database_service.embedding, CachedEmbedding)
+        assert isinstance(database_service.embedding.embedding, BatchingEmbedding)
+        assert database_service.embedding.embedding.window_ms == 5
+
+        database_service.close()
+
+        assert database_service.embedding.embedding._closed
+
     def test_init_embedding_invalid_provider(
         self,
         mock_logger,
@@ -180,6 +232,171 @@ class TestDatabaseService(BaseTest, RAGCoreTestSetup):
         with pytest.raises(MetadataError):
             database_service.add_documents(mock_documents_missing_metadata)
 
+    def test_add_documents_stream(
+        self, mocker, mock_logger, mock_config_localdb, mock_documents
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        database_service.database.has_title.return_value = False
+
+        num_documents = database_service.add_documents_stream(
+            iter(mock_documents * 3), batch_size=4
+        )
+
+        assert num_documents == 6
+        calls = database_service.database.add_embedded_documents.call_args_list
+        assert [len(call.args[0]) for call in calls] == [4, 2]
+        assert calls[0].args[1].shape[0] == 4
+        database_service.database.delete_documents.assert_not_called()
+
+    def test_add_documents_stream_title_exists(
+        self, mocker, mock_logger, mock_config_localdb, mock_documents
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        database_service.database.has_title.return_value = True
+
+        assert database_service.add_documents_stream(mock_documents) is None
+        database_service.database.add_embedded_documents.assert_not_called()
+
+    def test_add_documents_stream_failure_deletes_added_documents(
+        self, mocker, mock_logger, mock_config_localdb, mock_documents
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        database_service.database.has_title.return_value = False
+
+        def documents():
+            yield from mock_documents
+            raise ValueError("Broken page")
+
+        with pytest.raises(ValueError):
+            database_service.add_documents_stream(documents(), batch_size=1)
+
+        database_service.database.delete_documents.assert_called_once_with(
+            "Greatest book", None
+        )
+
+    def test_add_documents_stream_other_title(
+        self, mocker, mock_logger, mock_config_localdb, mock_documents
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        database_service.database.has_title.return_value = False
+        other = Document(
+            content="Other content",
+            title="Other book",
+            metadata={"title": "Other book"},
+        )
+
+        with pytest.raises(MetadataError, match="Other book"):
+            database_service.add_documents_stream(
+                iter(mock_documents + [other]), batch_size=1
+            )
+
+        database_service.database.delete_documents.assert_called_once_with(
+            "Greatest book", None
+        )
+
+    def test_update_documents_stream(
+        self, mocker, tmp_path, mock_logger, mock_config_localdb
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = ChromaDatabase(
+            str(tmp_path), 2, database_service.embedding
+        )
+
+        def chunks(contents):
+            return [
+                Document(
+                    content=content,
+                    title="Book",
+                    metadata={"title": "Book", "page": page},
+                )
+                for page, content in enumerate(contents)
+            ]
+
+        first = database_service.update_documents_stream(
+            chunks(["A", "B", "C", "D"]), batch_size=2
+        )
+        spy = mocker.spy(database_service.embedding, "embed_texts_array")
+        second = database_service.update_documents_stream(
+            chunks(["A", "X", "B", "C"]), batch_size=2
+        )
+
+        assert (first.num_embedded, first.num_deleted) == (4, 0)
+        assert (second.num_embedded, second.num_unchanged, second.num_deleted) == (
+            1,
+            3,
+            1,
+        )
+        assert [call.args[0] for call in spy.call_args_list] == [["X"]]
+        metadatas = database_service.database.get_metadatas("Book").values()
+        assert sorted(
+            (metadata["page"], metadata["content_hash"]) for metadata in metadatas
+        ) == [
+            (page, get_content_hash(content))
+            for page, content in enumerate(["A", "X", "B", "C"])
+        ]
+
+    def test_update_documents_stream_failure_keeps_stored_documents(
+        self, tmp_path, mock_logger, mock_config_localdb
+    ):
+        mock_config_localdb.embedding_config.provider = "local"
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = ChromaDatabase(
+            str(tmp_path), 2, database_service.embedding
+        )
+        database_service.update_documents_stream(
+            [
+                Document(content=content, title="Book", metadata={"title": "Book"})
+                for content in ["A", "B"]
+            ]
+        )
+        stored = database_service.database.get_metadatas("Book")
+
+        def documents():
+            # "B" moves to another page and "X" is new, before the stream fails.
+            yield Document(
+                content="B", title="Book", metadata={"title": "Book", "page": 1}
+            )
+            yield Document(content="X", title="Book", metadata={"title": "Book"})
+            raise ValueError("Broken page")
+
+        with pytest.raises(ValueError):
+            database_service.update_documents_stream(documents(), batch_size=2)
+
+        assert database_service.database.get_metadatas("Book") == stored
+
     def test_delete_documents(self, mocker, mock_logger, mock_config_localdb):
         database_service = DatabaseService(
             logger=mock_logger,
@@ -214,6 +431,101 @@ class TestDatabaseService(BaseTest, RAGCoreTestSetup):
 
         assert response == "Hello"
 
+    def test_query_caches_query_embedding(
+        self, mocker, mock_logger, mock_config_localdb
+    ):
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        mock_embed = mocker.patch.object(
+            database_service.embedding,
+            "embed_texts_array",
+            return_value=np.array([[0.1, 0.2]], dtype=np.float32),
+        )
+
+        database_service.query("What is the answer?")
+        database_service.query("  what is the   answer? ")
+        database_service.query("Another question")
+
+        assert mock_embed.call_count == 2
+        assert database_service.database.query_by_embedding.call_count == 3
+        stats = database_service.get_query_cache_stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+
+    def test_aquery(self, mocker, mock_logger, mock_config_localdb, mock_documents):
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        database_service.database.query_by_embedding.return_value = mock_documents
+        mock_aembed = mocker.patch.object(
+            database_service.embedding,
+            "aembed_texts",
+            mocker.AsyncMock(return_value=[[0.1, 0.2]]),
+        )
+
+        async def run():
+            return [await database_service.aquery("A query") for _ in range(2)]
+
+        responses = asyncio.run(run())
+
+        assert responses == [mock_documents] * 2
+        assert mock_aembed.await_count == 1
+        embedding = database_service.database.query_by_embedding.call_args.args[0]
+        np.testing.assert_allclose(embedding, [0.1, 0.2])
+
+    def test_embed_queries_embeds_missing_queries_once(
+        self, mocker, mock_logger, mock_config_localdb
+    ):
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        mock_embed = mocker.patch.object(
+            database_service.embedding,
+            "embed_texts_array",
+            side_effect=lambda texts: np.array(
+                [[float(len(text)), 1.0] for text in texts], dtype=np.float32
+            ),
+        )
+        database_service.embed_query("a")
+
+        embeddings = database_service.embed_queries(["a", "bb", "bb", "ccc"])
+
+        np.testing.assert_allclose(embeddings[:, 0], [1.0, 2.0, 2.0, 3.0])
+        assert mock_embed.call_count == 2
+        assert mock_embed.call_args.args[0] == ["bb", "ccc"]
+        # Cached vectors are read-only copies, which do not keep the batch matrix alive.
+        cached = database_service.embed_query("bb")
+        assert cached.base is None
+        assert not cached.flags.writeable
+
+    def test_query_cache_disabled(self, mocker, mock_logger, mock_config_localdb):
+        mock_config_localdb.embedding_config.query_cache_max_entries = 0
+        database_service = DatabaseService(
+            logger=mock_logger,
+            config=mock_config_localdb.database_config,
+            embedding_config=mock_config_localdb.embedding_config,
+        )
+        database_service.database = mocker.Mock()
+        mock_embed = mocker.patch.object(
+            database_service.embedding,
+            "embed_texts_array",
+            return_value=np.array([[0.1, 0.2]], dtype=np.float32),
+        )
+
+        database_service.query("What is the answer?")
+        database_service.query("What is the answer?")
+
+        assert mock_embed.call_count == 2
+        assert database_service.get_query_cache_stats() is None
+
     def test_query_fail(self, mocker, mock_logger, mock_config_localdb):
         mock_database = mocker.Mock()
         mocker.patch("ragcore.models.database_model.ChromaDatabase", mock_database)
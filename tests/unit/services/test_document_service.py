@@ -9,7 +9,7 @@ from tests.unit.services import RAGCoreTestSetup
 class TestDocumentService(BaseTest, RAGCoreTestSetup):
     def test_load_document(self, mock_logger, mock_pages, mocker):
         class MockPDFLoader:
-            def __init__(self, file_path):
+            def __init__(self, file_path, **kwargs):
                 self.file_path = file_path
 
             def load_and_split(self, title):
@@ -33,7 +33,7 @@ class TestDocumentService(BaseTest, RAGCoreTestSetup):
 
     def test_load_document_no_pages(self, mock_logger, mocker):
         class MockPDFLoader:
-            def __init__(self, file_path):
+            def __init__(self, file_path, **kwargs):
                 self.file_path = file_path
 
             def load_and_split(self, title):
@@ -70,6 +70,10 @@ class TestDocumentService(BaseTest, RAGCoreTestSetup):
         # Split documents
         document_service.split_pages(split[0], split[1])
         assert len(document_service.documents) == expected_num_docs
+        assert all(
+            doc.metadata["token_count"] > 0 for doc in document_service.documents
+        )
+        assert all(doc.metadata["token_encoding"] for doc in document_service.documents)
 
     def test_split_document_no_docs(self, mock_logger):
         document_service = DocumentService(mock_logger)
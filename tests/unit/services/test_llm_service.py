@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pytest
 
@@ -35,6 +36,64 @@ class TestLLMService(BaseTest, RAGCoreTestSetup):
         assert mock_documents[1].content in prompt
         assert question in prompt
 
+    def test_create_prompt_token_budget(
+        self, mocker, mock_logger, mock_documents, mock_llm_config
+    ):
+        mocker.patch(
+            "ragcore.services.llm_service.get_token_encoding", return_value=None
+        )
+        mock_llm_config.max_context_tokens = 40
+        for document in mock_documents:
+            document.metadata["token_count"] = 30
+            document.metadata["token_encoding"] = "estimate"
+        llm_service = LLMService(mock_logger, mock_llm_config)
+
+        prompt = llm_service.create_prompt("What question is that?", mock_documents)
+
+        assert mock_documents[0].content in prompt
+        assert mock_documents[1].content not in prompt
+        assert mock_documents[1].content[:20] in prompt
+
+    def test_create_prompt_sorts_documents(
+        self, mock_logger, mock_documents, mock_llm_config
+    ):
+        llm_service = LLMService(mock_logger, mock_llm_config)
+
+        prompt = llm_service.create_prompt("Question?", mock_documents)
+        reversed_prompt = llm_service.create_prompt("Question?", mock_documents[::-1])
+
+        assert prompt == reversed_prompt
+        assert prompt.index(mock_documents[0].content) < prompt.index(
+            mock_documents[1].content
+        )
+
+    def test_create_prompt_templates(
+        self, mock_logger, mock_documents, mocker, mock_openai_response
+    ):
+        llm_config = LLMConfiguration(
+            provider="openai",
+            model="great-model",
+            endpoint=None,
+            api_version=None,
+            system_prompt_template="Be brief.",
+            prompt_template="{{ context }}|{{ question }}",
+        )
+        mocker.patch(
+            "ragcore.models.llm_model.OpenAI", return_value=mock_openai_response
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+
+        prompt = llm_service.create_prompt("Question?", mock_documents[:1])
+        llm_service.make_llm_request(prompt)
+
+        assert prompt == f"{mock_documents[0].content}|Question?"
+        create = mock_openai_response.chat.completions.create
+        assert create.call_args.kwargs["messages"] == [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": prompt},
+        ]
+
     def test_create_prompt_no_question(
         self, mock_logger, mock_documents, mock_llm_config
     ):
@@ -64,6 +123,30 @@ class TestLLMService(BaseTest, RAGCoreTestSetup):
 
         assert response == "This is the response."
 
+    def test_openai_request_adaptive_concurrency(
+        self, mock_logger, mocker, mock_openai_response, mock_llm_config
+    ):
+        mock_llm_config.adaptive_concurrency = True
+        mock_llm_config.max_concurrency = 3
+        mock_openai = mocker.Mock()
+        raw_response = (
+            mock_openai.with_options.return_value.chat.completions.with_raw_response.create.return_value
+        )
+        raw_response.headers = {}
+        raw_response.parse.return_value = (
+            mock_openai_response.chat.completions.create.return_value
+        )
+        mocker.patch("ragcore.models.llm_model.OpenAI", return_value=mock_openai)
+
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+
+        response = llm_service.make_llm_request(prompt="This is a full prompt.")
+
+        assert response == "This is the response."
+        assert llm_service.concurrency_controller.stats().limit == 3
+        assert llm_service.concurrency_controller.stats().request_count == 1
+
     def test_azure_init_request(
         self, mock_logger, mocker, mock_openai_response, mock_llm_config
     ):
@@ -84,6 +167,282 @@ class TestLLMService(BaseTest, RAGCoreTestSetup):
         response = llm_service.make_llm_request(prompt="This is a full prompt.")
         assert response == "This is the response."
 
+    def test_azure_request_endpoint_pool(
+        self, mock_logger, mocker, mock_openai_response, mock_llm_config
+    ):
+        mock_llm_config.provider = "azure"
+        mock_llm_config.api_version = "some-version"
+        mock_llm_config.endpoints = ["https://a.com", "https://b.com"]
+        mock_azure = mocker.patch(
+            "ragcore.models.llm_model.AzureOpenAI", return_value=mock_openai_response
+        )
+
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+        for _ in range(2):
+            llm_service.make_llm_request(prompt="This is a full prompt.")
+
+        endpoints = [
+            call.kwargs["azure_endpoint"] for call in mock_azure.call_args_list
+        ]
+        assert endpoints == ["https://a.com", "https://a.com", "https://b.com"]
+        stats = llm_service.get_endpoint_stats()
+        assert [stat.request_count for stat in stats] == [1, 1]
+
+    def test_make_llm_request_stream(self, mock_logger, mocker, mock_llm_config):
+        def mock_chunk(content):
+            return mocker.Mock(
+                choices=[mocker.Mock(delta=mocker.Mock(content=content))]
+            )
+
+        mock_stream = mocker.MagicMock()
+        mock_stream.__iter__.return_value = iter(
+            [
+                mocker.Mock(choices=[]),
+                mock_chunk("This is"),
+                mock_chunk(None),
+                mock_chunk(" the response."),
+            ]
+        )
+        mock_openai = mocker.Mock()
+        mock_openai.chat.completions.create.return_value = mock_stream
+        mocker.patch("ragcore.models.llm_model.OpenAI", return_value=mock_openai)
+
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+
+        response = list(llm_service.make_llm_request_stream("This is a full prompt."))
+
+        assert response == ["This is", " the response."]
+        assert mock_openai.chat.completions.create.call_args.kwargs["stream"] is True
+        mock_stream.close.assert_called_once()
+
+    def test_make_llm_request_stream_closed_early(
+        self, mock_logger, mocker, mock_llm_config
+    ):
+        mock_stream = mocker.MagicMock()
+        mock_stream.__iter__.return_value = iter(
+            [
+                mocker.Mock(choices=[mocker.Mock(delta=mocker.Mock(content=content))])
+                for content in ["First", "Second"]
+            ]
+        )
+        mock_openai = mocker.Mock()
+        mock_openai.chat.completions.create.return_value = mock_stream
+        mocker.patch("ragcore.models.llm_model.OpenAI", return_value=mock_openai)
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+
+        parts = llm_service.make_llm_request_stream("This is a full prompt.")
+        assert next(parts) == "First"
+        parts.close()
+
+        mock_stream.close.assert_called_once()
+
+    def test_amake_llm_request(
+        self, mock_logger, mocker, mock_openai_response, mock_llm_config
+    ):
+        mocker.patch("ragcore.models.llm_model.OpenAI", mocker.Mock())
+        mock_async_openai = mocker.Mock()
+        mock_async_openai.chat.completions.create = mocker.AsyncMock(
+            return_value=mock_openai_response.chat.completions.create.return_value
+        )
+        mock_async_openai_class = mocker.patch(
+            "ragcore.models.llm_model.AsyncOpenAI", return_value=mock_async_openai
+        )
+
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+
+        async def run():
+            return [
+                await llm_service.amake_llm_request(prompt="This is a full prompt.")
+                for _ in range(2)
+            ]
+
+        responses = asyncio.run(run())
+
+        assert responses == ["This is the response."] * 2
+        assert mock_async_openai_class.call_count == 1
+
+    def test_local_llm_request(self, mock_logger, mocker):
+        mock_sleep = mocker.patch("ragcore.models.llm_model.time.sleep")
+        llm_config = LLMConfiguration(
+            provider="local",
+            model="echo",
+            endpoint=None,
+            api_version=None,
+            simulated_latency_seconds=0.5,
+            simulated_tokens_per_second=10.0,
+            simulated_response_tokens=5,
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+
+        response = llm_service.make_llm_request(prompt="This is a full prompt.")
+        stream = list(
+            llm_service.make_llm_request_stream(prompt="This is a full prompt.")
+        )
+        other_response = llm_service.make_llm_request(prompt="This is another prompt.")
+
+        assert len(response.split()) == 5
+        assert set(response.split()) <= {"This", "is", "a", "full", "prompt"}
+        assert "".join(stream) == response
+        assert len(stream) == 5
+        assert other_response != response
+        assert mock_sleep.call_args_list[0].args == (1.0,)
+
+    def test_local_llm_arequest(self, mock_logger):
+        llm_config = LLMConfiguration(
+            provider="local", model="echo", endpoint=None, api_version=None
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+
+        response = asyncio.run(
+            llm_service.amake_llm_request(prompt="This is a full prompt.")
+        )
+
+        assert response == llm_service.make_llm_request(prompt="This is a full prompt.")
+        assert len(response.split()) == 64
+
+    def test_local_llm_request_with_adaptive_concurrency(self, mock_logger):
+        llm_config = LLMConfiguration(
+            provider="local",
+            model="echo",
+            endpoint=None,
+            api_version=None,
+            adaptive_concurrency=True,
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+
+        response = llm_service.make_llm_request(prompt="This is a full prompt.")
+        stream = list(llm_service.make_llm_request_stream(prompt="Another prompt."))
+        async_response = asyncio.run(
+            llm_service.amake_llm_request(prompt="A third prompt.")
+        )
+
+        assert llm_service.llm.controller is llm_service.concurrency_controller
+        assert response and stream and async_response
+        stats = llm_service.concurrency_controller.stats()
+        assert stats.request_count == 3
+        assert stats.in_flight == 0
+
+    def test_make_llm_request_hedged(self, mock_logger, mocker):
+        llm_config = LLMConfiguration(
+            provider="local",
+            model="slow",
+            endpoint=None,
+            api_version=None,
+            hedge_percentile=50,
+            hedge_model="fast",
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+        llm_service.llm.latency_seconds = 0.2
+        for kind in ["request", "stream"]:
+            for _ in range(llm_service.hedger.min_samples):
+                llm_service.hedger.record(0.01, kind)
+
+        response = llm_service.make_llm_request(prompt="This is a full prompt.")
+        stream = list(llm_service.make_llm_request_stream(prompt="Another prompt."))
+
+        assert llm_service.hedge_llm.llm_model == "fast"
+        system_prompt = llm_service.system_prompt
+        assert response == llm_service.hedge_llm.request(
+            "This is a full prompt.", system_prompt
+        )
+        assert "".join(stream) == llm_service.hedge_llm.request(
+            "Another prompt.", system_prompt
+        )
+        assert llm_service.get_hedge_stats().hedge_win_count == 2
+
+    def test_make_llm_request_hedged_response_cached_for_hedge_model(self, mock_logger):
+        llm_config = LLMConfiguration(
+            provider="local",
+            model="slow",
+            endpoint=None,
+            api_version=None,
+            hedge_percentile=50,
+            hedge_model="fast",
+            response_cache_max_entries=10,
+        )
+        llm_service = LLMService(mock_logger, llm_config)
+        llm_service.initialize_llm()
+        llm_service.llm.latency_seconds = 0.2
+        for _ in range(llm_service.hedger.min_samples):
+            llm_service.hedger.record(0.01, "request")
+
+        response = llm_service.make_llm_request(prompt="This is a full prompt.")
+
+        assert llm_service.get_hedge_stats().hedge_win_count == 1
+        assert llm_service._get_response_from_cache("This is a full prompt.") is None
+        assert (
+            llm_service.response_cache.get(
+                llm_service._get_response_cache_key("This is a full prompt.", "fast")
+            )
+            == response
+        )
+
+    def test_make_llm_request_stream_no_prompt(self, mock_logger, mock_llm_config):
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        assert list(llm_service.make_llm_request_stream("")) == []
+
+    def test_make_llm_request_response_cache(
+        self, mock_logger, mocker, mock_openai_response, mock_llm_config
+    ):
+        mock_llm_config.response_cache_max_entries = 10
+        mocker.patch(
+            "ragcore.models.llm_model.OpenAI", return_value=mock_openai_response
+        )
+
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.initialize_llm()
+
+        responses = [llm_service.make_llm_request("Same prompt.") for _ in range(2)]
+        llm_service.make_llm_request("Other prompt.")
+
+        assert responses == ["This is the response."] * 2
+        assert mock_openai_response.chat.completions.create.call_count == 2
+
+    def test_make_llm_request_response_disk_cache_persists(
+        self, mock_logger, mocker, mock_openai_response, mock_llm_config, tmp_path
+    ):
+        mock_llm_config.response_cache_dir = str(tmp_path)
+        mocker.patch(
+            "ragcore.models.llm_model.OpenAI", return_value=mock_openai_response
+        )
+
+        for _ in range(2):
+            llm_service = LLMService(mock_logger, mock_llm_config)
+            llm_service.initialize_llm()
+            response = llm_service.make_llm_request("Same prompt.")
+
+        assert response == "This is the response."
+        assert mock_openai_response.chat.completions.create.call_count == 1
+
+    def test_response_cache_key_depends_on_model(self, mock_logger, mock_llm_config):
+        llm_service_a = LLMService(mock_logger, mock_llm_config)
+        mock_llm_config.model = "other-model"
+        llm_service_b = LLMService(mock_logger, mock_llm_config)
+
+        assert llm_service_a._get_response_cache_key(
+            "prompt"
+        ) != llm_service_b._get_response_cache_key("prompt")
+
+    def test_make_llm_requests_in_order(self, mock_logger, mocker, mock_llm_config):
+        mock_llm_config.max_concurrency = 2
+        llm_service = LLMService(mock_logger, mock_llm_config)
+        llm_service.llm = mocker.Mock()
+        llm_service.llm.request.side_effect = (
+            lambda text, system_prompt: f"Response to {text}"
+        )
+
+        responses = llm_service.make_llm_requests(["a", "b", "c"])
+
+        assert responses == ["Response to a", "Response to b", "Response to c"]
+
     def test_make_llm_request_no_model_initialized(self, mock_logger, mock_llm_config):
         llm_service = LLMService(mock_logger, mock_llm_config)
         with pytest.raises(LLMError):
@@ -0,0 +1,122 @@
+import numpy as np
+
+from ragcore.shared.cache import DiskCache, LRUCache, SemanticCache
+
+
+class TestDiskCache:
+    def test_set_and_get(self, tmp_path):
+        cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10)
+        cache.set("key", b"value")
+
+        assert cache.get("key") == b"value"
+        assert cache.get("missing") is None
+        assert len(cache) == 1
+
+    def test_get_many_omits_missing_keys(self, tmp_path):
+        cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10)
+        cache.set_many({"a": b"1", "b": b"2"})
+
+        assert cache.get_many(["a", "b", "c", "a"]) == {"a": b"1", "b": b"2"}
+
+    def test_evicts_least_recently_used(self, tmp_path, mocker):
+        mock_time = mocker.patch("ragcore.shared.cache.time.time")
+        cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+
+        mock_time.return_value = 1.0
+        cache.set("a", b"1")
+        mock_time.return_value = 2.0
+        cache.set("b", b"2")
+        mock_time.return_value = 3.0
+        cache.get("a")
+        mock_time.return_value = 4.0
+        cache.set("c", b"3")
+
+        assert len(cache) == 2
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"3"
+
+    def test_ttl(self, tmp_path, mocker):
+        mock_time = mocker.patch("ragcore.shared.cache.time.time")
+        cache = DiskCache(
+            path=str(tmp_path / "cache.sqlite3"), max_entries=10, ttl_seconds=10
+        )
+
+        mock_time.return_value = 1.0
+        cache.set("a", b"1")
+        mock_time.return_value = 5.0
+        assert cache.get("a") == b"1"
+        mock_time.return_value = 20.0
+        assert cache.get("a") is None
+
+    def test_persists(self, tmp_path):
+        path = str(tmp_path / "nested" / "cache.sqlite3")
+        DiskCache(path=path, max_entries=10).set("a", b"1")
+
+        assert DiskCache(path=path, max_entries=10).get("a") == b"1"
+
+
+class TestLRUCache:
+    def test_set_and_get_counts_hits_and_misses(self):
+        cache = LRUCache(max_entries=10)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl(self, mocker):
+        mock_time = mocker.patch("ragcore.shared.cache.time.monotonic")
+        cache = LRUCache(max_entries=10, ttl_seconds=10)
+
+        mock_time.return_value = 1.0
+        cache.set("a", 1)
+        mock_time.return_value = 5.0
+        assert cache.get("a") == 1
+        mock_time.return_value = 20.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestSemanticCache:
+    def test_returns_answer_for_similar_question_with_same_chunks(self):
+        cache = SemanticCache(threshold=0.9, max_entries=10)
+        cache.set(np.array([1.0, 0.0]), ["a", "b"], "Answer", duration_seconds=2.0)
+
+        assert cache.get(np.array([0.95, 0.1]), ["a", "b"]) == "Answer"
+        assert cache.get(np.array([0.0, 1.0]), ["a", "b"]) is None
+        assert cache.get(np.array([1.0, 0.0]), ["b", "a"]) is None
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.saved_seconds) == (1, 2, 2.0)
+        assert stats.hit_rate == 1 / 3
+
+    def test_invalidate_user(self):
+        cache = SemanticCache(threshold=0.9, max_entries=10)
+        cache.set(np.array([1.0, 0.0]), ["a"], "Answer 1", 1.0, user="user1")
+        cache.set(np.array([1.0, 0.0]), ["a"], "Answer 2", 1.0, user="user2")
+
+        cache.invalidate("user1")
+
+        assert cache.get(np.array([1.0, 0.0]), ["a"], user="user1") is None
+        assert cache.get(np.array([1.0, 0.0]), ["a"], user="user2") == "Answer 2"
+
+    def test_evicts_least_recently_used(self):
+        cache = SemanticCache(threshold=0.9, max_entries=1)
+        cache.set(np.array([1.0, 0.0]), ["a"], "Answer 1", 1.0)
+        cache.set(np.array([0.0, 1.0]), ["a"], "Answer 2", 1.0)
+
+        assert len(cache) == 1
+        assert cache.get(np.array([1.0, 0.0]), ["a"]) is None
@@ -0,0 +1,181 @@
+import asyncio
+import httpx
+import openai
+import pytest
+
+from ragcore.shared.concurrency import AdaptiveConcurrencyController
+
+
+def rate_limit_error(headers):
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "https://endpoint.com")
+    )
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def server_error():
+    response = httpx.Response(
+        500, request=httpx.Request("POST", "https://endpoint.com")
+    )
+    return openai.InternalServerError("Server error", response=response, body=None)
+
+
+class TestAdaptiveConcurrencyController:
+    def test_call_success_increases_limit(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=4)
+        controller._limit = 2.0
+
+        assert controller.call(lambda value: value * 2, 21) == 42
+        assert controller._limit == 2.5
+        stats = controller.stats()
+        assert stats.limit == 2
+        assert stats.in_flight == 0
+        assert stats.request_count == 1
+        assert stats.throttle_count == 0
+
+    def test_call_limit_capped(self):
+        controller = AdaptiveConcurrencyController(max_limit=4)
+        for _ in range(10):
+            controller.call(lambda: None)
+        assert controller.limit == 4
+
+    def test_call_throttled_retries_and_decreases_limit(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        function = mocker.Mock(
+            side_effect=[rate_limit_error({"retry-after-ms": "10"}), "response"]
+        )
+
+        assert controller.call(function) == "response"
+        assert function.call_count == 2
+        stats = controller.stats()
+        assert stats.throttle_count == 1
+        assert stats.request_count == 2
+        assert stats.limit == 4
+
+    def test_call_throttled_max_retries(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=8, max_retries=1)
+        function = mocker.Mock(side_effect=rate_limit_error({"retry-after": "0"}))
+
+        with pytest.raises(openai.RateLimitError):
+            controller.call(function)
+        assert function.call_count == 2
+        assert controller.stats().in_flight == 0
+
+    def test_call_other_errors_not_retried(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        function = mocker.Mock(side_effect=ValueError("Failed"))
+
+        with pytest.raises(ValueError):
+            controller.call(function)
+        assert function.call_count == 1
+        assert controller.stats().in_flight == 0
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            server_error(),
+            openai.APIConnectionError(request=httpx.Request("POST", "https://a.com")),
+            openai.APITimeoutError(request=httpx.Request("POST", "https://a.com")),
+        ],
+    )
+    def test_call_transient_errors_retried_with_backoff(self, mocker, error):
+        sleep = mocker.patch("ragcore.shared.concurrency.time.sleep")
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        function = mocker.Mock(side_effect=[error, error, "response"])
+
+        assert controller.call(function) == "response"
+        assert function.call_count == 3
+        backoffs = [call.args[0] for call in sleep.call_args_list]
+        assert 0.375 <= backoffs[0] <= 0.5
+        assert 0.75 <= backoffs[1] <= 1.0
+        stats = controller.stats()
+        assert stats.limit == 8
+        assert stats.throttle_count == 0
+        assert stats.in_flight == 0
+
+    def test_call_transient_errors_max_retries(self, mocker):
+        mocker.patch("ragcore.shared.concurrency.time.sleep")
+        controller = AdaptiveConcurrencyController(max_limit=8, max_retries=2)
+        function = mocker.Mock(side_effect=server_error())
+
+        with pytest.raises(openai.InternalServerError):
+            controller.call(function)
+        assert function.call_count == 3
+        assert controller.stats().in_flight == 0
+
+    def test_call_exhausted_headers_decrease_limit(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        response = mocker.Mock(
+            headers={
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "10ms",
+            }
+        )
+
+        assert controller.call(lambda: response) == response
+        assert controller.limit == 4
+        assert controller.stats().throttle_count == 0
+
+    def test_acall_throttled(self, mocker):
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        function = mocker.AsyncMock(
+            side_effect=[rate_limit_error({"retry-after": "0.01"}), "response"]
+        )
+
+        assert asyncio.run(controller.acall(function)) == "response"
+        assert controller.stats().throttle_count == 1
+        assert controller.limit == 4
+
+    def test_acall_transient_error_retried(self, mocker):
+        sleep = mocker.patch(
+            "ragcore.shared.concurrency.asyncio.sleep", new=mocker.AsyncMock()
+        )
+        controller = AdaptiveConcurrencyController(max_limit=8)
+        function = mocker.AsyncMock(side_effect=[server_error(), "response"])
+
+        assert asyncio.run(controller.acall(function)) == "response"
+        assert sleep.await_count == 1
+        assert controller.stats().throttle_count == 0
+
+    def test_acall_waits_for_free_slot(self):
+        controller = AdaptiveConcurrencyController(max_limit=1)
+        active = []
+        max_active = []
+
+        async def request(value):
+            active.append(value)
+            max_active.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(value)
+            return value
+
+        async def run():
+            return await asyncio.gather(
+                *(controller.acall(request, value) for value in range(3))
+            )
+
+        assert asyncio.run(run()) == [0, 1, 2]
+        assert max(max_active) == 1
+        assert controller.stats().in_flight == 0
+        assert not controller._async_waiters
+
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({"retry-after-ms": "250"}, 0.25),
+            ({"retry-after": "3"}, 3.0),
+            ({"retry-after": "not-a-date"}, 1.0),
+            ({}, 1.0),
+        ],
+    )
+    def test_get_retry_after_seconds(self, headers, expected):
+        assert (
+            AdaptiveConcurrencyController._get_retry_after_seconds(headers) == expected
+        )
+
+    def test_get_reset_seconds(self):
+        headers = {
+            "x-ratelimit-reset-requests": "1m3s",
+            "x-ratelimit-reset-tokens": "250ms",
+        }
+        assert AdaptiveConcurrencyController._get_reset_seconds(headers) == 63.0
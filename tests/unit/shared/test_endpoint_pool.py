@@ -0,0 +1,94 @@
+import asyncio
+import httpx
+import openai
+import pytest
+
+from ragcore.shared.endpoint_pool import EndpointPool
+from ragcore.shared.errors import UserConfigurationError
+
+
+def connection_error():
+    return openai.APIConnectionError(
+        request=httpx.Request("POST", "https://endpoint.com")
+    )
+
+
+class TestEndpointPool:
+    def test_init_invalid(self):
+        with pytest.raises(UserConfigurationError):
+            EndpointPool([])
+        with pytest.raises(UserConfigurationError):
+            EndpointPool(["https://a.com"], routing="random")
+
+    def test_call_least_outstanding(self):
+        pool = EndpointPool(["https://a.com", "https://b.com"])
+        used = []
+
+        def request(endpoint):
+            used.append(endpoint)
+            if len(used) == 1:
+                # The first request is still in flight, so the second endpoint is used.
+                pool.call(request)
+            return endpoint
+
+        pool.call(request)
+        pool.call(lambda endpoint: used.append(endpoint))
+
+        assert used == ["https://a.com", "https://b.com", "https://a.com"]
+        stats = pool.stats()
+        assert [stat.request_count for stat in stats] == [2, 1]
+        assert [stat.in_flight for stat in stats] == [0, 0]
+        assert stats[0].average_latency is not None
+
+    def test_call_latency(self):
+        pool = EndpointPool(["https://a.com", "https://b.com"], routing="latency")
+        pool._states[0].average_latency = 2.0
+        pool._states[1].average_latency = 0.5
+
+        assert pool.call(lambda endpoint: endpoint) == "https://b.com"
+
+    def test_call_ejects_endpoint_after_errors(self):
+        pool = EndpointPool(
+            ["https://a.com", "https://b.com"], max_errors=2, ejection_seconds=60
+        )
+
+        def fail(endpoint):
+            raise connection_error()
+
+        for _ in range(2):
+            with pytest.raises(openai.APIConnectionError):
+                pool._states[1].in_flight = 1  # Keeps the second endpoint busy.
+                pool.call(fail)
+        pool._states[1].in_flight = 0
+
+        stats = pool.stats()
+        assert stats[0].error_count == 2
+        assert not stats[0].healthy
+        assert stats[1].healthy
+        assert [pool.call(lambda endpoint: endpoint) for _ in range(2)] == [
+            "https://b.com"
+        ] * 2
+
+    def test_call_request_error_does_not_eject(self):
+        pool = EndpointPool(["https://a.com"], max_errors=1)
+
+        def fail(endpoint):
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            pool.call(fail)
+
+        assert pool.stats()[0].error_count == 0
+        assert pool.stats()[0].healthy
+
+    def test_acall(self):
+        pool = EndpointPool(["https://a.com", "https://b.com"])
+
+        async def request(endpoint):
+            await asyncio.sleep(0.01)
+            return endpoint
+
+        async def run():
+            return await asyncio.gather(pool.acall(request), pool.acall(request))
+
+        assert asyncio.run(run()) == ["https://a.com", "https://b.com"]
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from ragcore.shared.hedging import RequestHedger
+
+
+def warm_up(hedger, seconds, kind="request"):
+    for _ in range(hedger.min_samples):
+        hedger.record(seconds, kind)
+
+
+class TestRequestHedger:
+    def test_get_delay(self):
+        hedger = RequestHedger(percentile=90, min_samples=10)
+        assert hedger.get_delay() is None
+
+        for seconds in range(1, 11):
+            hedger.record(float(seconds))
+
+        assert hedger.get_delay() == 9.0
+        assert hedger.get_delay("stream") is None
+
+    def test_call_without_samples_does_not_hedge(self, mocker):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        hedge = mocker.Mock()
+
+        assert hedger.call(lambda: "primary", hedge) == "primary"
+        hedge.assert_not_called()
+        assert hedger.stats().request_count == 1
+
+    def test_call_hedge_wins(self):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        warm_up(hedger, 0.01)
+        release = threading.Event()
+        discarded = []
+
+        def primary():
+            release.wait(1)
+            return "primary"
+
+        result = hedger.call(primary, lambda: "hedge", on_discard=discarded.append)
+        release.set()
+        time.sleep(0.05)
+
+        assert result == "hedge"
+        assert discarded == ["primary"]
+        stats = hedger.stats()
+        assert stats.hedge_count == 1
+        assert stats.hedge_win_count == 1
+        # The latency of the original request is recorded when it finishes.
+        assert len(hedger._latencies["request"]) == 3
+        assert hedger._latencies["request"][-1] >= 0.01
+
+    def test_call_reuses_executor(self):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        warm_up(hedger, 0.001)
+
+        def primary():
+            time.sleep(0.01)
+            return "primary"
+
+        hedger.call(primary, lambda: "hedge")
+        executor = hedger._executor
+        hedger.call(primary, lambda: "hedge")
+
+        assert executor is not None
+        assert hedger._executor is executor
+
+    def test_call_more_callers_than_workers(self):
+        hedger = RequestHedger(percentile=50, min_samples=2, max_workers=2)
+        warm_up(hedger, 1.0)
+
+        def primary():
+            time.sleep(0.1)
+            return "primary"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(hedger.call(primary, lambda: "hedge"))
+            )
+            for _ in range(6)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Callers which find no free worker send the request themselves instead of waiting.
+        assert time.monotonic() - started < 0.25
+        assert results == ["primary"] * 6
+        assert max(list(hedger._latencies["request"])[2:]) < 0.2
+        assert hedger._busy_workers == 0
+
+    def test_call_hedge_fails(self):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        warm_up(hedger, 0.01)
+
+        def primary():
+            time.sleep(0.05)
+            return "primary"
+
+        def hedge():
+            raise ValueError("hedge failed")
+
+        assert hedger.call(primary, hedge) == "primary"
+        assert hedger.stats().hedge_win_count == 0
+
+    def test_call_both_fail(self):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        warm_up(hedger, 0.01)
+
+        def primary():
+            time.sleep(0.05)
+            raise ValueError("primary failed")
+
+        def hedge():
+            raise KeyError("hedge failed")
+
+        with pytest.raises(ValueError, match="primary failed"):
+            hedger.call(primary, hedge)
+
+    def test_call_max_hedges_per_minute(self, mocker):
+        hedger = RequestHedger(percentile=50, max_hedges_per_minute=1, min_samples=2)
+        warm_up(hedger, 0.001)
+
+        def primary():
+            time.sleep(0.02)
+            return "primary"
+
+        hedge = mocker.Mock(return_value="hedge")
+
+        results = [hedger.call(primary, hedge) for _ in range(3)]
+
+        assert results.count("hedge") == 1
+        assert hedge.call_count == 1
+        assert hedger.stats().hedge_count == 1
+
+    def test_acall_hedge_wins_and_cancels_primary(self):
+        hedger = RequestHedger(percentile=50, min_samples=2)
+        warm_up(hedger, 0.01)
+        cancelled = []
+
+        async def primary():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "primary"
+
+        async def hedge():
+            return "hedge"
+
+        async def run():
+            result = await hedger.acall(primary, hedge)
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(run()) == "hedge"
+        assert cancelled == [True]
+        assert hedger.stats().hedge_win_count == 1
+        # The cancelled original request is recorded with the time until it was cancelled.
+        assert len(hedger._latencies["request"]) == 3
+        assert hedger._latencies["request"][-1] >= 0.01
@@ -0,0 +1,55 @@
+import threading
+import pytest
+
+from ragcore.shared.pipeline import batched, prefetch
+
+
+class TestPipeline:
+    def test_batched(self):
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(batched([], 2)) == []
+
+    def test_prefetch_keeps_order(self):
+        assert list(prefetch(range(100), 3)) == list(range(100))
+
+    def test_prefetch_is_bounded(self):
+        produced = []
+
+        def items():
+            for item in range(100):
+                produced.append(item)
+                yield item
+
+        iterator = prefetch(items(), 2)
+        assert next(iterator) == 0
+        threading.Event().wait(0.2)
+
+        # The consumed item, two items in the queue, and one item waiting for space.
+        assert len(produced) <= 4
+        iterator.close()
+
+    def test_prefetch_raises_error_of_worker(self):
+        def items():
+            yield 1
+            raise ValueError("Broken")
+
+        iterator = prefetch(items(), 2)
+        assert next(iterator) == 1
+        with pytest.raises(ValueError):
+            next(iterator)
+
+    def test_prefetch_close_stops_worker(self):
+        closed = threading.Event()
+
+        def items():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.set()
+
+        iterator = prefetch(items(), 1)
+        next(iterator)
+        iterator.close()
+
+        assert closed.is_set()
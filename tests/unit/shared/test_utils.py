@@ -1,5 +1,6 @@
 import pytest
 
+from ragcore.models.document_model import Document
 from ragcore.shared import utils
 from tests.unit.services import RAGCoreTestSetup
 
@@ -102,3 +103,200 @@ class TestUtils(RAGCoreTestSetup):
         expected_chunks = [[1, 2, 3, 4, 5]]
         result = list(utils.chunk_list(nums, chunk_size))
         assert result == expected_chunks
+
+    @pytest.mark.parametrize(
+        "token_counts, max_tokens, max_items, expected",
+        [
+            ([], 10, 5, []),
+            ([3, 3, 3], 10, 5, [(0, 3)]),
+            ([3, 3, 3, 3], 10, 5, [(0, 3), (3, 4)]),
+            ([3, 3, 3, 3], 100, 2, [(0, 2), (2, 4)]),
+            ([20, 1, 1], 10, 5, [(0, 1), (1, 3)]),
+            ([1, 20, 1], 10, 5, [(0, 1), (1, 2), (2, 3)]),
+        ],
+    )
+    def test_batch_by_tokens(self, token_counts, max_tokens, max_items, expected):
+        assert utils.batch_by_tokens(token_counts, max_tokens, max_items) == expected
+
+    def test_count_tokens(self, mocker):
+        encoding = mocker.Mock()
+        encoding.encode_ordinary_batch.side_effect = lambda texts: [
+            text.split() for text in texts
+        ]
+        assert utils.count_tokens(["one two", "three"], encoding) == [2, 1]
+
+    def test_count_tokens_estimate_without_encoding(self):
+        assert utils.count_tokens(["", "abcd", "abcde"], None) == [0, 1, 2]
+
+    def test_get_token_encoding_not_available(self, mocker):
+        mocker.patch.dict(utils._token_encodings, clear=True)
+        mock_get_encoding = mocker.patch(
+            "tiktoken.get_encoding", side_effect=ConnectionError("offline")
+        )
+        assert utils.get_token_encoding("unknown-model") is None
+        assert utils.get_token_encoding("unknown-model") is None
+        assert mock_get_encoding.call_count == 1
+
+    def test_truncate_to_tokens_cuts_at_whitespace(self):
+        # Without encoding, four characters are one token.
+        assert utils.truncate_to_tokens("one two three four", 3, None) == "one two"
+        assert utils.truncate_to_tokens("short", 3, None) == "short"
+        assert utils.truncate_to_tokens("short", 0, None) == ""
+
+    def test_fit_documents_to_token_budget(self):
+        docs = [
+            Document(
+                content="a" * 8,
+                title="A",
+                metadata={"token_count": 2, "token_encoding": "estimate"},
+            ),
+            Document(
+                content="b" * 8,
+                title="B",
+                metadata={"token_count": 5, "token_encoding": "estimate"},
+            ),
+            Document(content="word " * 8, title="C", metadata={}),
+            Document(content="d", title="D", metadata={}),
+        ]
+
+        result = utils.fit_documents_to_token_budget(docs, 12, None)
+
+        assert [doc.title for doc in result] == ["A", "B", "C"]
+        assert result[2].content == "word word"
+        assert docs[2].content == "word " * 8
+
+    def test_fit_documents_to_token_budget_recounts_other_encoding(self, mocker):
+        encoding = mocker.Mock()
+        encoding.name = "o200k_base"
+        encoding.encode_ordinary_batch.side_effect = lambda texts: [
+            text.split() for text in texts
+        ]
+        docs = [
+            Document(
+                content="one two three",
+                title="A",
+                metadata={"token_count": 9, "token_encoding": "cl100k_base"},
+            ),
+            Document(
+                content="four five",
+                title="B",
+                metadata={"token_count": 2, "token_encoding": "o200k_base"},
+            ),
+        ]
+
+        result = utils.fit_documents_to_token_budget(docs, 6, encoding)
+
+        assert [doc.title for doc in result] == ["A", "B"]
+        encoding.encode_ordinary_batch.assert_called_once_with(["one two three"])
+
+    def test_fit_documents_to_token_budget_all_fit(self):
+        docs = [Document(content="a", title="A", metadata={"token_count": 1})]
+
+        assert utils.fit_documents_to_token_budget(docs, 10, None) == docs
+
+    def test_merge_adjacent_documents_with_start_index(self):
+        page = "one two three four five six seven eight nine ten eleven twelve"
+        docs = [
+            Document(
+                content=page[40:],
+                title="A",
+                metadata={"page": 1, "start_index": 40, "token_count": 6},
+            ),
+            Document(content="other", title="B", metadata={"page": 1}),
+            Document(
+                content=page[19:48],
+                title="A",
+                metadata={"page": 1, "start_index": 19, "token_count": 7},
+            ),
+            Document(
+                content=page[40:], title="A", metadata={"page": 2, "start_index": 40}
+            ),
+        ]
+
+        result = utils.merge_adjacent_documents(docs)
+
+        assert [doc.content for doc in result] == [page[19:], "other", page[40:]]
+        assert result[0].metadata == {"page": 1, "start_index": 19}
+
+    def test_merge_adjacent_documents_bridging_chunk(self):
+        page = "".join(f"sentence number {i}. " for i in range(20))
+        docs = [
+            Document(content=page[0:100], title="A", metadata={"start_index": 0}),
+            Document(content=page[200:300], title="A", metadata={"start_index": 200}),
+            Document(content=page[80:220], title="A", metadata={"start_index": 80}),
+        ]
+
+        result = utils.merge_adjacent_documents(docs)
+
+        assert [doc.content for doc in result] == [page[0:300]]
+
+    def test_merge_adjacent_documents_touching_chunks(self):
+        docs = [
+            Document(content="first sentence.", title="A", metadata={"start_index": 0}),
+            Document(
+                content="Second sentence.", title="A", metadata={"start_index": 15}
+            ),
+            Document(content="third", title="B", metadata={"start_index": 0}),
+            Document(content=" fourth", title="B", metadata={"start_index": 5}),
+        ]
+
+        result = utils.merge_adjacent_documents(docs)
+
+        assert [doc.content for doc in result] == [
+            "first sentence. Second sentence.",
+            "third fourth",
+        ]
+
+    def test_merge_adjacent_documents_inconsistent_start_index(self):
+        docs = [
+            Document(
+                content="Once upon a time, the elk said nothing",
+                title="A",
+                metadata={"start_index": 0},
+            ),
+            Document(
+                content="the elk said nothing at all that day.",
+                title="A",
+                metadata={"start_index": 100},
+            ),
+            Document(
+                content="nothing at all that day, or the next.",
+                title="A",
+                metadata={"start_index": 110},
+            ),
+        ]
+
+        result = utils.merge_adjacent_documents(docs)
+
+        assert [doc.content for doc in result] == [doc.content for doc in docs]
+
+    def test_merge_adjacent_documents_without_start_index(self):
+        docs = [
+            Document(
+                content="the elk said nothing at all that day.", title="A", metadata={}
+            ),
+            Document(
+                content="Once upon a time, the elk said nothing", title="A", metadata={}
+            ),
+            Document(content="Unrelated text.", title="A", metadata={}),
+        ]
+
+        result = utils.merge_adjacent_documents(docs)
+
+        assert [doc.content for doc in result] == [
+            "Once upon a time, the elk said nothing at all that day.",
+            "Unrelated text.",
+        ]
+
+    def test_sort_documents_by_position(self):
+        docs = [
+            Document(content="c", title="B", metadata={"page": 1}),
+            Document(content="b", title="A", metadata={"page": 10, "start_index": 5}),
+            Document(content="a", title="A", metadata={"page": 10, "start_index": 0}),
+            Document(content="d", title="A", metadata={"page": 2}),
+            Document(content="e", title="A", metadata=None),
+        ]
+
+        result = utils.sort_documents_by_position(docs)
+
+        assert [doc.content for doc in result] == ["d", "a", "b", "e", "c"]